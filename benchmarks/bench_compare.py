@@ -0,0 +1,59 @@
+"""
+Time the destination x day comparison matrix at 50 destinations x 16 days with
+every forecast already cached.
+
+Usage:
+    python benchmarks/bench_compare.py [--destinations 50] [--days 16] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bench_forecast_decode import build_forecast  # noqa: E402
+from holiday_planner.cache import set_cached_forecast  # noqa: E402
+from holiday_planner.compare import compare_forecasts  # noqa: E402
+from holiday_planner.weather_service import (  # noqa: E402
+    daily_forecast_params,
+    fetch_daily_forecasts,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--destinations", type=int, default=50)
+    parser.add_argument("--days", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    start_date, end_date = "2024-10-20", "2024-11-04"
+    locations = [(float(i), float(i)) for i in range(args.destinations)]
+    for latitude, longitude in locations:
+        set_cached_forecast(
+            daily_forecast_params(latitude, longitude, start_date, end_date),
+            build_forecast(args.days),
+        )
+    names = [f"Place {i}" for i in range(args.destinations)]
+
+    def compare():
+        raws = fetch_daily_forecasts(locations, start_date, end_date)
+        return compare_forecasts(names, raws)
+
+    seconds = min(timeit.repeat(compare, number=args.repeat, repeat=3))
+    print(
+        f"{args.destinations} destinations x {args.days} days: "
+        f"{seconds / args.repeat * 1000:.2f} ms per comparison"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measure the per-request database overhead with and without the psycopg
+connection pool. Each simulated request acquires a connection, runs a trivial
+query and releases it again, like Django does at the end of every request.
+
+Requires the PostgreSQL database configured through the POSTGRES_* variables.
+
+Usage:
+    python benchmarks/bench_db_pool.py [--requests 200]
+"""
+
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db.backends.postgresql.base import DatabaseWrapper  # noqa: E402
+
+
+def make_wrapper(alias, pooled):
+    settings_dict = copy.deepcopy(settings.DATABASES["default"])
+    settings_dict.setdefault("OPTIONS", {})
+    settings_dict["CONN_MAX_AGE"] = 0
+    if pooled:
+        settings_dict["OPTIONS"]["pool"] = settings_dict["OPTIONS"].get("pool") or {
+            "min_size": 2,
+            "max_size": 10,
+        }
+    else:
+        settings_dict["OPTIONS"].pop("pool", None)
+    # Fill in the defaults Django normally adds when loading DATABASES
+    for key, value in (
+        ("ATOMIC_REQUESTS", False),
+        ("AUTOCOMMIT", True),
+        ("CONN_HEALTH_CHECKS", False),
+        ("TIME_ZONE", None),
+        ("TEST", {}),
+    ):
+        settings_dict.setdefault(key, value)
+    return DatabaseWrapper(settings_dict, alias=alias)
+
+
+def simulate_requests(wrapper, requests):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        wrapper.ensure_connection()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        # Returns the connection to the pool, or closes it when unpooled
+        wrapper.close()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<10}{statistics.median(timings):>10.2f}{p95:>10.2f}"
+        f"{statistics.mean(timings):>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.postgresql":
+        sys.exit("This benchmark needs the PostgreSQL database backend.")
+
+    print(f"{args.requests} requests, per request overhead (ms)")
+    print(f"{'mode':<10}{'p50':>10}{'p95':>10}{'mean':>10}")
+
+    unpooled = make_wrapper("bench_unpooled", pooled=False)
+    report("unpooled", simulate_requests(unpooled, args.requests))
+
+    pooled = make_wrapper("bench_pooled", pooled=True)
+    try:
+        # Warm the pool so min_size connections exist before measuring
+        simulate_requests(pooled, 5)
+        report("pooled", simulate_requests(pooled, args.requests))
+    finally:
+        pooled.close_pool()
+
+
+if __name__ == "__main__":
+    main()
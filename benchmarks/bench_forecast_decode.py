@@ -0,0 +1,131 @@
+"""
+Compare the cost of a cached weather lookup before and after caching raw
+Open-Meteo FlatBuffers: decoding every variable through pandas versus reading
+numpy views straight out of the cached bytes.
+
+Usage:
+    python benchmarks/bench_forecast_decode.py [--days 16] [--repeat 2000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import flatbuffers
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from holiday_planner import weather_service  # noqa: E402
+from holiday_planner.cache import set_cached_forecast  # noqa: E402
+
+PARAMS = {
+    "latitude": 48.8566,
+    "longitude": 2.3522,
+    "daily": weather_service.DAILY_VARIABLES,
+    "timezone": "Europe/Berlin",
+    "start_date": "2024-10-20",
+    "end_date": "2024-11-04",
+}
+
+
+def build_forecast(days):
+    # A single location WeatherApiResponse with daily variables only
+    builder = flatbuffers.Builder(4096)
+    rng = np.random.default_rng(0)
+    variables = []
+    for _ in weather_service.DAILY_VARIABLES:
+        values = rng.uniform(0, 100, days).astype("<f4")
+        vector = builder.CreateNumpyVector(values)
+        builder.StartObject(4)
+        builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+        variables.append(builder.EndObject())
+    builder.StartVector(4, len(variables), 4)
+    for variable in reversed(variables):
+        builder.PrependUOffsetTRelative(variable)
+    vector = builder.EndVector()
+
+    start = 1729375200
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + days * 86400, 0)
+    builder.PrependInt32Slot(2, 86400, 0)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    daily = builder.EndObject()
+
+    builder.StartObject(12)
+    builder.PrependInt32Slot(6, 7200, 0)
+    builder.PrependUOffsetTRelativeSlot(10, daily, 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+def pandas_decode(raw):
+    # What every call used to do after the HTTP cache returned the response
+    daily = weather_service.parse_forecast(raw)[0].Daily()
+    data = {
+        "date": pd.date_range(
+            start=pd.to_datetime(daily.Time(), unit="s", utc=True),
+            end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=daily.Interval()),
+            inclusive="left",
+        ).strftime("%Y-%m-%d")
+    }
+    for i, name in enumerate(weather_service.DAILY_VARIABLES):
+        data[name] = daily.Variables(i).ValuesAsNumpy()
+
+    cleaned = []
+    for row in pd.DataFrame(data=data).to_dict(orient="records"):
+        cleaned.append(
+            {
+                "date": row["date"],
+                "weather_code": row["weather_code"],
+                "weather_description": weather_service.WMO_WEATHER_CODE_MAP.get(
+                    row["weather_code"], "Unknown"
+                ),
+                **{
+                    name: round(row[name])
+                    for name in weather_service.DAILY_VARIABLES[1:]
+                },
+            }
+        )
+    return cleaned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    raw = build_forecast(args.days)
+    set_cached_forecast(PARAMS, raw)
+
+    def cached_lookup():
+        return weather_service.fetch_weather_data(
+            PARAMS["latitude"],
+            PARAMS["longitude"],
+            PARAMS["start_date"],
+            PARAMS["end_date"],
+        )
+
+    print(f"{args.days} days, {len(raw)} byte response, {args.repeat} lookups")
+    for label, func in [
+        ("pandas decode", lambda: pandas_decode(raw)),
+        ("cached raw bytes + numpy views", cached_lookup),
+    ]:
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=3))
+        print(f"{label:32} {seconds / args.repeat * 1e6:8.1f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
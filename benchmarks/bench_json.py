@@ -0,0 +1,100 @@
+"""
+Compare DRF's stdlib JSONRenderer/JSONParser with the orjson backed
+FastJSONRenderer/FastJSONParser on realistic weather payloads.
+
+Usage:
+    python benchmarks/bench_json.py [--places 50] [--days 16] [--repeat 20]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from holiday_planner.parsers import FastJSONParser  # noqa: E402
+from holiday_planner.renderers import FastJSONRenderer  # noqa: E402
+from holiday_planner.weather_service import WMO_WEATHER_CODE_MAP  # noqa: E402
+
+
+def weather_day(day, numpy_scalars):
+    # Same shape as weather_service.clean_weather_data output
+    code = random.choice(list(WMO_WEATHER_CODE_MAP))
+    number = np.float32 if numpy_scalars else float
+    integer = np.int64 if numpy_scalars else int
+    return {
+        "date": day.isoformat(),
+        "weather_code": number(code),
+        "weather_description": WMO_WEATHER_CODE_MAP[code],
+        "temperature_max": integer(random.randint(10, 35)),
+        "temperature_min": integer(random.randint(-5, 20)),
+        "uv_index_max": integer(random.randint(0, 11)),
+        "precipitation_probability_max": integer(random.randint(0, 100)),
+        "wind_speed_max": integer(random.randint(0, 60)),
+        "wind_gusts_max": integer(random.randint(0, 120)),
+        "wind_direction": integer(random.randint(0, 359)),
+    }
+
+
+def weather_payload(places, days, numpy_scalars=False):
+    # Same shape as the WeatherAPIView response
+    start = date.today()
+    return [
+        {
+            "place_name": f"Place {i}",
+            "weather_data": [
+                weather_day(start + timedelta(days=d), numpy_scalars)
+                for d in range(days)
+            ],
+        }
+        for i in range(places)
+    ]
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=50)
+    parser.add_argument("--days", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+
+    print(f"{args.places} places x {args.days} days, best of {args.repeat} (ms)")
+    print(f"{'case':<28}{'stdlib':>10}{'orjson':>10}{'speedup':>10}")
+
+    for label, numpy_scalars in (("render python", False), ("render numpy", True)):
+        payload = weather_payload(args.places, args.days, numpy_scalars)
+        slow = best_of(lambda: stdlib_renderer.render(payload), args.repeat)
+        fast = best_of(lambda: fast_renderer.render(payload), args.repeat)
+        print(f"{label:<28}{slow:>10.2f}{fast:>10.2f}{slow / fast:>9.1f}x")
+
+    body = fast_renderer.render(weather_payload(args.places, args.days))
+    slow = best_of(lambda: stdlib_parser.parse(io.BytesIO(body)), args.repeat)
+    fast = best_of(lambda: fast_parser.parse(io.BytesIO(body)), args.repeat)
+    print(f"{'parse':<28}{slow:>10.2f}{fast:>10.2f}{slow / fast:>9.1f}x")
+    print(f"payload size: {len(body) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
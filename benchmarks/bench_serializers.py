@@ -0,0 +1,114 @@
+"""
+Compare HolidayScheduleSerializer with the serialize_schedules() fast read path
+for the schedule list endpoint. Runs against a throwaway test database.
+
+Usage:
+    python benchmarks/bench_serializers.py [--items 100 1000] [--repeat 10]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from holiday_planner.models import (  # noqa: E402
+    Destination,
+    HolidaySchedule,
+    ScheduleItem,
+)
+from holiday_planner.serializers import (  # noqa: E402
+    HolidayScheduleSerializer,
+    serialize_schedules,
+)
+from holiday_planner.views import HolidayScheduleViewSet  # noqa: E402
+
+ITEMS_PER_SCHEDULE = 5
+DAYS_PER_ITEM = 7
+
+
+def populate(items):
+    ScheduleItem.objects.all().delete()
+    HolidaySchedule.objects.all().delete()
+
+    user, _ = User.objects.get_or_create(username="bench")
+    destination, _ = Destination.objects.get_or_create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    start = date(2024, 10, 20)
+    weather_data = [
+        {
+            "date": (start + timedelta(days=d)).isoformat(),
+            "weather_code": 3.0,
+            "weather_description": "Overcast",
+            "temperature_max": 17,
+            "temperature_min": 10,
+            "uv_index_max": 3,
+            "precipitation_probability_max": 20,
+            "wind_speed_max": 12,
+            "wind_gusts_max": 27,
+            "wind_direction": 195,
+        }
+        for d in range(DAYS_PER_ITEM)
+    ]
+
+    schedules = HolidaySchedule.objects.bulk_create(
+        HolidaySchedule(user=user, start_date=start, end_date=start)
+        for _ in range(items // ITEMS_PER_SCHEDULE)
+    )
+    ScheduleItem.objects.bulk_create(
+        ScheduleItem(
+            holiday_schedule=schedule,
+            destination=destination,
+            start_date=start,
+            end_date=start + timedelta(days=DAYS_PER_ITEM),
+            weather_data=weather_data,
+        )
+        for schedule in schedules
+        for _ in range(ITEMS_PER_SCHEDULE)
+    )
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    test_database = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"schedule list, best of {args.repeat} (ms) on {test_database}")
+        print(f"{'items':>8}{'serializer':>12}{'fast path':>12}{'speedup':>10}")
+        for items in args.items:
+            populate(items)
+            queryset = HolidayScheduleViewSet.queryset.all()
+
+            assert serialize_schedules(queryset) == (
+                HolidayScheduleSerializer(queryset, many=True).data
+            )
+            slow = best_of(
+                lambda: HolidayScheduleSerializer(queryset.all(), many=True).data,
+                args.repeat,
+            )
+            fast = best_of(lambda: serialize_schedules(queryset.all()), args.repeat)
+            print(f"{items:>8}{slow:>12.2f}{fast:>12.2f}{slow / fast:>9.1f}x")
+    finally:
+        connection.creation.destroy_test_db(test_database, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Compare gunicorn with and without the pre-fork warmup (see gunicorn.conf.py):
+memory per worker and the latency of the first requests after start.
+
+RSS counts shared pages in every worker, PSS splits them between the processes
+sharing them and USS only counts the pages private to a worker, so the warmup
+shows up as a lower PSS/USS. Linux only (reads /proc/<pid>/smaps_rollup).
+
+Uses the database of the settings module in DJANGO_SETTINGS_MODULE, which must
+be migrated; fill it first with e.g. `--destinations 5000`.
+
+Usage:
+    python benchmarks/bench_warmup.py [--workers 4] [--requests 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+
+def create_destinations(count):
+    import django
+
+    django.setup()
+    from holiday_planner.models import Destination
+
+    destinations = [
+        Destination(
+            name=f"Destination {i}",
+            country="Country",
+            latitude=(i % 170) - 85,
+            longitude=(i % 350) - 175,
+        )
+        for i in range(count)
+    ]
+    for destination in destinations:
+        destination.update_geohash()
+    Destination.objects.bulk_create(destinations, batch_size=1000)
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[name] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def children(pid):
+    pids = []
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                stat = (entry / "stat").read_text()
+            except OSError:
+                continue
+            # The command name may contain spaces, the ppid follows it
+            if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+                pids.append(int(entry.name))
+    return pids
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # The root URL is cheap and not one of the measured endpoints
+            urllib.request.urlopen(url + "/admin/login/", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+def run(warmup, workers, requests, path, port):
+    env = {**os.environ, "WARMUP": "true" if warmup else "false"}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        started = time.monotonic()
+        wait_until_up(url)
+        boot = time.monotonic() - started
+
+        latencies = []
+        for _ in range(requests):
+            started = time.monotonic()
+            urllib.request.urlopen(url + path).read()
+            latencies.append((time.monotonic() - started) * 1000)
+
+        memory = [memory_kb(pid) for pid in children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"warmup={warmup} workers={len(memory)} boot={boot:.2f}s")
+    for name in ("rss", "pss", "uss"):
+        print(
+            f"  {name} per worker: "
+            f"mean {statistics.mean(m[name] for m in memory) / 1024:.1f} MB"
+        )
+    print(
+        f"  first request {latencies[0]:.1f} ms, "
+        f"max of first {requests} {max(latencies):.1f} ms, "
+        f"median {statistics.median(latencies):.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--path", default="/api/destinations/suggest/?q=Dest")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--destinations", type=int, default=0, help="Create this many first."
+    )
+    args = parser.parse_args()
+
+    if args.destinations:
+        create_destinations(args.destinations)
+
+    for warmup in (False, True):
+        run(warmup, args.workers, args.requests, args.path, args.port)
+
+
+if __name__ == "__main__":
+    main()
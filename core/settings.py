@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "holiday_planner.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -92,9 +93,178 @@ DATABASES = {
             "POSTGRES_HOST", "localhost"
         ),  # Ensure 'localhost' for the service
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),  # Default to the standard port
+        # Check connections before handing them out (also applies to pooled ones)
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Connection pooling with psycopg_pool, one pool per worker process. Connections are
+# returned to the pool at the end of every request under both WSGI and ASGI.
+# Keep workers * POSTGRES_POOL_MAX_SIZE below the server's max_connections.
+if os.environ.get("POSTGRES_POOL", "true").lower() in ("1", "true", "yes"):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+            # Seconds to wait for a free connection before raising an error
+            "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+            # Close idle connections above min_size and recycle old ones
+            "max_idle": float(os.environ.get("POSTGRES_POOL_MAX_IDLE", 600)),
+            "max_lifetime": float(os.environ.get("POSTGRES_POOL_MAX_LIFETIME", 3600)),
+        }
+    }
+else:
+    # Without a pool, connections are opened per request unless persistent
+    # connections are enabled (only advisable under WSGI)
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("POSTGRES_CONN_MAX_AGE", 0)
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Must be shared by every server worker and management command, see
+# holiday_planner/cache.py
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "redis://localhost:6379/0"),
+    }
+}
+
+# Seconds a rendered schedule detail stays in the cache
+SCHEDULE_CACHE_TIMEOUT = int(os.environ.get("SCHEDULE_CACHE_TIMEOUT", 300))
+
+# Seconds a raw Open-Meteo response stays in the cache, and how many responses
+# each process also keeps in memory
+FORECAST_CACHE_TIMEOUT = int(os.environ.get("FORECAST_CACHE_TIMEOUT", 3600))
+FORECAST_MEMORY_CACHE_SIZE = int(os.environ.get("FORECAST_MEMORY_CACHE_SIZE", 128))
+
+# Forecast prewarming (`manage.py prewarm_forecasts`): destinations per run, how
+# far back schedule items count as recent and the upstream requests allowed per
+# run (each covers up to 100 locations)
+PREWARM_DESTINATIONS = int(os.environ.get("PREWARM_DESTINATIONS", 500))
+PREWARM_RECENT_DAYS = 30
+PREWARM_UPSTREAM_BUDGET = int(os.environ.get("PREWARM_UPSTREAM_BUDGET", 5))
+
+
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "holiday_planner.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "holiday_planner.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Quotas in cost units per client, see holiday_planner/throttling.py. Weather
+# lookups cost one unit per destination-day
+COST_THROTTLE_RATES = {
+    "weather": os.environ.get("WEATHER_THROTTLE_RATE", "2000/hour"),
+}
+# Most locations a single POST /api/weather/ may look up
+WEATHER_MAX_LOCATIONS = int(os.environ.get("WEATHER_MAX_LOCATIONS", 50))
+
+# Responses smaller than this many bytes are not worth compressing
+RESPONSE_COMPRESSION_MIN_SIZE = int(
+    os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", 1024)
+)
+# Only API responses are compressed, HTML pages carry CSRF tokens (BREACH)
+RESPONSE_COMPRESSION_TYPES = ["application/json", "application/x-msgpack"]
+RESPONSE_BROTLI_QUALITY = 5
+RESPONSE_GZIP_LEVEL = 6
+
+# Idempotency-Key support: seconds a stored response is replayed, seconds before
+# an in-flight request is presumed dead, and how long a retry waits for it
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_LOCK_TIMEOUT = 300
+IDEMPOTENCY_WAIT_TIMEOUT = 30
+
+# Weather providers, configured like CACHES. Every provider returns Open-Meteo
+# FlatBuffers responses; with a secondary, requests slower than the primary's p95
+# latency (or failing) are also sent to the secondary and the first answer wins.
+WEATHER_PROVIDERS = {
+    "primary": {
+        "BACKEND": "holiday_planner.providers.OpenMeteoProvider",
+        "URL": os.environ.get(
+            "WEATHER_PRIMARY_URL", "https://api.open-meteo.com/v1/forecast"
+        ),
+    },
+}
+if os.environ.get("WEATHER_SECONDARY_URL"):
+    WEATHER_PROVIDERS["secondary"] = {
+        "BACKEND": "holiday_planner.providers.OpenMeteoProvider",
+        "URL": os.environ["WEATHER_SECONDARY_URL"],
+    }
+# Latency samples kept per provider and the hedging delay derived from them
+WEATHER_LATENCY_WINDOW = 200
+WEATHER_HEDGE_PERCENTILE = 95
+WEATHER_HEDGE_MIN_SAMPLES = 20
+WEATHER_HEDGE_MIN_DELAY = 0.05
+WEATHER_HEDGE_DEFAULT_DELAY = 1.0
+WEATHER_HEDGE_WORKERS = 16
+# Connect and read timeouts in seconds of each Open-Meteo request attempt
+WEATHER_REQUEST_TIMEOUT = (
+    float(os.environ.get("WEATHER_CONNECT_TIMEOUT", 3.05)),
+    float(os.environ.get("WEATHER_READ_TIMEOUT", 10)),
+)
+# Longest wait in seconds for either provider once a request has been hedged
+WEATHER_HEDGE_TIMEOUT = float(os.environ.get("WEATHER_HEDGE_TIMEOUT", 30))
+
+# Destinations whose coordinates are preloaded before the server forks its
+# workers, most used first (see holiday_planner/warmup.py)
+WARMUP_DESTINATIONS = int(os.environ.get("WARMUP_DESTINATIONS", 10000))
+
+# Archival of finished schedules (`manage.py archive_schedules`): days after the
+# end of a schedule before it is archived, and schedules per transaction
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 7))
+ARCHIVE_BATCH_SIZE = 200
+
+# Server-Sent Events for schedule weather changes. A refresh only publishes an
+# event when a daily value moves by at least its threshold.
+WEATHER_CHANGE_THRESHOLDS = {
+    "weather_code": 1,
+    "precipitation_probability_max": 20,
+    "temperature_max": 3,
+    "temperature_min": 3,
+    "wind_speed_max": 15,
+}
+SSE_POLL_INTERVAL = 1
+SSE_HEARTBEAT_INTERVAL = 15
+SSE_RETRY_MS = 3000
+SSE_EVENT_TTL = 60 * 60
+SSE_EVENT_BACKLOG = 100
+
+
+# Geocoding
+# Nominatim's usage policy allows at most one request per second for the whole
+# application. The limit is counted in the shared cache configured above
+NOMINATIM_RATE_LIMIT = float(os.environ.get("NOMINATIM_RATE_LIMIT", 1))
+NOMINATIM_BURST = int(os.environ.get("NOMINATIM_BURST", 1))
+
+# Seconds a geocode call may wait for the rate limit before giving up
+NOMINATIM_MAX_QUEUE_WAIT = 10
+
+# Offline gazetteer tried before Nominatim, built with `manage.py build_gazetteer`.
+# Geocoding falls back to Nominatim only when the file does not exist.
+GAZETTEER_INDEX_PATH = os.environ.get(
+    "GAZETTEER_INDEX_PATH", BASE_DIR / "data" / "gazetteer.idx"
+)
+
+
+# Seconds before the destination autocomplete index checks for rows created by
+# other workers
+SUGGEST_REFRESH_INTERVAL = int(os.environ.get("SUGGEST_REFRESH_INTERVAL", 30))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
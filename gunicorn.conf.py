@@ -0,0 +1,42 @@
+# Production server: gunicorn managing uvicorn workers (ASGI, so the schedule
+# event streams stay cheap), with the application loaded and warmed up once in
+# the master process before the workers are forked.
+#
+#   gunicorn --config gunicorn.conf.py
+#
+# Set WARMUP=false to load the application in each worker instead.
+
+import multiprocessing
+import os
+
+wsgi_app = "core.asgi:application"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() + 1))
+worker_class = "uvicorn_worker.UvicornWorker"
+# Streams are long lived, only restart workers that stop responding entirely
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+preload_app = os.environ.get("WARMUP", "true").lower() in ("1", "true", "yes")
+
+
+def on_starting(server):
+    # Workers share state through the cache (see holiday_planner/cache.py)
+    if server.cfg.workers > 1:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+        from django.core.exceptions import ImproperlyConfigured
+        from holiday_planner.cache import require_shared_cache
+
+        try:
+            require_shared_cache(f"Running {server.cfg.workers} workers")
+        except ImproperlyConfigured as exc:
+            # gunicorn exits with this message instead of a traceback
+            raise RuntimeError(str(exc)) from exc
+
+
+def when_ready(server):
+    # Runs in the master once the (preloaded) application is imported, before
+    # the first worker is forked
+    if preload_app:
+        from holiday_planner.warmup import warmup
+
+        server.log.info("Warmup: %s", warmup())
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HolidayPlannerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "holiday_planner"
+
+    def ready(self):
+        # Register signal handlers
+        from holiday_planner import signals  # noqa: F401
@@ -0,0 +1,140 @@
+import zlib
+from datetime import timedelta
+
+import msgpack
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from holiday_planner.models import ArchivedSchedule, HolidaySchedule, ScheduleItem
+from holiday_planner.serializers import serialize_schedules
+from holiday_planner.weather_service import decode_hourly_weather_data
+
+# Archival of finished schedules.
+#
+# Schedules whose end_date lies more than ARCHIVE_AFTER_DAYS in the past are moved
+# out of the HolidaySchedule and ScheduleItem tables into ArchivedSchedule, one
+# row per schedule holding its API representation (and packed hourly forecasts)
+# as zlib compressed MessagePack. Every batch is archived and deleted in its own
+# transaction, so an interrupted run loses nothing and the next run carries on
+# where it stopped. Archived schedules keep their id and are still returned by
+# the schedule detail endpoint, decompressed on demand.
+
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+
+def pack_schedule(data, hourly_weather):
+    return zlib.compress(
+        msgpack.packb({"schedule": data, "hourly_weather": hourly_weather}),
+        ARCHIVE_COMPRESSION_LEVEL,
+    )
+
+
+def unpack_schedule(archived, hourly=False):
+    """
+    Return the API representation of an ArchivedSchedule, with the decoded
+    `hourly_weather` of each destination when `hourly`.
+    """
+    payload = msgpack.unpackb(zlib.decompress(archived.data))
+    data = payload["schedule"]
+    if hourly:
+        for item, blob in zip(data["destinations"], payload["hourly_weather"]):
+            item["hourly_weather"] = decode_hourly_weather_data(blob)
+    return data
+
+
+def archived_representation(archived, since=None, hourly=False):
+    """
+    Response data of an archived schedule: the schedule itself, or for a delta
+    request (`since`, see delta.py) an empty patch when the client is up to date
+    and the full schedule otherwise. Archived weather never changes.
+    """
+    if since is not None and since == archived.weather_version:
+        return {
+            "id": archived.pk,
+            "version": archived.weather_version,
+            "since": since,
+            "destinations": [],
+        }
+
+    data = unpack_schedule(archived, hourly=hourly)
+    if since is None:
+        return data
+    return {
+        "id": archived.pk,
+        "version": archived.weather_version,
+        "since": since,
+        "full": True,
+        "schedule": data,
+    }
+
+
+def archive_cutoff(today=None):
+    """
+    Schedules ending before this date are archived.
+    """
+    today = today or timezone.localdate()
+    return today - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+
+def archive_batch(before, batch_size):
+    """
+    Archive up to `batch_size` schedules ending before `before`, oldest ids
+    first, in one transaction. Returns the number of schedules archived.
+    """
+    with transaction.atomic():
+        ids = list(
+            HolidaySchedule.objects.filter(end_date__lt=before)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        queryset = HolidaySchedule.objects.filter(id__in=ids)
+        hourly_weather = {schedule_id: [] for schedule_id in ids}
+        for schedule_id, blob in (
+            ScheduleItem.objects.filter(holiday_schedule_id__in=ids)
+            .order_by("holiday_schedule_id", "id")
+            .values_list("holiday_schedule_id", "hourly_weather")
+        ):
+            hourly_weather[schedule_id].append(bytes(blob) if blob else None)
+
+        rows = {
+            row[0]: row
+            for row in queryset.values_list(
+                "id", "user_id", "weather_version", "created_at"
+            )
+        }
+        ArchivedSchedule.objects.bulk_create(
+            ArchivedSchedule(
+                id=data["id"],
+                user_id=rows[data["id"]][1],
+                start_date=data["start_date"],
+                end_date=data["end_date"],
+                weather_version=rows[data["id"]][2],
+                created_at=rows[data["id"]][3],
+                data=pack_schedule(data, hourly_weather[data["id"]]),
+            )
+            for data in serialize_schedules(queryset)
+        )
+        queryset.delete()
+    return len(ids)
+
+
+def archive_schedules(before=None, batch_size=None, max_batches=None):
+    """
+    Archive finished schedules batch by batch until none is left (or
+    `max_batches` were done). Returns the number of schedules archived.
+    """
+    before = before or archive_cutoff()
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(before, batch_size)
+        if not count:
+            break
+        archived += count
+        batches += 1
+    return archived
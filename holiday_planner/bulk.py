@@ -0,0 +1,383 @@
+import csv
+import io
+import json
+from datetime import date
+from itertools import groupby, islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+# Number of rows fetched per round trip when streaming schedules out of the DB
+EXPORT_CHUNK_SIZE = 500
+
+# Number of schedules inserted per transaction when importing
+IMPORT_BATCH_SIZE = 500
+
+CSV_COLUMNS = [
+    "schedule_id",
+    "user",
+    "schedule_start_date",
+    "schedule_end_date",
+    "destination",
+    "country",
+    "latitude",
+    "longitude",
+    "start_date",
+    "end_date",
+    "length_of_stay",
+    "weather_data",
+]
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# # # # # # # # #
+#     EXPORT    #
+# # # # # # # # #
+
+
+def iter_schedule_records(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield every schedule with its items as a plain dict, reading the DB in chunks
+    through a server-side cursor so memory use does not grow with the dataset.
+    """
+    if queryset is None:
+        queryset = HolidaySchedule.objects.all()
+
+    queryset = (
+        queryset.select_related("user")
+        .prefetch_related("destinations__destination")
+        .order_by("id")
+    )
+
+    for schedule in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            "id": schedule.id,
+            "user": schedule.user.username,
+            "start_date": _isoformat(schedule.start_date),
+            "end_date": _isoformat(schedule.end_date),
+            "destinations": [
+                {
+                    "destination": item.destination.name,
+                    "country": item.destination.country,
+                    "latitude": item.destination.latitude,
+                    "longitude": item.destination.longitude,
+                    "start_date": _isoformat(item.start_date),
+                    "end_date": _isoformat(item.end_date),
+                    "length_of_stay": item.length_of_stay,
+                    "weather_data": item.weather_data,
+                }
+                for item in schedule.destinations.all()
+            ],
+        }
+
+
+def iter_ndjson(records):
+    """
+    Render records as newline delimited JSON, one schedule per line.
+    """
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def iter_csv(records):
+    """
+    Render records as CSV, one row per schedule item. Schedules without items
+    are written as a single row with empty item columns.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for record in records:
+        schedule_columns = [
+            record["id"],
+            record["user"],
+            record["start_date"],
+            record["end_date"],
+        ]
+        items = record["destinations"] or [None]
+        for item in items:
+            if item is None:
+                writer.writerow(schedule_columns + [""] * 8)
+                continue
+            writer.writerow(
+                schedule_columns
+                + [
+                    item["destination"],
+                    item["country"],
+                    item["latitude"],
+                    item["longitude"],
+                    item["start_date"] or "",
+                    item["end_date"] or "",
+                    "" if item["length_of_stay"] is None else item["length_of_stay"],
+                    (
+                        ""
+                        if item["weather_data"] is None
+                        else json.dumps(item["weather_data"])
+                    ),
+                ]
+            )
+        yield flush()
+
+
+# # # # # # # # #
+#     IMPORT    #
+# # # # # # # # #
+
+
+def _check_date(record, field, required=False):
+    value = record.get(field)
+    if value is None:
+        if required:
+            raise ValueError(f"{field} is required")
+        return
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be an ISO date string")
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} {value!r} is not an ISO date") from None
+
+
+def _check_number(item, field):
+    value = item.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number")
+
+
+def validate_record(record):
+    """
+    Check the fields of an import record before it reaches the database, raising
+    ValueError with what is wrong.
+    """
+    if "user" in record and not isinstance(record["user"], str):
+        raise ValueError("user must be a username")
+    _check_date(record, "start_date", required=True)
+    _check_date(record, "end_date", required=True)
+
+    destinations = record.get("destinations", [])
+    if not isinstance(destinations, list):
+        raise ValueError("destinations must be a list")
+    for item in destinations:
+        if not isinstance(item, dict):
+            raise ValueError("destinations must be JSON objects")
+        if not isinstance(item.get("destination"), str) or not item["destination"]:
+            raise ValueError("destination must be a non-empty string")
+        if not isinstance(item.get("country") or "", str):
+            raise ValueError("country must be a string")
+        _check_number(item, "latitude")
+        _check_number(item, "longitude")
+        _check_date(item, "start_date")
+        _check_date(item, "end_date")
+        length_of_stay = item.get("length_of_stay")
+        if length_of_stay is not None and (
+            isinstance(length_of_stay, bool)
+            or not isinstance(length_of_stay, int)
+            or length_of_stay < 0
+        ):
+            raise ValueError("length_of_stay must be a non-negative integer")
+        weather_data = item.get("weather_data")
+        if weather_data is not None and not (
+            isinstance(weather_data, list)
+            and all(isinstance(day, dict) for day in weather_data)
+        ):
+            raise ValueError("weather_data must be a list of JSON objects")
+    return record
+
+
+def parse_ndjson(lines):
+    """
+    Parse newline delimited JSON schedule records, skipping blank lines. Invalid
+    records raise ValueError with their line number.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON on line {line_number}: {exc}") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        try:
+            validate_record(record)
+        except ValueError as exc:
+            raise ValueError(f"Line {line_number}: {exc}") from exc
+        yield record
+
+
+def parse_csv(lines):
+    """
+    Parse CSV rows produced by `iter_csv` back into schedule records. Rows that
+    belong to the same schedule must be consecutive. Invalid records raise
+    ValueError with the line number of their first row.
+    """
+    lines = (
+        line.decode("utf-8") if isinstance(line, bytes) else line for line in lines
+    )
+    # Line numbers after the header, rows never span lines
+    rows = enumerate(csv.DictReader(lines), start=2)
+
+    for _, schedule_rows in groupby(rows, key=lambda row: row[1]["schedule_id"]):
+        line_number, first = next(schedule_rows)
+        schedule_rows = [first] + [row for _, row in schedule_rows]
+        try:
+            record = validate_record(_csv_record(first, schedule_rows))
+        except ValueError as exc:
+            raise ValueError(f"Line {line_number}: {exc}") from exc
+        yield record
+
+
+def _csv_record(first, schedule_rows):
+    return {
+        "user": first["user"],
+        "start_date": first["schedule_start_date"],
+        "end_date": first["schedule_end_date"],
+        "destinations": [
+            {
+                "destination": row["destination"],
+                "country": row["country"],
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+                "start_date": row["start_date"] or None,
+                "end_date": row["end_date"] or None,
+                "length_of_stay": (
+                    int(row["length_of_stay"]) if row["length_of_stay"] else None
+                ),
+                "weather_data": (
+                    json.loads(row["weather_data"]) if row["weather_data"] else None
+                ),
+            }
+            for row in schedule_rows
+            if row["destination"]
+        ],
+    }
+
+
+class ScheduleImportError(ValueError):
+    """
+    An import failed part way. `imported` schedules of the earlier batches were
+    committed before the failing batch was rolled back.
+    """
+
+    def __init__(self, message, imported):
+        super().__init__(message)
+        self.imported = imported
+
+
+def import_schedule_records(records, user=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Insert schedule records with `bulk_create`, one transaction per batch.
+
+    Records are assigned to `user` when given, otherwise to the user named in
+    each record. Destinations are matched by name and created when missing.
+    Returns the number of schedules created, or raises ScheduleImportError with
+    the number created before an invalid record.
+    """
+    created = 0
+    try:
+        for batch in _batched(records, batch_size):
+            created += _import_batch(batch, user)
+    except KeyError as exc:
+        raise ScheduleImportError(
+            f"Missing field {exc} in import record", created
+        ) from exc
+    except ValueError as exc:
+        raise ScheduleImportError(str(exc), created) from exc
+    return created
+
+
+@transaction.atomic
+def _import_batch(records, user):
+    if user is None:
+        usernames = {record["user"] for record in records}
+        users = {u.username: u for u in User.objects.filter(username__in=usernames)}
+        missing_users = usernames - users.keys()
+        if missing_users:
+            raise ValueError(f"Unknown users: {', '.join(sorted(missing_users))}")
+
+    destinations = _resolve_destinations(
+        item for record in records for item in record.get("destinations", [])
+    )
+
+    schedules = HolidaySchedule.objects.bulk_create(
+        [
+            HolidaySchedule(
+                user=user or users[record["user"]],
+                start_date=_parse_date(record["start_date"]),
+                end_date=_parse_date(record["end_date"]),
+            )
+            for record in records
+        ]
+    )
+
+    items = [
+        ScheduleItem(
+            holiday_schedule=schedule,
+            destination=destinations[item["destination"]],
+            start_date=_parse_date(item.get("start_date")),
+            end_date=_parse_date(item.get("end_date")),
+            length_of_stay=item.get("length_of_stay"),
+            weather_data=item.get("weather_data"),
+        )
+        for schedule, record in zip(schedules, records)
+        for item in record.get("destinations", [])
+    ]
+    for item in items:
+        item.update_weather_summary()
+    ScheduleItem.objects.bulk_create(items)
+    return len(schedules)
+
+
+def _resolve_destinations(items):
+    """
+    Map destination names to Destination rows, creating the ones that do not exist yet.
+    """
+    wanted = {}
+    for item in items:
+        wanted.setdefault(item["destination"], item)
+
+    destinations = {}
+    for destination in Destination.objects.filter(name__in=wanted).order_by("id"):
+        destinations.setdefault(destination.name, destination)
+
+    missing = [
+        Destination(
+            name=name,
+            country=item.get("country") or "",
+            latitude=item["latitude"],
+            longitude=item["longitude"],
+        )
+        for name, item in wanted.items()
+        if name not in destinations
+    ]
+    for destination in missing:
+        destination.update_geohash()
+    for destination in Destination.objects.bulk_create(missing):
+        destinations[destination.name] = destination
+
+    return destinations
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+# Cache backends whose data only lives in the current process. Cache
+# invalidation, the schedule event log, quotas, idempotency keys and the
+# geocoding rate limit are only correct when every server worker and management
+# command sees the same cache, which must implement `incr` atomically (Redis by
+# default, see CACHES in the settings). With a process-local backend each
+# process would keep its own copy of that state, so gunicorn refuses to start
+# several workers on one and the commands and event log call
+# require_shared_cache.
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def is_shared_cache(alias="default"):
+    """
+    Whether the cache `alias` is visible to other processes.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def require_shared_cache(purpose, alias="default"):
+    """
+    Raise ImproperlyConfigured when `purpose` would silently only affect this
+    process because the cache `alias` is not shared.
+    """
+    if not is_shared_cache(alias):
+        raise ImproperlyConfigured(
+            f"{purpose} needs a cache shared between processes, but the "
+            f"{alias!r} cache uses {settings.CACHES[alias]['BACKEND']}. Set "
+            "CACHE_BACKEND and CACHE_LOCATION to a shared backend such as Redis."
+        )
+
+
+# Rendered schedule details are stored under the schedule's current version token.
+# Invalidating a schedule swaps the token, which orphans every cached entry for it
+# without having to know which variants were cached.
+
+
+def _version_key(schedule_id):
+    return f"holiday_planner:schedule:{schedule_id}:version"
+
+
+def _entry_key(schedule_id, version, variant):
+    return f"holiday_planner:schedule:{schedule_id}:{version}:{variant}"
+
+
+def get_schedule_version(schedule_id):
+    """
+    Return the current cache version token of a schedule, creating one if needed.
+    """
+    key = _version_key(schedule_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_cached_schedule(schedule_id, variant):
+    """
+    Return `(version, entry)` for a schedule detail, `entry` is None on a miss.
+    The version must be passed back to `set_cached_schedule` so an entry computed
+    while the schedule was being written is never served.
+    """
+    version = get_schedule_version(schedule_id)
+    return version, cache.get(_entry_key(schedule_id, version, variant))
+
+
+def set_cached_schedule(schedule_id, version, variant, entry):
+    cache.set(
+        _entry_key(schedule_id, version, variant),
+        entry,
+        timeout=settings.SCHEDULE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_schedule(schedule_id):
+    """
+    Drop all cached details of a schedule. This happens immediately and again once
+    the current transaction commits, so a reader racing the write cannot cache the
+    old rows under the new version.
+    """
+
+    def bump():
+        cache.set(_version_key(schedule_id), uuid.uuid4().hex, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+# Raw Open-Meteo responses (FlatBuffers bytes) are cached as-is and decoded lazily
+# by the caller. A small per-process LRU in front of the shared cache makes repeat
+# hits skip the cache backend round trip and unpickling entirely.
+
+_forecasts = OrderedDict()
+_forecasts_lock = threading.Lock()
+
+
+def _forecast_key(params):
+    fingerprint = json.dumps(params, sort_keys=True, default=str)
+    return f"holiday_planner:forecast:{hashlib.md5(fingerprint.encode()).hexdigest()}"
+
+
+def get_cached_forecast(params):
+    """
+    Return the raw response bytes cached for the Open-Meteo query `params`, or None.
+    """
+    key = _forecast_key(params)
+    now = time.monotonic()
+    with _forecasts_lock:
+        if key in _forecasts:
+            expires_at, raw = _forecasts[key]
+            if expires_at > now:
+                _forecasts.move_to_end(key)
+                return raw
+            del _forecasts[key]
+
+    raw = cache.get(key)
+    if raw is not None:
+        _remember_forecast(key, raw)
+    return raw
+
+
+def set_cached_forecast(params, raw):
+    key = _forecast_key(params)
+    cache.set(key, raw, timeout=settings.FORECAST_CACHE_TIMEOUT)
+    _remember_forecast(key, raw)
+
+
+def _remember_forecast(key, raw):
+    expires_at = time.monotonic() + settings.FORECAST_CACHE_TIMEOUT
+    with _forecasts_lock:
+        _forecasts[key] = (expires_at, raw)
+        _forecasts.move_to_end(key)
+        while len(_forecasts) > settings.FORECAST_MEMORY_CACHE_SIZE:
+            _forecasts.popitem(last=False)
+
+
+def clear_cached_forecasts():
+    """
+    Empty this process' in-memory forecast LRU (the shared cache is left as is).
+    """
+    with _forecasts_lock:
+        _forecasts.clear()
@@ -0,0 +1,148 @@
+import warnings
+
+import numpy as np
+from holiday_planner.weather_service import (
+    DAILY_VARIABLES,
+    WEATHER_COLUMNS,
+    parse_forecast,
+    read_columns,
+)
+
+# Limits of a single comparison
+COMPARE_MAX_DESTINATIONS = 50
+COMPARE_MAX_DAYS = 16
+
+# Variables that can be compared, by output name (see `weather_columns`)
+COMPARE_VARIABLES = {"weather_code": "weather_code", **WEATHER_COLUMNS}
+DEFAULT_COMPARE_VARIABLES = [
+    "temperature_max",
+    "temperature_min",
+    "precipitation_probability_max",
+    "weather_code",
+]
+
+# WMO codes for drizzle, rain, rain showers and thunderstorms
+RAIN_CODES = [51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82, 95, 96, 99]
+RAINY_PROBABILITY = 50
+
+# Comfort score: 100 on a dry, calm day with a maximum of IDEAL_TEMPERATURE
+IDEAL_TEMPERATURE = 22
+TEMPERATURE_PENALTY = 3  # per degree away from ideal
+PRECIPITATION_PENALTY = 0.4  # per percent of precipitation probability
+WIND_PENALTY = 1  # per km/h above CALM_WIND
+CALM_WIND = 20
+
+# Daily variables the summary is computed from
+SUMMARY_VARIABLES = [
+    "temperature_2m_max",
+    "precipitation_probability_max",
+    "weather_code",
+    "wind_speed_10m_max",
+]
+
+
+def forecast_matrix(raws, variables):
+    """
+    Stack the daily `variables` (Open-Meteo names) of single location responses
+    into `(times, {variable: N x D array})`. Times are the local midnights of the
+    days, as if they were UTC, so their dates are the local dates.
+    """
+    rows = {variable: [] for variable in variables}
+    times = None
+    for raw in raws:
+        response = parse_forecast(raw)[0]
+        location_times, columns = read_columns(
+            response, "daily", DAILY_VARIABLES, names=set(variables)
+        )
+        location_times = location_times + response.UtcOffsetSeconds()
+        if times is None:
+            times = location_times
+        elif not np.array_equal(times, location_times):
+            raise ValueError("Forecasts cover different days")
+        for variable in variables:
+            rows[variable].append(columns[variable])
+
+    if times is None:
+        return np.array([], dtype="i8"), {}
+    return times, {variable: np.vstack(rows[variable]) for variable in variables}
+
+
+def comfort_scores(temperature_max, precipitation_probability, wind_speed):
+    """
+    Daily comfort scores between 0 and 100 for N x D arrays.
+    """
+    score = (
+        100
+        - TEMPERATURE_PENALTY * np.abs(temperature_max - IDEAL_TEMPERATURE)
+        - PRECIPITATION_PENALTY * precipitation_probability
+        - WIND_PENALTY * np.maximum(wind_speed - CALM_WIND, 0)
+    )
+    return np.clip(score, 0, 100)
+
+
+def _rounded(matrix, decimals=0):
+    # Nested lists like the daily weather output, None for missing values
+    rounded = np.round(matrix.astype("f8"), decimals)
+    if not np.isnan(rounded).any():
+        return (rounded.astype("i8") if decimals == 0 else rounded).tolist()
+    return [
+        [None if v != v else (round(v) if decimals == 0 else v) for v in row]
+        for row in rounded.tolist()
+    ]
+
+
+def compare_forecasts(place_names, raws, variables=DEFAULT_COMPARE_VARIABLES):
+    """
+    Build the destination x day comparison of single location daily responses
+    `raws`, one per place name, with summary statistics per destination.
+    """
+    wanted = {COMPARE_VARIABLES[name] for name in variables}
+    times, matrix = forecast_matrix(raws, sorted(wanted | set(SUMMARY_VARIABLES)))
+
+    dates = np.datetime_as_string(times.astype("datetime64[s]"), unit="D").tolist()
+    result = {
+        "destinations": list(place_names),
+        "dates": dates,
+        "variables": {
+            name: (
+                _rounded(matrix[COMPARE_VARIABLES[name]], 1)
+                if name == "weather_code"
+                else _rounded(matrix[COMPARE_VARIABLES[name]])
+            )
+            for name in variables
+        },
+        "summary": [],
+    }
+    if not dates:
+        return result
+
+    temperature_max = matrix["temperature_2m_max"]
+    precipitation = matrix["precipitation_probability_max"]
+    rainy = np.isin(matrix["weather_code"], RAIN_CODES) | (
+        precipitation >= RAINY_PROBABILITY
+    )
+    comfort = comfort_scores(
+        temperature_max, precipitation, matrix["wind_speed_10m_max"]
+    )
+
+    with warnings.catch_warnings():
+        # Destinations without any value get a NaN mean
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_temperature_max = np.nanmean(temperature_max, axis=1)
+        mean_comfort = np.nanmean(comfort, axis=1)
+
+    result["summary"] = [
+        {
+            "place_name": place_name,
+            "mean_temperature_max": None if np.isnan(mean_t) else round(mean_t, 1),
+            "rainy_days": rainy_days,
+            "comfort_score": None if np.isnan(score) else round(score, 1),
+        }
+        for place_name, mean_t, rainy_days, score in zip(
+            place_names,
+            mean_temperature_max.tolist(),
+            rainy.sum(axis=1).tolist(),
+            mean_comfort.tolist(),
+        )
+    ]
+    return result
@@ -0,0 +1,87 @@
+import hashlib
+from collections import namedtuple
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, quote_etag
+
+ScheduleValidators = namedtuple(
+    "ScheduleValidators",
+    ["etag", "last_modified", "count", "weather_version"],
+    defaults=[None],
+)
+
+
+def get_schedule_validators(request, queryset):
+    """
+    Derive an ETag and Last-Modified timestamp for the schedules in `queryset` from
+    the schedule and schedule item `updated_at` columns in a single aggregate query,
+    without serializing anything. `weather_version` is only meaningful for a
+    single schedule.
+    """
+    aggregates = queryset.order_by().aggregate(
+        count=Count("id", distinct=True),
+        item_count=Count("destinations"),
+        schedule_updated_at=Max("updated_at"),
+        item_updated_at=Max("destinations__updated_at"),
+        weather_version=Max("weather_version"),
+    )
+
+    timestamps = [
+        aggregates[key]
+        for key in ("schedule_updated_at", "item_updated_at")
+        if aggregates[key] is not None
+    ]
+    last_modified = max(timestamps) if timestamps else None
+
+    # The representation also depends on the URL (query params) and the renderer
+    fingerprint = "|".join(
+        str(part)
+        for part in (
+            request.get_full_path(),
+            getattr(request, "accepted_media_type", ""),
+            aggregates["count"],
+            aggregates["item_count"],
+            aggregates["schedule_updated_at"],
+            aggregates["item_updated_at"],
+        )
+    )
+    etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    return ScheduleValidators(
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+        count=aggregates["count"],
+        weather_version=aggregates["weather_version"],
+    )
+
+
+def get_archived_validators(request, archived):
+    """
+    Validators of an ArchivedSchedule, which never changes once archived.
+    """
+    fingerprint = "|".join(
+        str(part)
+        for part in (
+            request.get_full_path(),
+            getattr(request, "accepted_media_type", ""),
+            archived.pk,
+            archived.archived_at,
+        )
+    )
+    return ScheduleValidators(
+        etag=quote_etag(hashlib.md5(fingerprint.encode()).hexdigest()),
+        last_modified=int(archived.archived_at.timestamp()),
+        count=1,
+        weather_version=archived.weather_version,
+    )
+
+
+def set_validator_headers(response, validators):
+    """
+    Add the ETag and Last-Modified headers to a response.
+    """
+    if validators.etag and not response.has_header("ETag"):
+        response["ETag"] = validators.etag
+    if validators.last_modified and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(validators.last_modified)
+    return response
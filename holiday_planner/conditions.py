@@ -0,0 +1,41 @@
+# Queryable weather conditions.
+#
+# The daily forecast of a schedule item lives in its `weather_data` JSON, which
+# the database cannot filter on efficiently. Every write of `weather_data` also
+# stores a summary of it in plain, indexed ScheduleItem columns, so questions
+# like "which upcoming items have a precipitation probability above 80%?" are a
+# single indexed query instead of loading every JSON blob into Python.
+
+SUMMARY_FIELDS = [
+    "max_precipitation_probability",
+    "min_temperature",
+    "worst_weather_code",
+]
+
+
+def _values(weather_data, key):
+    return [
+        day[key]
+        for day in weather_data or []
+        if isinstance(day, dict) and isinstance(day.get(key), (int, float))
+        # NaN never compares, leave it out
+        and day[key] == day[key]
+    ]
+
+
+def summarize_weather(weather_data):
+    """
+    Summary columns of a list of daily weather dicts, None where no day has the
+    value. WMO weather codes grow with severity (clear, clouds, fog, drizzle,
+    rain, snow, showers, thunderstorms), so the worst code is the highest one.
+    """
+    precipitation = _values(weather_data, "precipitation_probability_max")
+    temperature = _values(weather_data, "temperature_min")
+    codes = _values(weather_data, "weather_code")
+    return {
+        "max_precipitation_probability": (
+            round(max(precipitation)) if precipitation else None
+        ),
+        "min_temperature": min(temperature) if temperature else None,
+        "worst_weather_code": int(max(codes)) if codes else None,
+    }
@@ -0,0 +1,44 @@
+# Delta responses for schedule weather (`?since=<version>`).
+#
+# Every write of weather data bumps the schedule's `weather_version` and each item
+# records, per day, the version at which that day last changed. A client that
+# knows version N then only needs the days changed after N instead of the whole
+# schedule. When the items themselves were replaced after N (an update with new
+# destinations) the client gets the full schedule instead.
+
+
+def weather_day_versions(old_weather, new_weather, old_versions, version):
+    """
+    Return `{date: version}` for the days of `new_weather`: days equal to the
+    same day in `old_weather` keep their version from `old_versions` (0 when
+    unknown), changed and new days get `version`.
+    """
+    old_days = {day["date"]: day for day in old_weather or []}
+    old_versions = old_versions or {}
+    return {
+        day["date"]: (
+            old_versions.get(day["date"], 0)
+            if old_days.get(day["date"]) == day
+            else version
+        )
+        for day in new_weather or []
+    }
+
+
+def weather_patch(items, since):
+    """
+    Build the patch of `(weather_data, weather_versions)` pairs, in the order the
+    schedule lists its destinations: one `{"index", "days"}` entry per item with
+    days changed after version `since`, holding those days in full.
+    """
+    patch = []
+    for index, (weather_data, weather_versions) in enumerate(items):
+        weather_versions = weather_versions or {}
+        days = [
+            day
+            for day in weather_data or []
+            if weather_versions.get(day["date"], 0) > since
+        ]
+        if days:
+            patch.append({"index": index, "days": days})
+    return patch
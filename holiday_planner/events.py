@@ -0,0 +1,238 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from holiday_planner.conditions import SUMMARY_FIELDS
+from holiday_planner.cache import invalidate_schedule, require_shared_cache
+from holiday_planner.delta import weather_day_versions
+from holiday_planner.models import HolidaySchedule, ScheduleItem
+from holiday_planner.weather_service import fetch_weather_data
+
+# Material weather changes of a schedule, published once per refresh and pushed to
+# every Server-Sent Events listener of that schedule.
+#
+# Events are appended to a per schedule log in the cache under an increasing
+# sequence number, which doubles as the SSE event id. Each ASGI process runs one
+# poller per watched schedule and fans new events out to all of its listeners, so
+# the cache is read once per interval per schedule, not once per connection.
+#
+# Events are published by the refresh command and read by the server workers,
+# through the shared cache (see cache.py).
+
+KEY_PREFIX = "holiday_planner:events:"
+
+
+def _sequence_key(schedule_id):
+    return f"{KEY_PREFIX}{schedule_id}:sequence"
+
+
+def _event_key(schedule_id, sequence):
+    return f"{KEY_PREFIX}{schedule_id}:{sequence}"
+
+
+def _require_shared_log():
+    require_shared_cache("The schedule event log")
+
+
+def publish(schedule_id, event):
+    """
+    Append an event to the schedule's log and return its sequence number.
+    """
+    _require_shared_log()
+    key = _sequence_key(schedule_id)
+    cache.add(key, 0, timeout=None)
+    sequence = cache.incr(key)
+    cache.set(_event_key(schedule_id, sequence), event, timeout=settings.SSE_EVENT_TTL)
+    return sequence
+
+
+def latest_sequence(schedule_id):
+    _require_shared_log()
+    return cache.get(_sequence_key(schedule_id)) or 0
+
+
+def read_events(schedule_id, after):
+    """
+    Return `(sequence, event)` pairs published after sequence `after`, oldest
+    first. Expired events are skipped.
+    """
+    last = latest_sequence(schedule_id)
+    first = max(after + 1, last - settings.SSE_EVENT_BACKLOG + 1)
+    if first > last:
+        return []
+
+    keys = {
+        _event_key(schedule_id, sequence): sequence
+        for sequence in range(first, last + 1)
+    }
+    events = cache.get_many(keys)
+    return [(keys[key], events[key]) for key in keys if key in events]
+
+
+# # # # # # # # # # #
+#  CHANGE DETECTION #
+# # # # # # # # # # #
+
+
+def material_changes(old_weather, new_weather, thresholds=None):
+    """
+    Compare two daily weather lists and return the days whose values moved by at
+    least the configured threshold (`WEATHER_CHANGE_THRESHOLDS`), e.g.
+    `{"date": ..., "changed": {"weather_code": [3.0, 61.0]}}`.
+    Days only present in one of the lists are ignored.
+    """
+    if thresholds is None:
+        thresholds = settings.WEATHER_CHANGE_THRESHOLDS
+
+    old_days = {day["date"]: day for day in old_weather or []}
+    changes = []
+    for day in new_weather or []:
+        before = old_days.get(day["date"])
+        if before is None:
+            continue
+
+        changed = {}
+        for key, threshold in thresholds.items():
+            old_value, new_value = before.get(key), day.get(key)
+            if old_value is None or new_value is None:
+                continue
+            if abs(new_value - old_value) >= threshold:
+                changed[key] = [old_value, new_value]
+        if changed:
+            changes.append({"date": day["date"], "changed": changed})
+    return changes
+
+
+def refresh_schedule_weather(schedule_id):
+    """
+    Re-fetch the weather of every dated item of a schedule, save what changed
+    under a new weather version and publish a single event when any change is
+    material. Returns the event, or None when nothing changed materially.
+    """
+    items = (
+        ScheduleItem.objects.filter(
+            holiday_schedule_id=schedule_id,
+            start_date__isnull=False,
+            end_date__isnull=False,
+        )
+        .select_related("destination")
+        .order_by("id")
+    )
+
+    now = timezone.now()
+    updated, destinations = [], []
+    for item in items:
+        weather_data = fetch_weather_data(
+            latitude=item.destination.latitude,
+            longitude=item.destination.longitude,
+            start_date=item.start_date,
+            end_date=item.end_date,
+        )
+        if weather_data == item.weather_data:
+            continue
+
+        changes = material_changes(item.weather_data, weather_data)
+        updated.append((item, weather_data))
+        if changes:
+            destinations.append({"destination": item.destination.name, "days": changes})
+
+    if updated:
+        with transaction.atomic():
+            version = (
+                HolidaySchedule.objects.select_for_update()
+                .filter(pk=schedule_id)
+                .values_list("weather_version", flat=True)
+                .first()
+            )
+            if version is None:
+                return None
+            version += 1
+
+            for item, weather_data in updated:
+                item.weather_versions = weather_day_versions(
+                    item.weather_data, weather_data, item.weather_versions, version
+                )
+                item.weather_data = weather_data
+                item.update_weather_summary()
+                item.updated_at = now
+            # bulk_update skips the post_save signal that invalidates cached details
+            ScheduleItem.objects.bulk_update(
+                [item for item, _ in updated],
+                ["weather_data", "weather_versions", *SUMMARY_FIELDS, "updated_at"],
+            )
+            HolidaySchedule.objects.filter(pk=schedule_id).update(
+                weather_version=version
+            )
+        invalidate_schedule(schedule_id)
+
+    if not destinations:
+        return None
+    event = {"schedule": schedule_id, "destinations": destinations}
+    publish(schedule_id, event)
+    return event
+
+
+# # # # # # # # # #
+#     FAN OUT     #
+# # # # # # # # # #
+
+
+class EventBroker:
+    """
+    Per process fan-out of schedule events to asyncio queues.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._pollers = {}
+
+    async def subscribe(self, schedule_id):
+        """
+        Return a queue receiving the schedule's `(sequence, event)` pairs. Events
+        published before this returns may be missing, read them with
+        `read_events` afterwards.
+        """
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(schedule_id, set()).add(queue)
+        if not self._polling(schedule_id):
+            last = await sync_to_async(latest_sequence)(schedule_id)
+            # Another subscriber may have started one in the meantime
+            if not self._polling(schedule_id):
+                self._pollers[schedule_id] = asyncio.ensure_future(
+                    self._poll(schedule_id, last)
+                )
+        return queue
+
+    def _polling(self, schedule_id):
+        poller = self._pollers.get(schedule_id)
+        # A poller left behind by another event loop (e.g. in tests) never runs
+        return (
+            poller is not None
+            and not poller.done()
+            and poller.get_loop() is asyncio.get_running_loop()
+        )
+
+    def unsubscribe(self, schedule_id, queue):
+        subscribers = self._subscribers.get(schedule_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[schedule_id]
+            poller = self._pollers.pop(schedule_id, None)
+            if poller is not None:
+                poller.cancel()
+
+    async def _poll(self, schedule_id, last):
+        while self._subscribers.get(schedule_id):
+            await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+            for sequence, event in await sync_to_async(read_events)(schedule_id, last):
+                last = sequence
+                for queue in list(self._subscribers.get(schedule_id, ())):
+                    queue.put_nowait((sequence, event))
+
+
+broker = EventBroker()
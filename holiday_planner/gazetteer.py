@@ -0,0 +1,307 @@
+import mmap
+import os
+import re
+import struct
+import tempfile
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+# Offline gazetteer backed by a sorted, memory-mapped index file.
+#
+# File layout (little endian):
+#   header   magic, version, entry count and size of the string area
+#   entries  fixed size records sorted by (normalized name, -population)
+#   strings  UTF-8 normalized names, display names and country names
+#
+# The entries are viewed in place with numpy, so opening the index costs no
+# parsing and the pages are shared between every process that maps the file.
+# Rebuilds write a new file and rename it over the old one, so processes that
+# still map the old file keep reading it intact and pick up the new one on their
+# next lookup.
+
+MAGIC = b"HPGZ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+ENTRY_DTYPE = np.dtype(
+    [
+        ("key_offset", "<u4"),
+        ("key_length", "<u2"),
+        ("name_length", "<u2"),
+        ("latitude", "<f4"),
+        ("longitude", "<f4"),
+        ("population", "<u4"),
+        ("country_offset", "<u4"),
+        ("country_length", "<u2"),
+        ("country_code", "S2"),
+    ]
+)
+
+GazetteerLocation = namedtuple(
+    "GazetteerLocation",
+    ["name", "country", "country_code", "latitude", "longitude", "population"],
+)
+# Same shape as geopy's Location.address, which callers split to get the country
+GazetteerLocation.address = property(lambda self: f"{self.name}, {self.country}")
+
+
+def normalize_name(name):
+    """
+    Normalize a place name for lookups: strip accents, case fold and collapse
+    punctuation and whitespace, e.g. "Saint-Étienne" -> "saint etienne".
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.split(r"[\W_]+", stripped.casefold())).strip()
+
+
+def build_index(rows, path):
+    """
+    Write an index file from `(names, display_name, country_code, country,
+    latitude, longitude, population)` rows, where `names` are all the names the
+    place is known by.
+    Returns the number of entries written.
+    """
+    entries = []
+    for names, display_name, code, country, latitude, longitude, population in rows:
+        for key in {normalize_name(name) for name in names if name}:
+            if key:
+                entries.append(
+                    (key, display_name, code, country, latitude, longitude, population)
+                )
+    entries.sort(key=lambda entry: (entry[0].encode(), -entry[6]))
+
+    strings = bytearray()
+    countries = {}
+    records = np.zeros(len(entries), dtype=ENTRY_DTYPE)
+
+    for i, entry in enumerate(entries):
+        key, display_name, code, country, latitude, longitude, population = entry
+        if country not in countries:
+            countries[country] = len(strings)
+            strings += country.encode()
+
+        key_bytes, name_bytes = key.encode(), display_name.encode()
+        records[i] = (
+            len(strings),
+            len(key_bytes),
+            len(name_bytes),
+            latitude,
+            longitude,
+            min(population, 2**32 - 1),
+            countries[country],
+            len(country.encode()),
+            code.encode()[:2],
+        )
+        strings += key_bytes + name_bytes
+
+    # Never truncate the file in place, other processes may have it mapped
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), len(strings)))
+            f.write(records.tobytes())
+            f.write(strings)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return len(records)
+
+
+def read_geonames(lines, countries=None, min_population=0, alternate_names=False):
+    """
+    Turn a GeoNames dump (e.g. cities15000.txt) into rows for `build_index`.
+    `countries` maps ISO country codes to country names (see `read_country_info`).
+    """
+    countries = countries or {}
+    for line in lines:
+        columns = line.rstrip("\n").split("\t")
+        if len(columns) < 15:
+            continue
+
+        population = int(columns[14] or 0)
+        if population < min_population:
+            continue
+
+        names = [columns[1], columns[2]]
+        if alternate_names:
+            names += columns[3].split(",")
+
+        yield (
+            names,
+            columns[1],
+            columns[8],
+            countries.get(columns[8], columns[8]),
+            float(columns[4]),
+            float(columns[5]),
+            population,
+        )
+
+
+def read_country_info(lines):
+    """
+    Map ISO country codes to names from GeoNames' countryInfo.txt.
+    """
+    countries = {}
+    for line in lines:
+        if line.startswith("#"):
+            continue
+        columns = line.rstrip("\n").split("\t")
+        if len(columns) > 4:
+            countries[columns[0]] = columns[4]
+    return countries
+
+
+class Gazetteer:
+    """
+    Read-only view over an index file written by `build_index`.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, _ = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a gazetteer index (version {VERSION})")
+
+        self.entries = np.frombuffer(
+            self._mmap, dtype=ENTRY_DTYPE, count=count, offset=HEADER.size
+        )
+        self._strings_offset = HEADER.size + count * ENTRY_DTYPE.itemsize
+        self._key_offsets = self.entries["key_offset"]
+        self._key_lengths = self.entries["key_length"]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _string(self, offset, length):
+        start = self._strings_offset + int(offset)
+        return self._mmap[start : start + int(length)]
+
+    def _key(self, i):
+        return self._string(self._key_offsets[i], self._key_lengths[i])
+
+    def _bisect(self, key):
+        # Leftmost entry whose key is >= `key`
+        low, high = 0, len(self.entries)
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _location(self, i):
+        entry = self.entries[i]
+        name_offset = entry["key_offset"] + entry["key_length"]
+        return GazetteerLocation(
+            name=self._string(name_offset, entry["name_length"]).decode(),
+            country=self._string(
+                entry["country_offset"], entry["country_length"]
+            ).decode(),
+            country_code=entry["country_code"].decode(),
+            latitude=float(entry["latitude"]),
+            longitude=float(entry["longitude"]),
+            population=int(entry["population"]),
+        )
+
+    def _matches(self, key):
+        i = self._bisect(key)
+        while i < len(self.entries) and self._key(i) == key:
+            yield i
+            i += 1
+
+    def lookup(self, place_name):
+        """
+        Return the most populous place called `place_name`, or None. A trailing
+        ", <country>" restricts the match to that country (name or ISO code).
+        """
+        key = normalize_name(place_name).encode()
+        for i in self._matches(key):
+            return self._location(i)
+
+        name, _, country = place_name.rpartition(",")
+        if name and country.strip():
+            key, country = normalize_name(name).encode(), normalize_name(country)
+            for i in self._matches(key):
+                location = self._location(i)
+                if country in (
+                    normalize_name(location.country),
+                    normalize_name(location.country_code),
+                ):
+                    return location
+        return None
+
+    def prefix_search(self, prefix, limit=10, scan=500):
+        """
+        Return up to `limit` places whose normalized name starts with `prefix`,
+        most populous first. At most `scan` matching names are considered.
+        """
+        key = normalize_name(prefix).encode()
+        if not key:
+            return []
+
+        matches = []
+        i = self._bisect(key)
+        while i < len(self.entries) and len(matches) < scan:
+            if not self._key(i).startswith(key):
+                break
+            matches.append(i)
+            i += 1
+
+        matches.sort(key=lambda i: -int(self.entries[i]["population"]))
+        locations, seen = [], set()
+        for i in matches:
+            location = self._location(i)
+            # Alternate names of the same place point at the same display name
+            if (location.name, location.country) in seen:
+                continue
+            seen.add((location.name, location.country))
+            locations.append(location)
+            if len(locations) == limit:
+                break
+        return locations
+
+    def close(self):
+        self.entries = None
+        self._mmap.close()
+
+
+_gazetteer = None
+_gazetteer_file = None
+
+
+def get_gazetteer(path):
+    """
+    Return the process wide Gazetteer for `path`, or None if there is no index.
+    The file is checked on every call, so an index built or rebuilt after the
+    process started is picked up without a restart.
+    """
+    global _gazetteer, _gazetteer_file
+
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    # A rebuild replaces the file, which gives it a new inode
+    file = (str(path), stat.st_ino, stat.st_mtime_ns)
+    if file != _gazetteer_file:
+        # The replaced index stays mapped until no lookup uses it any more
+        _gazetteer = Gazetteer(path)
+        _gazetteer_file = file
+    return _gazetteer
@@ -0,0 +1,84 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5m cells, plenty for destinations
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points in kilometres.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+
+    while len(geohash) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision):
+    """
+    Return the (height, width) of a geohash cell in degrees.
+    """
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def geohash_precision_for_radius(latitude, radius_km):
+    """
+    Return the finest geohash precision whose cells are at least `radius_km`
+    across at `latitude`, so a point's cell and its 8 neighbours cover the whole
+    search circle. Returns None when even a single character is too fine.
+    """
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    # Cells get narrower towards the poles, use the circle's most polar latitude
+    widest_latitude = min(89.9, abs(latitude) + radius_km / km_per_degree)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        height_km = height * km_per_degree
+        width_km = width * km_per_degree * math.cos(math.radians(widest_latitude))
+        if min(height_km, width_km) >= radius_km:
+            return precision
+    return None
+
+
+def geohash_neighbourhood(latitude, longitude, precision):
+    """
+    Return the geohash of the cell containing the point and of its neighbours.
+    """
+    height, width = geohash_cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            lat = min(90.0, max(-90.0, latitude + dlat))
+            lon = (longitude + dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return cells
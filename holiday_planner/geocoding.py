@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db.models import Count
+from geopy.geocoders import Nominatim
+from holiday_planner import metrics
+from holiday_planner.gazetteer import GazetteerLocation, get_gazetteer
+from holiday_planner.models import Destination
+from holiday_planner.ratelimit import RateLimitTimeout, SharedRateLimiter
+from rest_framework.exceptions import Throttled
+
+geolocator = Nominatim(user_agent="holiday_planner")
+
+metrics.register(
+    "geocoder.preloaded_hits",
+    "geocoder.gazetteer_hits",
+    "geocoder.requests",
+    "geocoder.queue_timeouts",
+    "geocoder.queue_wait.count",
+    "geocoder.queue_wait.total_ms",
+)
+
+
+# Coordinates of known destinations by name, filled by `preload_destinations`
+# before the server forks its workers (see warmup.py) and only read afterwards
+preloaded_locations = {}
+
+
+def preload_destinations(limit):
+    """
+    Load the coordinates of the `limit` destinations used by the most schedule
+    items, so geocoding them needs neither the gazetteer nor Nominatim.
+    """
+    rows = (
+        Destination.objects.annotate(uses=Count("scheduleitem"))
+        .order_by("-uses", "id")
+        .values_list("name", "country", "latitude", "longitude")[:limit]
+    )
+    preloaded_locations.clear()
+    for name, country, latitude, longitude in rows:
+        # First (most used) row wins when names are duplicated
+        preloaded_locations.setdefault(
+            name, GazetteerLocation(name, country, "", latitude, longitude, 0)
+        )
+    return len(preloaded_locations)
+
+
+def geocode(place_name):
+    """
+    Geocode a place name, first in the preloaded destinations and the offline
+    gazetteer and then with Nominatim, retrying behind the application wide rate
+    limit for up to `NOMINATIM_MAX_QUEUE_WAIT` seconds. Callers are not ordered
+    or prioritised, see `SharedRateLimiter`.
+    """
+    location = preloaded_locations.get(place_name)
+    if location is not None:
+        metrics.incr("geocoder.preloaded_hits")
+        return location
+
+    gazetteer = get_gazetteer(settings.GAZETTEER_INDEX_PATH)
+    if gazetteer is not None:
+        location = gazetteer.lookup(place_name)
+        if location is not None:
+            metrics.incr("geocoder.gazetteer_hits")
+            return location
+
+    limiter = SharedRateLimiter(
+        "nominatim",
+        rate=settings.NOMINATIM_RATE_LIMIT,
+        burst=settings.NOMINATIM_BURST,
+    )
+    try:
+        waited = limiter.acquire(timeout=settings.NOMINATIM_MAX_QUEUE_WAIT)
+    except RateLimitTimeout as exc:
+        metrics.incr("geocoder.queue_timeouts")
+        raise Throttled(
+            wait=exc.wait, detail="The geocoding service is busy, try again later."
+        )
+
+    metrics.observe("geocoder.queue_wait", waited)
+    metrics.incr("geocoder.requests")
+    return geolocator.geocode(place_name)
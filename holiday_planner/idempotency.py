@@ -0,0 +1,152 @@
+import functools
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from holiday_planner import metrics
+
+# Idempotency-Key support for non-idempotent POST endpoints.
+#
+# The first request with a given key marks the key as in flight, runs the view and
+# stores its response for IDEMPOTENCY_KEY_TTL seconds. Retries with the same key
+# get the stored response without running the view again, and retries that arrive
+# while the first request is still running wait for it to finish.
+#
+# Keys live in the shared cache (see cache.py).
+#
+# The fingerprint covers the negotiated media type as well as the body: the stored
+# data depends on the renderer (the columnar MessagePack renderer gets the forecast
+# columns undecoded), so a retry asking for another format must not replay it.
+
+HEADER = "Idempotency-Key"
+KEY_PREFIX = "holiday_planner:idempotency:"
+MAX_KEY_LENGTH = 255
+
+IN_FLIGHT = "in_flight"
+DONE = "done"
+
+# Seconds between checks while waiting for an in-flight request
+POLL_INTERVAL = 0.05
+
+metrics.register("idempotency.replayed", "idempotency.waited", "idempotency.conflicts")
+
+
+def _cache_key(request, key):
+    # Keys are scoped per endpoint and per user, or per client address for
+    # anonymous clients (like the quotas, see throttling.py)
+    if request.user.is_authenticated:
+        client = f"user:{request.user.pk}"
+    else:
+        client = f"ip:{BaseThrottle().get_ident(request)}"
+    scope = f"{client}:{request.method}:{request.path}:{key}"
+    return KEY_PREFIX + hashlib.sha256(scope.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    payload = json.dumps(
+        {"media_type": request.accepted_media_type, "data": request.data},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _replay(entry):
+    response = Response(entry["data"], status=entry["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _error(message, status_code):
+    return Response({"error": message}, status=status_code)
+
+
+def _wait_for(cache_key, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is None or entry["state"] == DONE:
+            return entry
+    return cache.get(cache_key)
+
+
+def idempotent(view_method):
+    """
+    Make a view method honour the `Idempotency-Key` request header.
+
+    Only responses below 500 are stored. If the view raises or fails, the key is
+    released so a retry runs it again.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(
+                f"{HEADER} must be at most {MAX_KEY_LENGTH} characters",
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+        in_flight = {"state": IN_FLIGHT, "fingerprint": fingerprint}
+
+        while not cache.add(
+            cache_key, in_flight, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT
+        ):
+            entry = cache.get(cache_key)
+            if entry is None:
+                # Released or expired in the meantime, try to claim it again
+                continue
+            if entry["fingerprint"] != fingerprint:
+                metrics.incr("idempotency.conflicts")
+                return _error(
+                    f"{HEADER} was already used for a different request",
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if entry["state"] == IN_FLIGHT:
+                metrics.incr("idempotency.waited")
+                entry = _wait_for(cache_key, settings.IDEMPOTENCY_WAIT_TIMEOUT)
+                if entry is None:
+                    continue
+                if entry["state"] == IN_FLIGHT:
+                    response = _error(
+                        "A request with this key is still being processed",
+                        status.HTTP_409_CONFLICT,
+                    )
+                    response["Retry-After"] = "1"
+                    return response
+            metrics.incr("idempotency.replayed")
+            return _replay(entry)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500 or not hasattr(response, "data"):
+            cache.delete(cache_key)
+            return response
+
+        cache.set(
+            cache_key,
+            {
+                "state": DONE,
+                "fingerprint": fingerprint,
+                "status": response.status_code,
+                "data": response.data,
+            },
+            timeout=settings.IDEMPOTENCY_KEY_TTL,
+        )
+        return response
+
+    return wrapper
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from holiday_planner.archive import archive_cutoff, archive_schedules
+
+
+class Command(BaseCommand):
+    help = (
+        "Move finished holiday schedules into compressed archive rows, in batches. "
+        "Safe to interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=date.fromisoformat,
+            help="Archive schedules ending before this date (YYYY-MM-DD). "
+            "Defaults to ARCHIVE_AFTER_DAYS days ago.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--max-batches", type=int, help="Stop after this many batches."
+        )
+
+    def handle(self, *args, before, batch_size, max_batches, **options):
+        before = before or archive_cutoff()
+        archived = archive_schedules(
+            before=before, batch_size=batch_size, max_batches=max_batches
+        )
+        self.stdout.write(f"Archived {archived} schedules ending before {before}")
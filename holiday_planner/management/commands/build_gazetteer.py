@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from holiday_planner.gazetteer import build_index, read_country_info, read_geonames
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the offline gazetteer index from a GeoNames dump "
+        "(e.g. https://download.geonames.org/export/dump/cities15000.zip)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("cities", help="GeoNames cities file, e.g. cities15000.txt")
+        parser.add_argument(
+            "--countries",
+            help="GeoNames countryInfo.txt, to store country names instead of codes.",
+        )
+        parser.add_argument(
+            "--output",
+            default=settings.GAZETTEER_INDEX_PATH,
+            help="Index file to write, defaults to GAZETTEER_INDEX_PATH.",
+        )
+        parser.add_argument("--min-population", type=int, default=0)
+        parser.add_argument(
+            "--alternate-names",
+            action="store_true",
+            help="Also index alternate names (translations, abbreviations).",
+        )
+
+    def handle(self, *args, cities, countries, output, **options):
+        if not output:
+            raise CommandError("No --output given and GAZETTEER_INDEX_PATH is unset.")
+
+        country_names = {}
+        if countries:
+            with open(countries, encoding="utf-8") as f:
+                country_names = read_country_info(f)
+
+        with open(cities, encoding="utf-8") as f:
+            count = build_index(
+                read_geonames(
+                    f,
+                    countries=country_names,
+                    min_population=options["min_population"],
+                    alternate_names=options["alternate_names"],
+                ),
+                output,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} names to {output}"))
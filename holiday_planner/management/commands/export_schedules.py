@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from holiday_planner.bulk import (
+    EXPORT_CHUNK_SIZE,
+    iter_csv,
+    iter_ndjson,
+    iter_schedule_records,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream all holiday schedules with their destinations as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=["ndjson", "csv"], default="ndjson", dest="fmt"
+        )
+        parser.add_argument(
+            "--output", default="-", help="File to write to, '-' for stdout."
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, fmt, output, chunk_size, **options):
+        records = iter_schedule_records(chunk_size=chunk_size)
+        chunks = iter_csv(records) if fmt == "csv" else iter_ndjson(records)
+
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
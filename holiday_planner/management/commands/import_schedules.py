@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from holiday_planner.bulk import (
+    IMPORT_BATCH_SIZE,
+    ScheduleImportError,
+    import_schedule_records,
+    parse_csv,
+    parse_ndjson,
+)
+
+
+class Command(BaseCommand):
+    help = "Import holiday schedules from an NDJSON or CSV export in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File to read from, '-' for stdin.")
+        parser.add_argument(
+            "--format", choices=["ndjson", "csv"], default="ndjson", dest="fmt"
+        )
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, input, fmt, batch_size, **options):
+        parse = parse_csv if fmt == "csv" else parse_ndjson
+
+        f = sys.stdin if input == "-" else open(input, newline="", encoding="utf-8")
+        try:
+            created = import_schedule_records(parse(f), batch_size=batch_size)
+        except ScheduleImportError as exc:
+            raise CommandError(
+                f"{exc} ({exc.imported} schedules were imported before it)"
+            ) from exc
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} schedules"))
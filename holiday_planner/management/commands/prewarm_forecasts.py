@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from holiday_planner.cache import require_shared_cache
+from holiday_planner.prewarm import prewarm_forecasts
+
+
+class Command(BaseCommand):
+    help = (
+        "Prefetch the forecasts of the most popular destinations so interactive "
+        "lookups for them are served from the cache. Run it more often than "
+        "FORECAST_CACHE_TIMEOUT, e.g. every 30 minutes from cron. Needs the cache "
+        "shared with the server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=settings.PREWARM_DESTINATIONS)
+        parser.add_argument(
+            "--recent-days",
+            type=int,
+            default=settings.PREWARM_RECENT_DAYS,
+            help="Count schedule items created in this many days.",
+        )
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=settings.PREWARM_UPSTREAM_BUDGET,
+            help="Most Open-Meteo requests per run.",
+        )
+
+    def handle(self, *args, limit, recent_days, budget, **options):
+        # Forecasts cached in this process alone would be thrown away on exit
+        try:
+            require_shared_cache("Prewarming forecasts")
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+
+        stats = prewarm_forecasts(limit, recent_days, budget)
+        self.stdout.write(
+            f"Prewarmed {stats['prewarmed']} of {stats['ranked']} ranked destinations "
+            f"with {stats['requests']} upstream requests"
+        )
@@ -0,0 +1,38 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from holiday_planner.cache import require_shared_cache
+from holiday_planner.events import refresh_schedule_weather
+from holiday_planner.models import HolidaySchedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-fetch the weather of holiday schedules and push material changes to "
+        "their event stream listeners. Needs the cache shared with the server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            action="append",
+            dest="schedules",
+            help="Only refresh this schedule, can be repeated.",
+        )
+
+    def handle(self, *args, schedules, **options):
+        # Fail before saving any weather whose events could not be delivered
+        try:
+            require_shared_cache("Publishing schedule events")
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+
+        queryset = HolidaySchedule.objects.order_by("pk")
+        if schedules:
+            queryset = queryset.filter(pk__in=schedules)
+
+        changed = 0
+        for schedule_id in queryset.values_list("pk", flat=True).iterator():
+            if refresh_schedule_weather(schedule_id) is not None:
+                changed += 1
+        self.stdout.write(f"{changed} schedules with material weather changes")
@@ -0,0 +1,76 @@
+import csv
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from holiday_planner.models import ScheduleItem
+from holiday_planner.weather_service import FORECAST_HORIZON_DAYS, WMO_WEATHER_CODE_MAP
+
+COLUMNS = [
+    "schedule",
+    "user",
+    "destination",
+    "start_date",
+    "end_date",
+    "max_precipitation_probability",
+    "min_temperature",
+    "worst_weather_code",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "List upcoming schedule items whose weather crosses the given thresholds "
+        "as CSV, from the weather summary columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--precipitation-above", type=int, help="Precipitation probability, %%."
+        )
+        parser.add_argument("--temperature-below", type=float, help="In °C.")
+        parser.add_argument("--weather-code-above", type=int, help="WMO code.")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=FORECAST_HORIZON_DAYS,
+            help="Items taking place within this many days from today.",
+        )
+
+    def handle(
+        self,
+        *args,
+        precipitation_above,
+        temperature_below,
+        weather_code_above,
+        days,
+        **options,
+    ):
+        today = timezone.localdate()
+        items = ScheduleItem.objects.filter(
+            end_date__gte=today, start_date__lte=today + timedelta(days=days)
+        )
+        if precipitation_above is not None:
+            items = items.filter(max_precipitation_probability__gt=precipitation_above)
+        if temperature_below is not None:
+            items = items.filter(min_temperature__lt=temperature_below)
+        if weather_code_above is not None:
+            items = items.filter(worst_weather_code__gt=weather_code_above)
+
+        writer = csv.writer(self.stdout, lineterminator="\n")
+        writer.writerow([*COLUMNS, "worst_weather"])
+        rows = items.order_by("start_date", "id").values_list(
+            "holiday_schedule_id",
+            "holiday_schedule__user__username",
+            "destination__name",
+            "start_date",
+            "end_date",
+            "max_precipitation_probability",
+            "min_temperature",
+            "worst_weather_code",
+        )
+        count = 0
+        for row in rows.iterator():
+            writer.writerow([*row, WMO_WEATHER_CODE_MAP.get(row[-1], "")])
+            count += 1
+        self.stderr.write(f"{count} schedule items")
@@ -0,0 +1,43 @@
+from django.core.cache import cache
+
+# Lightweight counters kept in the Django cache so every worker reports into the
+# same numbers when a shared cache backend is configured.
+
+KEY_PREFIX = "holiday_planner:metrics:"
+
+_registered = set()
+
+
+def register(*names):
+    """
+    Declare metric names so they show up in `snapshot()` before being touched.
+    """
+    _registered.update(names)
+
+
+def incr(name, amount=1):
+    _registered.add(name)
+    key = KEY_PREFIX + name
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # The key was evicted between add() and incr()
+        cache.set(key, amount, timeout=None)
+
+
+def observe(name, seconds):
+    """
+    Record a duration as a count and a total in milliseconds.
+    """
+    incr(f"{name}.count")
+    incr(f"{name}.total_ms", round(seconds * 1000))
+
+
+def snapshot():
+    values = cache.get_many([KEY_PREFIX + name for name in _registered])
+    return {name: values.get(KEY_PREFIX + name, 0) for name in sorted(_registered)}
+
+
+def reset():
+    cache.delete_many([KEY_PREFIX + name for name in _registered])
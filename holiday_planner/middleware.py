@@ -0,0 +1,133 @@
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+def _accepted_encodings(header):
+    """
+    Parse an Accept-Encoding header into `{coding: qvalue}`.
+    """
+    encodings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        encodings[coding.strip().lower()] = qvalue
+    return encodings
+
+
+# Strong ETags of compressed bodies get the coding appended, e.g. "abc-gzip"
+ETAG_CODING_SUFFIX = re.compile(r'-(?:br|gzip)"')
+
+
+def _tag_coding(etag, coding):
+    return f'{etag[:-1]}-{coding}"' if etag.endswith('"') else etag
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses (`RESPONSE_COMPRESSION_TYPES`) of at least
+    `RESPONSE_COMPRESSION_MIN_SIZE` bytes with brotli (when installed) or gzip,
+    whichever the client prefers.
+
+    Unlike Django's GZipMiddleware, small responses are left alone and streaming
+    responses (exports) are passed through. HTML pages (the admin and the
+    browsable API) are never compressed, as they carry CSRF tokens and this
+    middleware does not add the BREACH padding Django's does.
+
+    Compressed bodies keep a strong ETag with the coding appended, so each
+    representation has its own tag. The suffix is removed from `If-Match` and
+    `If-None-Match` before the view sees them, so they are compared with the
+    tag of the uncompressed body, which identifies the schedule version.
+
+    Supports both sync and async stacks, so Server-Sent Events streams served
+    under ASGI are not adapted to sync iterators.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.untag_preconditions(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        self.untag_preconditions(request)
+        return self.compress(request, await self.get_response(request))
+
+    @staticmethod
+    def untag_preconditions(request):
+        for header in ("HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH"):
+            if header in request.META:
+                request.META[header] = ETAG_CODING_SUFFIX.sub('"', request.META[header])
+
+    def compress(self, request, response):
+        content_type = response.get("Content-Type", "").partition(";")[0].strip()
+        if (
+            content_type not in settings.RESPONSE_COMPRESSION_TYPES
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        coding = self.choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if coding == "br":
+            compressed = brotli.compress(
+                response.content, quality=settings.RESPONSE_BROTLI_QUALITY
+            )
+        else:
+            compressed = gzip.compress(
+                response.content, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0
+            )
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        if response.has_header("ETag"):
+            response["ETag"] = _tag_coding(response["ETag"], coding)
+        return response
+
+    @staticmethod
+    def choose_encoding(header):
+        accepted = _accepted_encodings(header)
+        wildcard = accepted.get("*", 0.0)
+        candidates = ["br", "gzip"] if brotli else ["gzip"]
+
+        best, best_qvalue = None, 0.0
+        for coding in candidates:
+            qvalue = accepted.get(coding, wildcard)
+            if qvalue > best_qvalue:
+                best, best_qvalue = coding, qvalue
+        return best
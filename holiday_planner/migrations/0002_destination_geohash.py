@@ -0,0 +1,65 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:20
+
+from django.db import migrations, models
+
+# Copied from holiday_planner.geo as of this migration, so later changes to the
+# app code cannot change what the migration does
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+BATCH_SIZE = 500
+
+
+def encode_geohash(latitude, longitude):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+
+    while len(geohash) < GEOHASH_PRECISION:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(geohash)
+
+
+def backfill_geohash(apps, schema_editor):
+    Destination = apps.get_model("holiday_planner", "Destination")
+    destinations = []
+    for destination in Destination.objects.only("id", "latitude", "longitude").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        destination.geohash = encode_geohash(
+            destination.latitude, destination.longitude
+        )
+        destinations.append(destination)
+        if len(destinations) == BATCH_SIZE:
+            Destination.objects.bulk_update(destinations, ["geohash"])
+            destinations = []
+    Destination.objects.bulk_update(destinations, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="destination",
+            name="geohash",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=12
+            ),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0002_destination_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="hourly_weather",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
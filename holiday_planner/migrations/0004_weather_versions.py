@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0003_scheduleitem_hourly_weather"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="holidayschedule",
+            name="destinations_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="holidayschedule",
+            name="weather_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="weather_versions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0004_weather_versions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedSchedule",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField(db_index=True)),
+                ("weather_version", models.PositiveIntegerField(default=0)),
+                ("data", models.BinaryField()),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_schedules",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
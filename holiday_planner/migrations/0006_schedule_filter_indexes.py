@@ -0,0 +1,65 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0005_archivedschedule"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="destination",
+            name="name",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="holidayschedule",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="schedules",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="scheduleitem",
+            name="destination",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="holiday_planner.destination",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="holidayschedule",
+            index=models.Index(
+                fields=["user", "start_date"], name="holiday_pla_user_id_28274e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="holidayschedule",
+            index=models.Index(
+                fields=["start_date"], name="holiday_pla_start_d_b1eb19_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="holidayschedule",
+            index=models.Index(
+                fields=["end_date"], name="holiday_pla_end_dat_b5ca88_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduleitem",
+            index=models.Index(
+                fields=["destination", "start_date"],
+                name="holiday_pla_destina_e18d4a_idx",
+            ),
+        ),
+    ]
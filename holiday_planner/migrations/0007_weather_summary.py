@@ -0,0 +1,82 @@
+# Generated by Django 5.1.2 on 2026-10-18 22:54
+
+from django.db import migrations, models
+
+# Copied from holiday_planner.conditions as of this migration, so later changes
+# to the app code cannot change what the migration does
+SUMMARY_FIELDS = [
+    "max_precipitation_probability",
+    "min_temperature",
+    "worst_weather_code",
+]
+BATCH_SIZE = 500
+
+
+def _values(weather_data, key):
+    return [
+        day[key]
+        for day in weather_data or []
+        if isinstance(day, dict)
+        and isinstance(day.get(key), (int, float))
+        and day[key] == day[key]
+    ]
+
+
+def summarize_weather(weather_data):
+    precipitation = _values(weather_data, "precipitation_probability_max")
+    temperature = _values(weather_data, "temperature_min")
+    codes = _values(weather_data, "weather_code")
+    return {
+        "max_precipitation_probability": (
+            round(max(precipitation)) if precipitation else None
+        ),
+        "min_temperature": min(temperature) if temperature else None,
+        "worst_weather_code": int(max(codes)) if codes else None,
+    }
+
+
+def backfill_weather_summary(apps, schema_editor):
+    ScheduleItem = apps.get_model("holiday_planner", "ScheduleItem")
+    items = []
+    for item in ScheduleItem.objects.only("id", "weather_data").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        for field, value in summarize_weather(item.weather_data).items():
+            setattr(item, field, value)
+        items.append(item)
+        if len(items) == BATCH_SIZE:
+            ScheduleItem.objects.bulk_update(items, SUMMARY_FIELDS)
+            items = []
+    ScheduleItem.objects.bulk_update(items, SUMMARY_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holiday_planner", "0006_schedule_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="max_precipitation_probability",
+            field=models.PositiveSmallIntegerField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="min_temperature",
+            field=models.FloatField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="worst_weather_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True, db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_weather_summary, migrations.RunPython.noop),
+    ]
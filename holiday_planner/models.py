@@ -1,5 +1,15 @@
+from functools import reduce
+from operator import or_
+
 from django.db import models
 from django.contrib.auth.models import User
+from holiday_planner.conditions import SUMMARY_FIELDS, summarize_weather
+from holiday_planner.geo import (
+    encode_geohash,
+    geohash_neighbourhood,
+    geohash_precision_for_radius,
+    haversine_km,
+)
 
 # HolidaySchedule
 
@@ -7,18 +17,84 @@ from django.contrib.auth.models import User
 # user: Link to Django Auth User
 # start_date: date
 # end_date: date
+# weather_version: int - bumped whenever the weather of any item changes
+# destinations_version: int - weather_version at which the items or dates last changed
 # created_at: datetime
 # updated_at: datetime
+# indexes: (user, start_date), start_date, end_date - for the list filters
+
+
+class HolidayScheduleQuerySet(models.QuerySet):
+    def matching(
+        self,
+        user=None,
+        starts_after=None,
+        ends_before=None,
+        overlaps=None,
+        destination=None,
+        precipitation_above=None,
+        temperature_below=None,
+        weather_code_above=None,
+    ):
+        """
+        Filter schedules by owner, by date (start on or after `starts_after`, end
+        on or before `ends_before`, or any overlap with the `(start, end)` range
+        `overlaps`) and by their items: a schedule matches when one of its items
+        is at `destination` and has a day with a precipitation probability above
+        `precipitation_above`, a minimum temperature below `temperature_below` or
+        a weather code above `weather_code_above`. Each condition is served by an
+        index.
+        """
+        queryset = self
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        if starts_after is not None:
+            queryset = queryset.filter(start_date__gte=starts_after)
+        if ends_before is not None:
+            queryset = queryset.filter(end_date__lte=ends_before)
+        if overlaps is not None:
+            start, end = overlaps
+            queryset = queryset.filter(start_date__lte=end, end_date__gte=start)
+
+        items = {
+            "destination__name": destination,
+            "max_precipitation_probability__gt": precipitation_above,
+            "min_temperature__lt": temperature_below,
+            "worst_weather_code__gt": weather_code_above,
+        }
+        items = {lookup: value for lookup, value in items.items() if value is not None}
+        if items:
+            queryset = queryset.filter(
+                id__in=ScheduleItem.objects.filter(**items).values(
+                    "holiday_schedule_id"
+                )
+            )
+        return queryset
 
 
 class HolidaySchedule(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="schedules")
+    # Indexed by the (user, start_date) index below
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="schedules", db_index=False
+    )
     start_date = models.DateField()
     end_date = models.DateField()
+    # Versions for delta responses (?since=), see delta.py
+    weather_version = models.PositiveIntegerField(default=0, editable=False)
+    destinations_version = models.PositiveIntegerField(default=0, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = HolidayScheduleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "start_date"]),
+            models.Index(fields=["start_date"]),
+            models.Index(fields=["end_date"]),
+        ]
+
     def __str__(self):
         return (
             f"{self.user.username} Schedule from {self.start_date} to {self.end_date}"
@@ -28,26 +104,63 @@ class HolidaySchedule(models.Model):
 # Destination
 
 # id: pk
-# name: varchar(255)
+# name: varchar(255) - indexed, destinations are looked up by name
 # country: varchar(255)
 # longitude: float()
 # latitude: float()
+# geohash: varchar(12) - indexed, derived from latitude/longitude
 # created_at: datetime
 # updated_at: datetime
 
 
+class DestinationQuerySet(models.QuerySet):
+    def nearby(self, latitude, longitude, radius_km):
+        """
+        Return `(destination, distance_km)` pairs within `radius_km` of a point,
+        closest first. Candidates are narrowed down with an indexed geohash
+        prefix lookup before computing exact great-circle distances.
+        """
+        queryset = self
+        precision = geohash_precision_for_radius(latitude, radius_km)
+        if precision is not None:
+            cells = geohash_neighbourhood(latitude, longitude, precision)
+            queryset = queryset.filter(
+                reduce(or_, (models.Q(geohash__startswith=cell) for cell in cells))
+            )
+
+        results = []
+        for destination in queryset:
+            distance = haversine_km(
+                latitude, longitude, destination.latitude, destination.longitude
+            )
+            if distance <= radius_km:
+                results.append((destination, distance))
+        return sorted(results, key=lambda result: result[1])
+
+
 class Destination(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     country = models.CharField(max_length=255)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    geohash = models.CharField(max_length=12, db_index=True, editable=False, default="")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DestinationQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name}, {self.country}"
 
+    def update_geohash(self):
+        # Also call this before bulk_create, which bypasses save()
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        super().save(*args, **kwargs)
+
 
 # ScheduleItem
 
@@ -58,15 +171,24 @@ class Destination(models.Model):
 # end_date: date(null) - to allow for flexible schedules
 # length_of_stay: int(null) - to allow for flexible schedules
 # weather_data: json(null) - to allow weather data storage
+# hourly_weather: binary(null) - packed hourly series, see columnar.py
+# weather_versions: json - schedule weather_version at which each day last changed
+# max_precipitation_probability: int(null) - derived from weather_data, indexed
+# min_temperature: float(null) - derived from weather_data, indexed
+# worst_weather_code: int(null) - derived from weather_data, indexed
 # created_at: datetime
 # updated_at: datetime
+# indexes: (destination, start_date) - for the destination filter
 
 
 class ScheduleItem(models.Model):
     holiday_schedule = models.ForeignKey(
         HolidaySchedule, on_delete=models.CASCADE, related_name="destinations"
     )
-    destination = models.ForeignKey(Destination, on_delete=models.CASCADE)
+    # Indexed by the (destination, start_date) index below
+    destination = models.ForeignKey(
+        Destination, on_delete=models.CASCADE, db_index=False
+    )
     # Now supports flexible dates per destination
     start_date = models.DateField(
         null=True, blank=True
@@ -79,9 +201,65 @@ class ScheduleItem(models.Model):
     )  # To calculate length of stay
 
     weather_data = models.JSONField(null=True, blank=True)
+    hourly_weather = models.BinaryField(null=True, blank=True)
+    weather_versions = models.JSONField(default=dict, blank=True, editable=False)
+    # Summary of weather_data for filtering, see conditions.py
+    max_precipitation_probability = models.PositiveSmallIntegerField(
+        null=True, blank=True, db_index=True, editable=False
+    )
+    min_temperature = models.FloatField(
+        null=True, blank=True, db_index=True, editable=False
+    )
+    worst_weather_code = models.PositiveSmallIntegerField(
+        null=True, blank=True, db_index=True, editable=False
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["destination", "start_date"])]
+
     def __str__(self):
         return f"{self.destination.name} ({self.start_date} - {self.end_date})"
+
+    def update_weather_summary(self):
+        # Also call this before bulk_create/bulk_update, which bypass save()
+        for field, value in summarize_weather(self.weather_data).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.update_weather_summary()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "weather_data" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *SUMMARY_FIELDS}
+        super().save(*args, **kwargs)
+
+
+# ArchivedSchedule
+
+# id: pk - the id the schedule had in HolidaySchedule
+# user: Link to Django Auth User
+# start_date: date
+# end_date: date - indexed
+# weather_version: int
+# data: binary - compressed schedule with its items, see archive.py
+# created_at: datetime - of the original schedule
+# archived_at: datetime
+
+
+class ArchivedSchedule(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_schedules"
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(db_index=True)
+    weather_version = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived schedule {self.pk} from {self.start_date} to {self.end_date}"
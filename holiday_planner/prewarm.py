@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from holiday_planner import metrics
+from holiday_planner.models import Destination
+from holiday_planner.weather_service import (
+    FORECAST_BATCH_SIZE,
+    FORECAST_HORIZON_DAYS,
+    fetch_daily_forecasts,
+    horizon_dates,
+)
+
+# Forecast prewarming for popular destinations.
+#
+# Destinations are ranked by how many schedule items were recently created for
+# them and how many trips to them start within the forecast horizon. Their
+# horizon forecasts (the next FORECAST_HORIZON_DAYS days) are then fetched with
+# batched multi-location requests and cached, so any daily lookup for them within
+# the horizon is answered from the cache (see `weather_service.fetch_weather_data`).
+
+metrics.register("prewarm.runs", "prewarm.destinations", "prewarm.requests")
+
+# An upcoming trip is a stronger signal than a recently planned one
+UPCOMING_TRIP_WEIGHT = 3
+
+
+def rank_destinations(limit, recent_days, today=None):
+    """
+    Return up to `limit` destinations with recent or upcoming schedule items,
+    highest score first.
+    """
+    today = today or timezone.localdate()
+    recent = Count(
+        "scheduleitem",
+        filter=Q(
+            scheduleitem__created_at__gte=timezone.now() - timedelta(days=recent_days)
+        ),
+    )
+    upcoming = Count(
+        "scheduleitem",
+        filter=Q(
+            scheduleitem__start_date__gte=today,
+            scheduleitem__start_date__lt=today + timedelta(days=FORECAST_HORIZON_DAYS),
+        ),
+    )
+    return list(
+        Destination.objects.annotate(score=recent + UPCOMING_TRIP_WEIGHT * upcoming)
+        .filter(score__gt=0)
+        .order_by(F("score").desc(), "id")[:limit]
+    )
+
+
+def prewarm_forecasts(limit, recent_days, budget):
+    """
+    Fetch and cache the horizon forecasts of the top ranked destinations, using
+    at most `budget` upstream requests. Returns what was done.
+    """
+    destinations = rank_destinations(limit, recent_days)
+
+    locations = list(dict.fromkeys((d.latitude, d.longitude) for d in destinations))[
+        : budget * FORECAST_BATCH_SIZE
+    ]
+    start_date, end_date = horizon_dates()
+    if locations:
+        # Refetch even if cached, so the hot entries never expire between runs
+        fetch_daily_forecasts(locations, start_date, end_date, refresh=True)
+
+    requests = -(-len(locations) // FORECAST_BATCH_SIZE)
+    metrics.incr("prewarm.runs")
+    metrics.incr("prewarm.destinations", len(locations))
+    metrics.incr("prewarm.requests", requests)
+    return {
+        "ranked": len(destinations),
+        "prewarmed": len(locations),
+        "requests": requests,
+    }
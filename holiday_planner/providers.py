@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from openmeteo_requests.Client import OpenMeteoRequestsError
+from requests.exceptions import Timeout
+from retry_requests import retry
+from holiday_planner import metrics
+
+# Weather providers and hedged requests.
+#
+# A provider turns Open-Meteo forecast query parameters into a raw response in
+# Open-Meteo's length-prefixed FlatBuffers format, which is what the rest of the
+# weather service caches and reads (see `weather_service.parse_forecast`). Any
+# Open-Meteo compatible endpoint (the public API, a mirror, a self-hosted
+# instance) works with `OpenMeteoProvider`; other backends only have to convert
+# their output to that format to feed `clean_weather_data` unchanged.
+#
+# With a secondary provider configured, a request that takes longer than the
+# primary's recent p95 latency is also sent to the secondary and whichever
+# answers first wins, so one slow upstream no longer sets our tail latency.
+
+metrics.register(
+    "weather.requests",
+    "weather.hedged",
+    "weather.failovers",
+    "weather.secondary_wins",
+)
+
+# Setup the Open-Meteo API session with retries. Responses are cached by the
+# weather service (see cache.py), not at the HTTP level, so the latency samples
+# below are all real upstream requests
+retry_session = retry(requests.Session(), retries=5, backoff_factor=0.2)
+
+
+class LatencyTracker:
+    """
+    Rolling window of the latest request durations of a provider.
+    """
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent, min_samples=1):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            samples = list(self._samples)
+        return float(np.percentile(samples, percent))
+
+
+class WeatherProvider:
+    """
+    Base class of weather backends. Subclasses implement `fetch(params)`, returning
+    the raw FlatBuffers response for Open-Meteo style query `params`.
+    """
+
+    def __init__(self, name, **options):
+        self.name = name
+        self.latency = LatencyTracker(settings.WEATHER_LATENCY_WINDOW)
+
+    def fetch(self, params):
+        raise NotImplementedError
+
+    def timed_fetch(self, params):
+        started = time.monotonic()
+        raw = self.fetch(params)
+        # Only successful requests say something about the upstream's latency
+        self.latency.record(time.monotonic() - started)
+        return raw
+
+
+class OpenMeteoProvider(WeatherProvider):
+    def __init__(self, name, url, session=None, timeout=None, **options):
+        super().__init__(name, **options)
+        self.url = url
+        self.session = session or retry_session
+        # (connect, read) seconds, WEATHER_REQUEST_TIMEOUT unless given
+        self.timeout = timeout
+
+    def fetch(self, params):
+        response = self.session.get(
+            self.url,
+            params={**params, "format": "flatbuffers"},
+            timeout=self.timeout or settings.WEATHER_REQUEST_TIMEOUT,
+        )
+        if response.status_code in [400, 429]:
+            raise OpenMeteoRequestsError(response.json())
+        response.raise_for_status()
+        return response.content
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.WEATHER_HEDGE_WORKERS,
+                thread_name_prefix="weather-hedge",
+            )
+        return _executor
+
+
+class HedgedWeatherClient:
+    """
+    Fetch from the primary provider, hedging with the secondary (when there is
+    one) once the primary is slower than its p95 latency or fails.
+    """
+
+    def __init__(self, primary, secondary=None):
+        self.primary = primary
+        self.secondary = secondary
+
+    def hedge_delay(self):
+        p95 = self.primary.latency.percentile(
+            settings.WEATHER_HEDGE_PERCENTILE,
+            min_samples=settings.WEATHER_HEDGE_MIN_SAMPLES,
+        )
+        if p95 is None:
+            return settings.WEATHER_HEDGE_DEFAULT_DELAY
+        return max(p95, settings.WEATHER_HEDGE_MIN_DELAY)
+
+    def fetch(self, params):
+        metrics.incr("weather.requests")
+        if self.secondary is None:
+            return self.primary.timed_fetch(params)
+
+        executor = _get_executor()
+        primary = executor.submit(self.primary.timed_fetch, params)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done and primary.exception() is None:
+            return primary.result()
+        metrics.incr("weather.failovers" if done else "weather.hedged")
+
+        secondary = executor.submit(self.secondary.timed_fetch, params)
+        pending = {primary, secondary}
+        deadline = time.monotonic() + settings.WEATHER_HEDGE_TIMEOUT
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                # Both requests keep running in the background
+                raise Timeout(
+                    f"No weather provider answered within "
+                    f"{settings.WEATHER_HEDGE_TIMEOUT} seconds"
+                )
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        metrics.incr("weather.secondary_wins")
+                    # The slower request finishes in the background
+                    return future.result()
+
+        # Both failed, report the primary's error
+        return primary.result()
+
+
+def _build_provider(name, config):
+    options = {key.lower(): value for key, value in config.items() if key != "BACKEND"}
+    return import_string(config["BACKEND"])(name, **options)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def weather_client():
+    """
+    Return the client for the `WEATHER_PROVIDERS` setting. Clients (and with them
+    the latency history of their providers) live as long as the process.
+    """
+    providers = settings.WEATHER_PROVIDERS
+    key = repr(
+        sorted((name, sorted(config.items())) for name, config in providers.items())
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = HedgedWeatherClient(
+                primary=_build_provider("primary", providers["primary"]),
+                secondary=(
+                    _build_provider("secondary", providers["secondary"])
+                    if providers.get("secondary")
+                    else None
+                ),
+            )
+    return client
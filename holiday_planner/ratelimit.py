@@ -0,0 +1,64 @@
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = "holiday_planner:ratelimit:"
+
+
+class RateLimitTimeout(Exception):
+    def __init__(self, wait):
+        super().__init__(f"No token available within the allowed wait ({wait:.1f}s)")
+        self.wait = wait
+
+
+class SharedRateLimiter:
+    """
+    Token bucket shared by every process through the Django cache.
+
+    Time is divided into windows of `burst / rate` seconds and each window holds
+    `burst` tokens. Callers atomically increment the counter of the current window
+    and proceed while it stays within `burst`; the others sleep until the next
+    window and try again, with a small random offset so they do not all retry at
+    once. Callers are not served in arrival order: whoever retries first in a
+    window gets its tokens, and `timeout` bounds how long anyone keeps trying.
+
+    Needs the shared cache (see cache.py), with an atomic `incr`.
+    """
+
+    def __init__(self, name, rate, burst=1, clock=time.time, sleep=time.sleep):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.window = burst / rate
+        self.clock = clock
+        self.sleep = sleep
+
+    def _key(self, suffix):
+        return f"{KEY_PREFIX}{self.name}:{suffix}"
+
+    def _take(self, window):
+        key = self._key(window)
+        cache.add(key, 0, timeout=math.ceil(self.window) + 1)
+        try:
+            return cache.incr(key) <= self.burst
+        except ValueError:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Block until a token is available and return the seconds spent waiting.
+        Raises RateLimitTimeout when no token can be had within `timeout` seconds.
+        """
+        start = self.clock()
+        while True:
+            now = self.clock()
+            window = int(now // self.window)
+            if self._take(window):
+                return now - start
+
+            next_window = (window + 1) * self.window
+            if timeout is not None and next_window - start > timeout:
+                raise RateLimitTimeout(next_window - now)
+            self.sleep(next_window - now + random.uniform(0, self.window / 10))
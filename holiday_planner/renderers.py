@@ -0,0 +1,81 @@
+import msgpack
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Anything orjson does not know natively goes through DRF's encoder
+    # (lazy strings, Decimal, QuerySet, generators, objects with tolist(), ...)
+    return _fallback_encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    NumPy scalars and arrays, dates, datetimes and UUIDs are encoded natively.
+    Indented output (e.g. for the browsable API) is delegated to the stdlib based
+    renderer. Unlike DRF's strict mode, NaN and Infinity are rendered as null.
+    """
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(data, default=_default, option=self.options)
+
+
+def _msgpack_default(obj):
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return _fallback_encoder.default(obj)
+
+
+def _columnar(data):
+    # Turn every "weather_data" list of daily dicts into a dict of lists
+    if isinstance(data, list):
+        return [_columnar(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    columns = {}
+    for key, value in data.items():
+        if key == "weather_data" and isinstance(value, list):
+            columns[key] = {
+                name: [day.get(name) for day in value]
+                for name in dict.fromkeys(name for day in value for name in day)
+            }
+        else:
+            columns[key] = _columnar(value)
+    return columns
+
+
+class ColumnarMsgPackRenderer(BaseRenderer):
+    """
+    MessagePack renderer for bandwidth sensitive clients.
+
+    Daily weather is rendered column-wise, one array per variable
+    (`{"date": [...], "temperature_max": [...], ...}`), so keys are not repeated
+    for every day. Views can hand over weather that is already columnar.
+    """
+
+    media_type = "application/x-msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(_columnar(data), default=_msgpack_default)
@@ -0,0 +1,95 @@
+import numpy as np
+from holiday_planner.geo import EARTH_RADIUS_KM
+
+# Route ordering of itinerary stops.
+#
+# Orders the stops of a schedule to keep the total great-circle distance of the
+# trip short: a nearest-neighbour tour from the first stop, improved with 2-opt
+# moves (reversing a stretch of the route whenever that shortens it) until no
+# move helps. Routes are open, the trip does not return to its first stop, and
+# the first stop stays first. Distances come from a matrix computed once with
+# NumPy, and every 2-opt step scores all candidate moves of a stop at once, so a
+# hundred stops take milliseconds.
+
+
+def distance_matrix(latitudes, longitudes):
+    """
+    Pairwise great-circle distances in kilometres, as an (n, n) array.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype="f8"))
+    lon = np.radians(np.asarray(longitudes, dtype="f8"))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = (
+        np.sin(dlat / 2) ** 2
+        + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(route, distances):
+    route = np.asarray(route)
+    return float(distances[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbour_route(distances, start=0):
+    """
+    Visit the closest unvisited stop next, starting at `start`.
+    """
+    n = len(distances)
+    visited = np.zeros(n, dtype=bool)
+    route = [start]
+    visited[start] = True
+    for _ in range(n - 1):
+        candidates = np.where(visited, np.inf, distances[route[-1]])
+        stop = int(np.argmin(candidates))
+        route.append(stop)
+        visited[stop] = True
+    return route
+
+
+def two_opt(route, distances, max_passes=100):
+    """
+    Improve an open route, keeping its first stop, by reversing stretches
+    `route[i:j + 1]` for as long as one of them shortens it.
+    """
+    route = np.array(route)
+    n = len(route)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            a, b = route[i - 1], route[i]
+            ends = route[i + 1 :]
+            # Stop after each candidate end of the stretch, none after the last
+            following = np.append(route[i + 2 :], -1)
+            has_next = following >= 0
+            following = np.where(has_next, following, 0)
+            # Change in length when the stretch from b to c is reversed:
+            # a-b ... c-e becomes a-c ... b-e
+            delta = (
+                distances[a, ends]
+                - distances[a, b]
+                + np.where(
+                    has_next,
+                    distances[b, following] - distances[ends, following],
+                    0.0,
+                )
+            )
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                route[i : i + j + 2] = route[i : i + j + 2][::-1]
+                improved = True
+        if not improved:
+            break
+    return route.tolist()
+
+
+def order_stops(latitudes, longitudes):
+    """
+    Return the indexes of the stops in a short visiting order, starting with the
+    first stop.
+    """
+    if len(latitudes) < 3:
+        return list(range(len(latitudes)))
+    distances = distance_matrix(latitudes, longitudes)
+    return two_opt(nearest_neighbour_route(distances), distances)
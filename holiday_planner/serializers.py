@@ -1,13 +1,24 @@
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 
 from django.contrib.auth.models import User
-from geopy.geocoders import Nominatim
+from holiday_planner.compare import (
+    COMPARE_MAX_DAYS,
+    COMPARE_MAX_DESTINATIONS,
+    COMPARE_VARIABLES,
+    DEFAULT_COMPARE_VARIABLES,
+)
+from holiday_planner.delta import weather_day_versions, weather_patch
+from holiday_planner.geocoding import geocode
 from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
-from holiday_planner.weather_service import fetch_weather_data
+from holiday_planner.route import order_stops
+from holiday_planner.weather_service import (
+    decode_hourly_weather_data,
+    fetch_hourly_weather_data,
+    fetch_weather_data,
+)
 from rest_framework import serializers
 
-geolocator = Nominatim(user_agent="holiday_planner")
-
 
 class WeatherDataSerializer(serializers.Serializer):
     place_name = serializers.CharField(max_length=255)
@@ -15,6 +26,66 @@ class WeatherDataSerializer(serializers.Serializer):
     end_date = serializers.DateField()
 
 
+class WeatherCompareSerializer(serializers.Serializer):
+    place_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        min_length=1,
+        max_length=COMPARE_MAX_DESTINATIONS,
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    variables = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(COMPARE_VARIABLES)),
+        min_length=1,
+        default=DEFAULT_COMPARE_VARIABLES,
+    )
+
+    def validate(self, data):
+        days = (data["end_date"] - data["start_date"]).days + 1
+        if days < 1:
+            raise serializers.ValidationError("end_date must not be before start_date")
+        if days > COMPARE_MAX_DAYS:
+            raise serializers.ValidationError(
+                f"At most {COMPARE_MAX_DAYS} days can be compared"
+            )
+        return data
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0, max_value=500, default=50)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ScheduleQuerySerializer(serializers.Serializer):
+    # Filters of the schedule list, see HolidayScheduleQuerySet.matching()
+    mine = serializers.BooleanField(default=False)
+    user = serializers.IntegerField(min_value=1, required=False)
+    starts_after = serializers.DateField(required=False)
+    ends_before = serializers.DateField(required=False)
+    overlaps = serializers.CharField(required=False)
+    destination = serializers.CharField(max_length=255, required=False)
+    precipitation_above = serializers.IntegerField(
+        min_value=0, max_value=100, required=False
+    )
+    temperature_below = serializers.FloatField(required=False)
+    weather_code_above = serializers.IntegerField(
+        min_value=0, max_value=99, required=False
+    )
+
+    def validate_overlaps(self, value):
+        try:
+            start, end = (date.fromisoformat(part) for part in value.split(","))
+        except ValueError:
+            raise serializers.ValidationError(
+                "Must be a date range: YYYY-MM-DD,YYYY-MM-DD"
+            )
+        if start > end:
+            raise serializers.ValidationError("The range ends before it starts")
+        return start, end
+
+
 class UserSerializer(serializers.ModelSerializer):
     schedules = serializers.PrimaryKeyRelatedField(
         many=True, queryset=HolidaySchedule.objects.all()
@@ -47,6 +118,99 @@ class ScheduleItemSerializer(serializers.ModelSerializer):
         ]
 
 
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def serialize_schedules(queryset, hourly=False):
+    """
+    Read-only fast path producing the same output as
+    `HolidayScheduleSerializer(queryset, many=True).data`.
+
+    Builds plain dicts from two `values_list()` queries instead of instantiating a
+    DRF field tree per schedule item. With `hourly`, each item also gets its
+    decoded `hourly_weather`; otherwise the packed column is never read.
+    """
+    schedules = list(
+        queryset.prefetch_related(None).values_list(
+            "id", "user__username", "start_date", "end_date"
+        )
+    )
+
+    items_by_schedule = defaultdict(list)
+    items = (
+        ScheduleItem.objects.filter(holiday_schedule_id__in=[s[0] for s in schedules])
+        .order_by("holiday_schedule_id", "id")
+        .values_list(
+            "holiday_schedule_id",
+            "destination__name",
+            "start_date",
+            "end_date",
+            "length_of_stay",
+            "weather_data",
+            *(["hourly_weather"] if hourly else []),
+        )
+    )
+    for (
+        schedule_id,
+        name,
+        start_date,
+        end_date,
+        length_of_stay,
+        weather,
+        *rest,
+    ) in items:
+        item = {
+            "destination": name,
+            "start_date": _isoformat(start_date),
+            "end_date": _isoformat(end_date),
+            "length_of_stay": length_of_stay,
+            "weather_data": weather,
+        }
+        if hourly:
+            item["hourly_weather"] = decode_hourly_weather_data(rest[0])
+        items_by_schedule[schedule_id].append(item)
+
+    return [
+        {
+            "id": schedule_id,
+            "user": username,
+            "start_date": _isoformat(start_date),
+            "end_date": _isoformat(end_date),
+            "destinations": items_by_schedule[schedule_id],
+        }
+        for schedule_id, username, start_date, end_date in schedules
+    ]
+
+
+def serialize_schedule_delta(queryset, since, hourly=False):
+    """
+    Weather changes of the single schedule in `queryset` after version `since`,
+    see `delta.py`. Falls back to the full schedule (`"full": true`) when the
+    client's version is too old or unknown. Returns None if there is no schedule.
+    """
+    row = queryset.values_list("id", "weather_version", "destinations_version")[:1]
+    if not row:
+        return None
+    schedule_id, version, destinations_version = row[0]
+
+    delta = {"id": schedule_id, "version": version, "since": since}
+    if since < destinations_version or since > version:
+        delta["full"] = True
+        delta["schedule"] = serialize_schedules(queryset, hourly=hourly)[0]
+        return delta
+
+    items = []
+    if since < version:
+        items = (
+            ScheduleItem.objects.filter(holiday_schedule_id=schedule_id)
+            .order_by("id")
+            .values_list("weather_data", "weather_versions")
+        )
+    delta["destinations"] = weather_patch(items, since)
+    return delta
+
+
 class HolidayScheduleSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source="user.username")
     destinations = ScheduleItemSerializer(many=True, read_only=True)
@@ -54,6 +218,12 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
     destinations_input = serializers.ListField(
         child=serializers.DictField(child=serializers.CharField()), write_only=True
     )
+    # Also fetch and store hourly forecasts for each destination
+    hourly = serializers.BooleanField(write_only=True, required=False, default=False)
+    # Reorder flexible destinations into a short route, see route.py
+    optimize_route = serializers.BooleanField(
+        write_only=True, required=False, default=False
+    )
 
     class Meta:
         model = HolidaySchedule
@@ -64,14 +234,72 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
             "end_date",
             "destinations",
             "destinations_input",
+            "hourly",
+            "optimize_route",
         ]
 
+    def validate(self, data):
+        # Updates keep the destinations in the order given
+        if data.get("optimize_route") and self.instance is not None:
+            raise serializers.ValidationError(
+                {"optimize_route": "Routes can only be optimized on creation."}
+            )
+        if data.get("optimize_route") and any(
+            destination.get("start_date")
+            or destination.get("end_date")
+            or destination.get("length_of_stay")
+            for destination in data.get("destinations_input", [])
+        ):
+            raise serializers.ValidationError(
+                {
+                    "optimize_route": "Only destinations without dates or "
+                    "length_of_stay can be reordered."
+                }
+            )
+        return data
+
+    def get_destination(self, place_name):
+        # GeoCode the Place name
+        location = geocode(place_name)
+        if not location:
+            raise serializers.ValidationError(f"Geocoding failed for '{place_name}'")
+
+        # Check if destination exists otherwise create it
+        destination, created = Destination.objects.get_or_create(
+            name=place_name,
+            defaults={
+                "country": location.address.split(", ")[-1].strip(),
+                "latitude": location.latitude,
+                "longitude": location.longitude,
+            },
+        )
+        return destination
+
     def create(self, validated_data):
         # Extract the nested destinations data
         destinations_input = validated_data.pop("destinations_input")
+        hourly = validated_data.pop("hourly", False)
 
-        # Create the holiday schedule
-        holiday_schedule = HolidaySchedule.objects.create(**validated_data)
+        # Geocode up front to order the stops by distance before allocating dates
+        resolved = {}
+        if validated_data.pop("optimize_route", False):
+            for destination in destinations_input:
+                place_name = destination.get("place_name")
+                if place_name not in resolved:
+                    resolved[place_name] = self.get_destination(place_name)
+            stops = [resolved[d.get("place_name")] for d in destinations_input]
+            destinations_input = [
+                destinations_input[index]
+                for index in order_stops(
+                    [stop.latitude for stop in stops],
+                    [stop.longitude for stop in stops],
+                )
+            ]
+
+        # Create the holiday schedule, its items are weather version 1
+        holiday_schedule = HolidaySchedule.objects.create(
+            **validated_data, weather_version=1, destinations_version=1
+        )
 
         current_start_date = validated_data["start_date"]
         current_end_date = validated_data["end_date"]
@@ -136,51 +364,60 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
                     f"The destination {place_name} has a start date {start_date} that is after the end date {end_date}."
                 )
 
-            # GeoCode the Place name
-            location = geolocator.geocode(place_name)
-            if location:
-                # Check if destination exists otherwise create it
-                destination, created = Destination.objects.get_or_create(
-                    name=place_name,
-                    defaults={
-                        "country": location.address.split(", ")[-1].strip(),
-                        "latitude": location.latitude,
-                        "longitude": location.longitude,
-                    },
-                )
+            destination = resolved.get(place_name) or self.get_destination(place_name)
 
-                # Fetch weather data for the destination
-                weather_data = fetch_weather_data(
+            # Fetch weather data for the destination, daily and hourly for the same days
+            weather_data = fetch_weather_data(
+                latitude=destination.latitude,
+                longitude=destination.longitude,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            hourly_weather = (
+                fetch_hourly_weather_data(
                     latitude=destination.latitude,
                     longitude=destination.longitude,
-                    start_date=start_date + timedelta(days=1),
-                    end_date=end_date + timedelta(days=1),
-                )
-
-                # Create ScheduleItem with the provided dates or calculated ones
-                ScheduleItem.objects.create(
-                    holiday_schedule=holiday_schedule,
-                    destination=destination,
                     start_date=start_date,
                     end_date=end_date,
-                    length_of_stay=length_of_stay,
-                    weather_data=weather_data,  # .to_dict(
-                    #    orient="records"
-                    # ),  # Save the weather data as JSON
-                )
-            else:
-                raise serializers.ValidationError(
-                    f"Geocoding failed for '{place_name}'"
                 )
+                if hourly
+                else None
+            )
+
+            # Create ScheduleItem with the provided dates or calculated ones
+            ScheduleItem.objects.create(
+                holiday_schedule=holiday_schedule,
+                destination=destination,
+                start_date=start_date,
+                end_date=end_date,
+                length_of_stay=length_of_stay,
+                weather_data=weather_data,  # .to_dict(
+                #    orient="records"
+                # ),  # Save the weather data as JSON
+                weather_versions=weather_day_versions(None, weather_data, None, 1),
+                hourly_weather=hourly_weather,
+            )
 
         return holiday_schedule
 
     def update(self, instance, validated_data):
         destinations_data = validated_data.pop("destinations_input", None)
+        # A PATCH without `hourly` keeps storing hourly forecasts if it did before
+        hourly = validated_data.pop("hourly", None)
+        if hourly is None:
+            hourly = instance.destinations.filter(hourly_weather__isnull=False).exists()
+        # Always false here, validate() rejects it on updates
+        validated_data.pop("optimize_route", None)
 
         # Update the schedule dates
+        dates = (instance.start_date, instance.end_date)
         instance.start_date = validated_data.get("start_date", instance.start_date)
         instance.end_date = validated_data.get("end_date", instance.end_date)
+        if destinations_data or dates != (instance.start_date, instance.end_date):
+            # The items or dates changed, clients with older versions need a full
+            # sync since weather patches only carry days
+            instance.weather_version += 1
+            instance.destinations_version = instance.weather_version
         instance.save()
 
         if destinations_data:
@@ -211,7 +448,7 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
                     current_start_date = end_date
 
                 # Geocode and fetch the weather data as before
-                location = geolocator.geocode(place_name)
+                location = geocode(place_name)
                 if location:
                     destination_obj, created = Destination.objects.get_or_create(
                         name=place_name,
@@ -228,6 +465,16 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
                         start_date=start_date,
                         end_date=end_date,
                     )
+                    hourly_weather = (
+                        fetch_hourly_weather_data(
+                            latitude=destination_obj.latitude,
+                            longitude=destination_obj.longitude,
+                            start_date=start_date,
+                            end_date=end_date,
+                        )
+                        if hourly
+                        else None
+                    )
 
                     # Recreate the schedule item
                     ScheduleItem.objects.create(
@@ -237,5 +484,9 @@ class HolidayScheduleSerializer(serializers.ModelSerializer):
                         end_date=end_date,
                         length_of_stay=length_of_stay,
                         weather_data=weather_data,
+                        weather_versions=weather_day_versions(
+                            None, weather_data, None, instance.weather_version
+                        ),
+                        hourly_weather=hourly_weather,
                     )
         return instance
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from holiday_planner.cache import invalidate_schedule
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.suggest import destination_index
+
+
+@receiver([post_save, post_delete], sender=HolidaySchedule)
+def invalidate_holiday_schedule(sender, instance, **kwargs):
+    invalidate_schedule(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ScheduleItem)
+def invalidate_schedule_item(sender, instance, **kwargs):
+    # Covers schedule updates, deletes and weather refreshes of single items
+    invalidate_schedule(instance.holiday_schedule_id)
+
+
+@receiver(post_save, sender=Destination)
+def index_destination(sender, instance, created, **kwargs):
+    if created:
+        destination_index.add(instance)
@@ -0,0 +1,116 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from holiday_planner.gazetteer import get_gazetteer, normalize_name
+from holiday_planner.models import Destination
+
+
+class PrefixIndex:
+    """
+    Sorted list of `(normalized name, name, country)` tuples answering prefix
+    queries with a binary search. Inserts keep the list sorted.
+    """
+
+    def __init__(self, destinations=()):
+        self.entries = sorted(
+            {(normalize_name(name), name, country) for name, country in destinations}
+        )
+
+    def add(self, name, country):
+        entry = (normalize_name(name), name, country)
+        i = bisect_left(self.entries, entry)
+        if i == len(self.entries) or self.entries[i] != entry:
+            insort(self.entries, entry)
+
+    def search(self, prefix, limit=10):
+        key = normalize_name(prefix)
+        if not key:
+            return []
+
+        results = []
+        for i in range(bisect_left(self.entries, (key,)), len(self.entries)):
+            entry_key, name, country = self.entries[i]
+            if not entry_key.startswith(key) or len(results) == limit:
+                break
+            results.append((name, country))
+        return results
+
+
+class DestinationIndex:
+    """
+    Process wide PrefixIndex over the Destination table. It is loaded on first
+    use, updated by the Destination post_save signal, and picks up rows created by
+    other processes at most every SUGGEST_REFRESH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.index = None
+        self.last_id = 0
+        self.refreshed_at = 0
+
+    def _load_new_rows(self):
+        rows = (
+            Destination.objects.filter(id__gt=self.last_id)
+            .order_by("id")
+            .values_list("id", "name", "country")
+        )
+        for destination_id, name, country in rows.iterator():
+            self.index.add(name, country)
+            self.last_id = destination_id
+        self.refreshed_at = time.monotonic()
+
+    def get(self):
+        with self._lock:
+            if self.index is None:
+                self.index = PrefixIndex()
+                self._load_new_rows()
+            elif (
+                time.monotonic() - self.refreshed_at > settings.SUGGEST_REFRESH_INTERVAL
+            ):
+                self._load_new_rows()
+            return self.index
+
+    def add(self, destination):
+        with self._lock:
+            if self.index is not None:
+                self.index.add(destination.name, destination.country)
+
+    def reset(self):
+        with self._lock:
+            self.index = None
+            self.last_id = 0
+
+
+destination_index = DestinationIndex()
+
+
+def suggest_destinations(query, limit=10):
+    """
+    Suggest canonical place names for a partial query: known destinations first,
+    then the most populous gazetteer matches.
+    """
+    suggestions = [
+        {"name": name, "country": country, "source": "destination"}
+        for name, country in destination_index.get().search(query, limit)
+    ]
+
+    gazetteer = get_gazetteer(settings.GAZETTEER_INDEX_PATH)
+    if gazetteer is not None and len(suggestions) < limit:
+        seen = {(s["name"], s["country"]) for s in suggestions}
+        for location in gazetteer.prefix_search(query, limit):
+            if (location.name, location.country) in seen:
+                continue
+            suggestions.append(
+                {
+                    "name": location.name,
+                    "country": location.country,
+                    "source": "gazetteer",
+                }
+            )
+            if len(suggestions) == limit:
+                break
+
+    return suggestions
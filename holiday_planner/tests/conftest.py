@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+import flatbuffers
+import numpy as np
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from holiday_planner.cache import clear_cached_forecasts
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="testuser", password="testpassword")
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(username="otheruser", password="testpassword")
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    # Every test gets an empty local-memory cache, whatever the environment uses
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "holiday-planner-tests",
+        }
+    }
+    cache.clear()
+    clear_cached_forecasts()
+    yield
+    cache.clear()
+    clear_cached_forecasts()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    # A cache other processes could see, for code that refuses a local one
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+
+
+@pytest.fixture
+def mock_geocode():
+    # Every place geocodes to Paris
+    with patch("geopy.Nominatim.geocode") as mock:
+        mock.return_value = type(
+            "Location",
+            (object,),
+            {"latitude": 48.8566, "longitude": 2.3522, "address": "Paris, France"},
+        )()
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_geocoder(settings):
+    # Geocoding is mocked in tests, so there is no upstream to protect
+    settings.NOMINATIM_RATE_LIMIT = 1000
+    settings.NOMINATIM_BURST = 1000
+    # Tests never pick up a gazetteer index built in the working tree
+    settings.GAZETTEER_INDEX_PATH = None
+
+
+def _build_forecast(daily=None, hourly=None, utc_offset=7200):
+    """
+    Build a length-prefixed WeatherApiResponse like Open-Meteo's flatbuffers
+    format. `daily` and `hourly` are `(time, time_end, interval, columns)`.
+    """
+    builder = flatbuffers.Builder(1024)
+
+    def section(time, time_end, interval, columns):
+        variables = []
+        for values in columns:
+            vector = builder.CreateNumpyVector(np.asarray(values, dtype="<f4"))
+            builder.StartObject(4)
+            builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+            variables.append(builder.EndObject())
+        builder.StartVector(4, len(variables), 4)
+        for variable in reversed(variables):
+            builder.PrependUOffsetTRelative(variable)
+        vector = builder.EndVector()
+        builder.StartObject(4)
+        builder.PrependInt64Slot(0, time, 0)
+        builder.PrependInt64Slot(1, time_end, 0)
+        builder.PrependInt32Slot(2, interval, 0)
+        builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+        return builder.EndObject()
+
+    daily = section(*daily) if daily else None
+    hourly = section(*hourly) if hourly else None
+    builder.StartObject(12)
+    builder.PrependInt32Slot(6, utc_offset, 0)
+    if daily:
+        builder.PrependUOffsetTRelativeSlot(10, daily, 0)
+    if hourly:
+        builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.Finish(builder.EndObject())
+
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+@pytest.fixture
+def build_forecast():
+    return _build_forecast
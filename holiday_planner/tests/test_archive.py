@@ -0,0 +1,158 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from holiday_planner.archive import archive_cutoff, archive_schedules
+from holiday_planner.columnar import pack_series
+from holiday_planner.models import (
+    ArchivedSchedule,
+    Destination,
+    HolidaySchedule,
+    ScheduleItem,
+)
+
+WEATHER_DATA = [
+    {"date": "2024-10-20", "weather_code": 2.0, "temperature_max": 18},
+    {"date": "2024-10-21", "weather_code": 3.0, "temperature_max": 15},
+]
+
+
+def packed_hours(hours=48):
+    return pack_series(
+        start=1729375200,
+        interval=3600,
+        utc_offset=7200,
+        columns=[("temperature_2m", "f", np.linspace(10, 20, hours))],
+    )
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def make_schedule(user):
+    destination = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+
+    def make(end_date="2024-10-23"):
+        schedule = HolidaySchedule.objects.create(
+            user=user,
+            start_date="2024-10-20",
+            end_date=end_date,
+            weather_version=3,
+            destinations_version=1,
+        )
+        ScheduleItem.objects.create(
+            holiday_schedule=schedule,
+            destination=destination,
+            start_date="2024-10-20",
+            end_date="2024-10-21",
+            weather_data=WEATHER_DATA,
+            hourly_weather=packed_hours(),
+        )
+        return schedule
+
+    return make
+
+
+# # # # # # # # # # # #
+#    ARCHIVE TESTS    #
+# # # # # # # # # # # #
+
+
+def test_archive_cutoff(settings):
+    settings.ARCHIVE_AFTER_DAYS = 7
+    assert archive_cutoff(today=date(2024, 11, 8)) == date(2024, 11, 1)
+
+
+def test_archive_moves_finished_schedules(make_schedule):
+    finished = make_schedule(end_date="2024-10-23")
+    upcoming = make_schedule(end_date="2024-11-05")
+
+    assert archive_schedules(before=date(2024, 11, 1)) == 1
+
+    assert list(HolidaySchedule.objects.values_list("id", flat=True)) == [upcoming.id]
+    assert ScheduleItem.objects.filter(holiday_schedule_id=finished.id).count() == 0
+    archived = ArchivedSchedule.objects.get()
+    assert archived.id == finished.id
+    assert archived.end_date == date(2024, 10, 23)
+    assert archived.weather_version == 3
+    assert archived.created_at == finished.created_at
+
+
+def test_archive_resumes_in_batches(make_schedule):
+    for _ in range(5):
+        make_schedule()
+
+    assert archive_schedules(before=date(2024, 11, 1), batch_size=2, max_batches=1) == 2
+    assert HolidaySchedule.objects.count() == 3
+    # An interrupted run leaves nothing half done, the next one carries on
+    assert archive_schedules(before=date(2024, 11, 1), batch_size=2) == 3
+    assert HolidaySchedule.objects.count() == 0
+    assert ArchivedSchedule.objects.count() == 5
+
+
+def test_archive_command(make_schedule):
+    make_schedule()
+    call_command("archive_schedules", "--before", "2024-11-01", "--batch-size", "1")
+    assert ArchivedSchedule.objects.count() == 1
+
+
+# # # # # # # # # # # # # # # # # # #
+#    ARCHIVED SCHEDULE ENDPOINTS    #
+# # # # # # # # # # # # # # # # # # #
+
+
+def test_retrieve_archived_schedule(api_client, make_schedule):
+    schedule = make_schedule()
+    url = f"/api/schedules/{schedule.id}/"
+    before = api_client.get(url).json()
+    hourly_before = api_client.get(url + "?resolution=hourly").json()
+
+    archive_schedules(before=date(2024, 11, 1))
+    response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response["Archived"] == "true"
+    assert response["Weather-Version"] == "3"
+    assert response.json() == before
+    assert api_client.get(url + "?resolution=hourly").json() == hourly_before
+
+    revalidated = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert revalidated.status_code == 304
+
+
+def test_retrieve_archived_schedule_delta(api_client, make_schedule):
+    schedule = make_schedule()
+    archive_schedules(before=date(2024, 11, 1))
+    url = f"/api/schedules/{schedule.id}/"
+
+    current = api_client.get(url + "?since=3").json()
+    assert current["destinations"] == []
+    outdated = api_client.get(url + "?since=1").json()
+    assert outdated["full"] is True
+    assert outdated["schedule"]["id"] == schedule.id
+
+
+def test_retrieve_missing_schedule(api_client):
+    assert api_client.get("/api/schedules/999/").status_code == 404
+
+
+def test_list_archived_schedules(api_client, make_schedule):
+    schedule = make_schedule()
+    make_schedule(end_date="2024-11-05")
+    archive_schedules(before=date(2024, 11, 1))
+
+    response = api_client.get("/api/schedules/archived/")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [schedule.id]
+    assert response.json()[0]["end_date"] == "2024-10-23"
+    # Archived schedules are not part of the regular list
+    assert len(api_client.get("/api/schedules/").json()) == 1
+    assert APIClient().get("/api/schedules/archived/").status_code in (401, 403)
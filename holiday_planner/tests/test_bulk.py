@@ -0,0 +1,188 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from holiday_planner.bulk import (
+    CSV_COLUMNS,
+    ScheduleImportError,
+    import_schedule_records,
+    iter_csv,
+    iter_schedule_records,
+    parse_csv,
+    parse_ndjson,
+)
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+# # # # # # # # # # # #
+#      FIXTURES       #
+# # # # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    schedule = HolidaySchedule.objects.create(
+        user=user, start_date="2024-10-20", end_date="2024-10-23"
+    )
+    paris = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=schedule,
+        destination=paris,
+        start_date="2024-10-20",
+        end_date="2024-10-21",
+        weather_data=[{"date": "2024-10-20", "weather_description": "Fog"}],
+    )
+    return schedule
+
+
+# # # # # # # # # # #
+#    BULK TESTS     #
+# # # # # # # # # # #
+
+
+@pytest.mark.django_db
+def test_export_ndjson_endpoint(api_client, holiday_schedule):
+    response = api_client.get("/api/schedules/export/")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["id"] == holiday_schedule.id
+    assert record["user"] == "testuser"
+    assert record["destinations"][0]["destination"] == "Paris"
+    assert record["destinations"][0]["weather_data"][0]["weather_description"] == "Fog"
+
+
+@pytest.mark.django_db
+def test_export_requires_authentication(holiday_schedule):
+    response = APIClient().get("/api/schedules/export/")
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_csv_round_trip(user, holiday_schedule):
+    exported = "".join(iter_csv(iter_schedule_records()))
+
+    created = import_schedule_records(parse_csv(exported.splitlines(keepends=True)))
+    assert created == 1
+
+    imported = HolidaySchedule.objects.exclude(id=holiday_schedule.id).get()
+    assert imported.user == user
+    item = imported.destinations.get()
+    # Existing destinations are reused rather than duplicated
+    assert item.destination.name == "Paris"
+    assert Destination.objects.count() == 1
+    assert item.weather_data == [{"date": "2024-10-20", "weather_description": "Fog"}]
+
+
+@pytest.mark.django_db
+def test_import_endpoint_batches(api_client, user):
+    records = [
+        {
+            "user": "someone-else",
+            "start_date": "2024-11-01",
+            "end_date": "2024-11-03",
+            "destinations": [
+                {
+                    "destination": f"Town {i}",
+                    "country": "Nowhere",
+                    "latitude": 1.0,
+                    "longitude": 2.0,
+                    "start_date": "2024-11-01",
+                    "end_date": "2024-11-03",
+                    "length_of_stay": None,
+                    "weather_data": None,
+                }
+            ],
+        }
+        for i in range(5)
+    ]
+    body = "\n".join(json.dumps(record) for record in records)
+
+    response = api_client.post(
+        "/api/schedules/import/", body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 201
+    assert response.json() == {"imported": 5}
+    # Imported schedules belong to the authenticated user
+    assert HolidaySchedule.objects.filter(user=user).count() == 5
+    assert ScheduleItem.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_import_rejects_non_object_lines(api_client):
+    response = api_client.post(
+        "/api/schedules/import/",
+        '\n["not", "a", "schedule"]',
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "error": "Line 2 is not a JSON object",
+        "imported": 0,
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "changes, error",
+    [
+        ({"start_date": None}, "Line 2: start_date is required"),
+        ({"end_date": "soon"}, "Line 2: end_date 'soon' is not an ISO date"),
+        ({"destinations": "Paris"}, "Line 2: destinations must be a list"),
+        ({"destinations": ["Paris"]}, "Line 2: destinations must be JSON objects"),
+        (
+            {"destinations": [{"destination": "Paris", "latitude": "48.8"}]},
+            "Line 2: latitude must be a number",
+        ),
+    ],
+)
+def test_import_rejects_invalid_records(api_client, changes, error):
+    record = {"start_date": "2024-11-01", "end_date": "2024-11-03"}
+    body = "\n".join([json.dumps(record), json.dumps({**record, **changes})])
+
+    response = api_client.post(
+        "/api/schedules/import/", body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": error, "imported": 0}
+    assert HolidaySchedule.objects.count() == 0
+
+
+def test_csv_errors_name_the_line():
+    lines = [
+        ",".join(CSV_COLUMNS),
+        "1,someone,2024-11-01,2024-11-03,Paris,France,48.8,2.3,,,,",
+        "2,someone,2024-11-01,,Lyon,France,45.7,4.8,,,,",
+    ]
+    records = parse_csv(line + "\n" for line in lines)
+
+    assert next(records)["destinations"][0]["destination"] == "Paris"
+    with pytest.raises(ValueError, match="Line 3: end_date '' is not an ISO date"):
+        next(records)
+
+
+@pytest.mark.django_db
+def test_import_error_reports_committed_batches(user):
+    record = {"start_date": "2024-11-01", "end_date": "2024-11-03"}
+    lines = [json.dumps(record), json.dumps(record), "1"]
+
+    with pytest.raises(ScheduleImportError) as exc_info:
+        import_schedule_records(parse_ndjson(lines), user=user, batch_size=1)
+
+    assert exc_info.value.imported == 2
+    assert HolidaySchedule.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_export_and_import_commands(tmp_path, holiday_schedule):
+    path = tmp_path / "schedules.ndjson"
+    call_command("export_schedules", "--output", str(path), "--chunk-size", "1")
+    call_command("import_schedules", str(path), "--batch-size", "1")
+
+    assert HolidaySchedule.objects.count() == 2
+    assert ScheduleItem.objects.count() == 2
@@ -0,0 +1,126 @@
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+from holiday_planner.cache import is_shared_cache, require_shared_cache
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+# # # # # # # # # # # #
+#      FIXTURES       #
+# # # # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    schedule = HolidaySchedule.objects.create(
+        user=user, start_date="2024-10-20", end_date="2024-10-23"
+    )
+    paris = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=schedule,
+        destination=paris,
+        start_date="2024-10-20",
+        end_date="2024-10-21",
+        weather_data=[{"date": "2024-10-20", "weather_description": "Fog"}],
+    )
+    return schedule
+
+
+# # # # # # # # # # # # #
+# RESPONSE CACHE TESTS  #
+# # # # # # # # # # # # #
+
+
+@pytest.mark.django_db
+def test_detail_served_from_cache(
+    api_client, holiday_schedule, django_assert_num_queries
+):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    first = api_client.get(url)
+    assert first.status_code == 200
+
+    with django_assert_num_queries(0):
+        second = api_client.get(url)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second["ETag"] == first["ETag"]
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_item_save_invalidates_cache(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    api_client.get(url)
+
+    item = holiday_schedule.destinations.get()
+    item.weather_data = [{"date": "2024-10-20", "weather_description": "Overcast"}]
+    item.save()
+
+    response = api_client.get(url)
+    weather_data = response.json()["destinations"][0]["weather_data"]
+    assert weather_data[0]["weather_description"] == "Overcast"
+
+
+@pytest.mark.django_db
+def test_update_invalidates_cache(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    api_client.get(url)
+
+    data = {"start_date": "2024-10-20", "end_date": "2024-10-25"}
+    assert api_client.patch(url, data, format="json").status_code == 200
+
+    assert api_client.get(url).json()["end_date"] == "2024-10-25"
+
+
+@pytest.mark.django_db
+def test_delete_invalidates_cache(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    api_client.get(url)
+
+    assert api_client.delete(url).status_code == 204
+    assert api_client.get(url).status_code == 404
+
+
+# # # # # # # # # # # # #
+#    SHARED CACHE       #
+# # # # # # # # # # # # #
+
+
+def load_gunicorn_config():
+    path = Path(django_settings.BASE_DIR) / "gunicorn.conf.py"
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_local_memory_cache_is_not_shared(settings, tmp_path):
+    assert not is_shared_cache()
+    with pytest.raises(ImproperlyConfigured, match="LocMemCache"):
+        require_shared_cache("Testing")
+
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    assert is_shared_cache()
+    require_shared_cache("Testing")
+
+
+def test_gunicorn_refuses_local_cache_with_several_workers():
+    config = load_gunicorn_config()
+
+    with pytest.raises(RuntimeError, match="Running 4 workers"):
+        config.on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=4)))
+    # A single worker is a single process
+    config.on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=1)))
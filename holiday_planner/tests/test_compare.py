@@ -0,0 +1,190 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from holiday_planner.compare import compare_forecasts
+from holiday_planner.models import Destination
+from holiday_planner.weather_service import (
+    DAILY_VARIABLES,
+    fetch_daily_forecasts,
+    fetch_weather_data,
+)
+
+START = 1729375200
+DAY = 86400
+
+
+def daily_values(days, temperature_max, precipitation, weather_code=0, wind=10):
+    values = {
+        "weather_code": weather_code,
+        "temperature_2m_max": temperature_max,
+        "temperature_2m_min": 10,
+        "uv_index_max": 3,
+        "precipitation_probability_max": precipitation,
+        "wind_speed_10m_max": wind,
+        "wind_gusts_10m_max": 30,
+        "wind_direction_10m_dominant": 180,
+    }
+    return [
+        np.broadcast_to(np.asarray(values[name], dtype="f4"), days)
+        for name in DAILY_VARIABLES
+    ]
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def upstream(build_forecast):
+    # Serves one message per requested location, the temperature is the latitude
+    def get(url, params, timeout):
+        latitudes = params["latitude"]
+        latitudes = latitudes if isinstance(latitudes, list) else [latitudes]
+        start = np.datetime64(params["start_date"], "s").astype("i8") - 7200
+        days = (
+            np.datetime64(params["end_date"]) - np.datetime64(params["start_date"])
+        ).astype(int) + 1
+        content = b"".join(
+            build_forecast(
+                daily=(start, start + days * DAY, DAY, daily_values(days, lat, 10))
+            )
+            for lat in latitudes
+        )
+        return MagicMock(status_code=200, content=content)
+
+    with patch("holiday_planner.providers.retry_session.get", side_effect=get) as mock:
+        yield mock
+
+
+# # # # # # # # # # # #
+#   COMPARISON TESTS  #
+# # # # # # # # # # # #
+
+
+def test_compare_forecasts(build_forecast):
+    days = (START, START + 3 * DAY, DAY)
+    raws = [
+        build_forecast(daily=(*days, daily_values(3, [22, 22, 22], [0, 0, 0]))),
+        build_forecast(
+            daily=(*days, daily_values(3, [30, 25, 14], [80, 10, 0], [61, 3, 0], 35))
+        ),
+    ]
+
+    result = compare_forecasts(
+        ["Lisbon", "Oslo"], raws, ["temperature_max", "weather_code"]
+    )
+
+    assert result["destinations"] == ["Lisbon", "Oslo"]
+    # Local dates of the days
+    assert result["dates"] == ["2024-10-20", "2024-10-21", "2024-10-22"]
+    assert result["variables"] == {
+        "temperature_max": [[22, 22, 22], [30, 25, 14]],
+        "weather_code": [[0.0, 0.0, 0.0], [61.0, 3.0, 0.0]],
+    }
+    lisbon, oslo = result["summary"]
+    assert lisbon == {
+        "place_name": "Lisbon",
+        "mean_temperature_max": 22.0,
+        "rainy_days": 0,
+        "comfort_score": 100.0,
+    }
+    assert oslo["mean_temperature_max"] == 23.0
+    assert oslo["rainy_days"] == 1
+    # ((100 - 24 - 32 - 15) + (100 - 9 - 4 - 15) + (100 - 24 - 0 - 15)) / 3
+    assert oslo["comfort_score"] == pytest.approx(54.0)
+
+
+@pytest.mark.django_db
+def test_misses_are_fetched_in_one_batch(upstream):
+    fetch_weather_data(1.0, 1.0, "2024-10-20", "2024-10-22")
+    assert upstream.call_count == 1
+
+    raws = fetch_daily_forecasts(
+        [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0), (2.0, 2.0)], "2024-10-20", "2024-10-22"
+    )
+    assert upstream.call_count == 2
+    assert upstream.call_args.kwargs["params"]["latitude"] == [2.0, 3.0]
+    assert len(raws) == 4 and raws[1] == raws[3]
+
+    # Each location of the batch was cached on its own
+    assert (
+        fetch_weather_data(3.0, 3.0, "2024-10-20", "2024-10-22")[0]["temperature_max"]
+        == 3
+    )
+    assert upstream.call_count == 2
+
+
+@pytest.mark.django_db
+@patch("geopy.Nominatim.geocode")
+def test_compare_endpoint(mock_geocode, api_client, upstream):
+    Destination.objects.create(
+        name="Oslo", country="Norway", latitude=59.9, longitude=10.7
+    )
+    mock_geocode.return_value = type(
+        "Location",
+        (object,),
+        {"latitude": 38.7, "longitude": -9.1, "address": "Lisbon, Portugal"},
+    )()
+
+    response = api_client.post(
+        "/api/weather/compare/",
+        {
+            "place_names": ["Lisbon", "Oslo"],
+            "start_date": "2024-10-20",
+            "end_date": "2024-10-22",
+            "variables": ["temperature_max"],
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["destinations"] == ["Lisbon", "Oslo"]
+    assert data["dates"] == ["2024-10-20", "2024-10-21", "2024-10-22"]
+    assert data["variables"] == {"temperature_max": [[39, 39, 39], [60, 60, 60]]}
+    assert [s["place_name"] for s in data["summary"]] == ["Lisbon", "Oslo"]
+    # Oslo was already known
+    assert mock_geocode.call_count == 1
+    assert upstream.call_count == 1
+
+
+@pytest.mark.django_db
+def test_compare_fifty_destinations(api_client, upstream):
+    names = [f"Place {i}" for i in range(50)]
+    Destination.objects.bulk_create(
+        [
+            Destination(name=name, country="", latitude=i, longitude=i)
+            for i, name in enumerate(names)
+        ]
+    )
+
+    response = api_client.post(
+        "/api/weather/compare/",
+        {"place_names": names, "start_date": "2024-10-20", "end_date": "2024-11-04"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["dates"]) == 16
+    assert np.array(data["variables"]["temperature_max"]).shape == (50, 16)
+    assert len(data["summary"]) == 50
+    assert upstream.call_count == 1
+
+
+@pytest.mark.django_db
+def test_compare_validation(api_client):
+    data = {"place_names": ["Oslo"], "start_date": "2024-10-20"}
+    for invalid in [
+        {"end_date": "2024-10-19"},
+        {"end_date": "2024-11-20"},
+        {"end_date": "2024-10-21", "variables": ["humidity"]},
+        {"end_date": "2024-10-21", "place_names": []},
+        {"end_date": "2024-10-21", "place_names": ["x"] * 51},
+    ]:
+        response = api_client.post(
+            "/api/weather/compare/", {**data, **invalid}, format="json"
+        )
+        assert response.status_code == 400, invalid
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+from django.utils.http import http_date
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+# # # # # # # # # # # #
+#      FIXTURES       #
+# # # # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    schedule = HolidaySchedule.objects.create(
+        user=user, start_date="2024-10-20", end_date="2024-10-23"
+    )
+    paris = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=schedule,
+        destination=paris,
+        start_date="2024-10-20",
+        end_date="2024-10-21",
+    )
+    return schedule
+
+
+# # # # # # # # # # # # # #
+# CONDITIONAL GET TESTS   #
+# # # # # # # # # # # # # #
+
+
+@pytest.mark.django_db
+def test_detail_not_modified(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("ETag")
+    assert response.has_header("Last-Modified")
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_detail_etag_changes_with_items(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    etag = api_client.get(url)["ETag"]
+
+    item = holiday_schedule.destinations.get()
+    item.weather_data = [{"date": "2024-10-20", "weather_description": "Fog"}]
+    item.save()
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_list_not_modified(api_client, holiday_schedule):
+    etag = api_client.get("/api/schedules/")["ETag"]
+    assert api_client.get("/api/schedules/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    HolidaySchedule.objects.create(
+        user=holiday_schedule.user, start_date="2024-11-01", end_date="2024-11-02"
+    )
+    assert api_client.get("/api/schedules/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_has_no_last_modified(api_client, holiday_schedule, user):
+    other = HolidaySchedule.objects.create(
+        user=user, start_date="2024-11-01", end_date="2024-11-02"
+    )
+    response = api_client.get("/api/schedules/")
+    assert not response.has_header("Last-Modified")
+
+    # A deletion leaves the newest updated_at as it was
+    since = http_date(other.updated_at.timestamp() + 60)
+    other.delete()
+    response = api_client.get("/api/schedules/", HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+@pytest.mark.django_db
+def test_detail_missing_schedule(api_client):
+    assert api_client.get("/api/schedules/999/").status_code == 404
+    assert api_client.get("/api/schedules/abc/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_patch_if_match(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    etag = api_client.get(url)["ETag"]
+    data = {"start_date": "2024-10-20", "end_date": "2024-10-24"}
+
+    response = api_client.patch(url, data, format="json", HTTP_IF_MATCH='"stale"')
+    assert response.status_code == 412
+
+    response = api_client.patch(url, data, format="json", HTTP_IF_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+    # The old version no longer matches after the update
+    response = api_client.patch(url, data, format="json", HTTP_IF_MATCH=etag)
+    assert response.status_code == 412
+
+
+@pytest.mark.django_db
+def test_update_locks_only_with_preconditions(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    data = {"end_date": "2024-10-24"}
+
+    with patch("django.db.models.QuerySet.select_for_update") as lock:
+        assert api_client.patch(url, data, format="json").status_code == 200
+        lock.assert_not_called()
+
+        etag = api_client.get(url)["ETag"]
+        api_client.patch(url, data, format="json", HTTP_IF_MATCH=etag)
+        lock.assert_called_once()
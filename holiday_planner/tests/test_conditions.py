@@ -0,0 +1,183 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from holiday_planner.bulk import import_schedule_records
+from holiday_planner.conditions import summarize_weather
+from holiday_planner.events import refresh_schedule_weather
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.tests.test_filters import assert_uses_index
+
+DRY = [
+    {
+        "date": "2024-10-20",
+        "weather_code": 1.0,
+        "temperature_min": 12,
+        "precipitation_probability_max": 10,
+    },
+    {
+        "date": "2024-10-21",
+        "weather_code": 3.0,
+        "temperature_min": 9,
+        "precipitation_probability_max": 20,
+    },
+]
+STORMY = [
+    {
+        "date": "2024-10-20",
+        "weather_code": 95.0,
+        "temperature_min": 2,
+        "precipitation_probability_max": 90,
+    },
+]
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def make_schedule(user):
+    def make(weather_data, start_date="2024-10-20", name="Paris"):
+        end_date = start_date
+        schedule = HolidaySchedule.objects.create(
+            user=user, start_date=start_date, end_date=end_date
+        )
+        ScheduleItem.objects.create(
+            holiday_schedule=schedule,
+            destination=Destination.objects.get_or_create(
+                name=name, country="France", latitude=48.8566, longitude=2.3522
+            )[0],
+            start_date=start_date,
+            end_date=end_date,
+            weather_data=weather_data,
+        )
+        return schedule
+
+    return make
+
+
+# # # # # # # # # # # #
+#    SUMMARY TESTS    #
+# # # # # # # # # # # #
+
+
+def test_summarize_weather():
+    assert summarize_weather(DRY) == {
+        "max_precipitation_probability": 20,
+        "min_temperature": 9,
+        "worst_weather_code": 3,
+    }
+
+
+def test_summarize_missing_weather():
+    empty = {
+        "max_precipitation_probability": None,
+        "min_temperature": None,
+        "worst_weather_code": None,
+    }
+    assert summarize_weather(None) == empty
+    assert summarize_weather([{"date": "2024-10-20", "weather_code": None}]) == empty
+    assert summarize_weather([{"temperature_min": float("nan")}]) == empty
+
+
+def test_summary_maintained_on_save(make_schedule):
+    item = make_schedule(DRY).destinations.get()
+    assert item.max_precipitation_probability == 20
+
+    item.weather_data = STORMY
+    item.save(update_fields=["weather_data"])
+    item.refresh_from_db()
+    assert item.max_precipitation_probability == 90
+    assert item.worst_weather_code == 95
+
+
+def test_summary_maintained_on_refresh(make_schedule, shared_cache):
+    schedule = make_schedule(DRY)
+    with patch("holiday_planner.events.fetch_weather_data", return_value=STORMY):
+        refresh_schedule_weather(schedule.id)
+
+    item = schedule.destinations.get()
+    assert item.min_temperature == 2
+    assert item.worst_weather_code == 95
+
+
+def test_summary_maintained_on_import(user):
+    import_schedule_records(
+        [
+            {
+                "user": "testuser",
+                "start_date": "2024-10-20",
+                "end_date": "2024-10-20",
+                "destinations": [
+                    {
+                        "destination": "Paris",
+                        "latitude": 48.8566,
+                        "longitude": 2.3522,
+                        "weather_data": STORMY,
+                    }
+                ],
+            }
+        ]
+    )
+    assert ScheduleItem.objects.get().max_precipitation_probability == 90
+
+
+# # # # # # # # # # # # # # # #
+#    FILTERS AND REPORTING    #
+# # # # # # # # # # # # # # # #
+
+
+def test_filter_by_weather(api_client, make_schedule):
+    make_schedule(DRY)
+    stormy = make_schedule(STORMY, name="Lyon")
+
+    for query in [
+        "precipitation_above=80",
+        "temperature_below=5",
+        "weather_code_above=60",
+    ]:
+        response = api_client.get(f"/api/schedules/?{query}")
+        assert [schedule["id"] for schedule in response.json()] == [stormy.id]
+
+    # Conditions apply to the same item
+    response = api_client.get(
+        "/api/schedules/?precipitation_above=80&destination=Paris"
+    )
+    assert response.json() == []
+    assert api_client.get("/api/schedules/?precipitation_above=101").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"precipitation_above": 80},
+        {"temperature_below": 0},
+        {"weather_code_above": 60},
+    ],
+)
+def test_weather_filters_use_indexes(db, filters):
+    assert_uses_index(HolidaySchedule.objects.matching(**filters))
+
+
+def test_weather_report(make_schedule):
+    today = timezone.localdate()
+    make_schedule(DRY, start_date=today)
+    stormy = make_schedule(STORMY, start_date=today + timedelta(days=1), name="Lyon")
+    # Past trips are not reported
+    make_schedule(STORMY, start_date=today - timedelta(days=3))
+
+    out = StringIO()
+    call_command(
+        "weather_report", "--precipitation-above", "80", stdout=out, stderr=StringIO()
+    )
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("schedule,user,destination")
+    assert len(lines) == 2
+    assert lines[1].startswith(f"{stormy.id},testuser,Lyon,")
+    assert lines[1].endswith(",90,2.0,95,Slight or moderate thunderstorm")
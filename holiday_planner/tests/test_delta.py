@@ -0,0 +1,182 @@
+from unittest.mock import patch
+
+import pytest
+from holiday_planner.delta import weather_day_versions, weather_patch
+from holiday_planner.events import refresh_schedule_weather
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+WEATHER_DATA = [
+    {"date": "2024-10-20", "weather_code": 2.0, "temperature_max": 18},
+    {"date": "2024-10-21", "weather_code": 3.0, "temperature_max": 15},
+]
+CHANGED_DAY = {"date": "2024-10-21", "weather_code": 61.0, "temperature_max": 12}
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    # As created through the API: everything at weather version 1
+    schedule = HolidaySchedule.objects.create(
+        user=user,
+        start_date="2024-10-20",
+        end_date="2024-10-23",
+        weather_version=1,
+        destinations_version=1,
+    )
+    for name in ["Paris", "Lyon"]:
+        ScheduleItem.objects.create(
+            holiday_schedule=schedule,
+            destination=Destination.objects.create(
+                name=name, country="France", latitude=48.8566, longitude=2.3522
+            ),
+            start_date="2024-10-20",
+            end_date="2024-10-21",
+            weather_data=WEATHER_DATA,
+            weather_versions=weather_day_versions(None, WEATHER_DATA, None, 1),
+        )
+    return schedule
+
+
+@pytest.fixture
+def refreshed(holiday_schedule, shared_cache):
+    # Only the second day of Lyon changes, in weather version 2
+    responses = [WEATHER_DATA, [WEATHER_DATA[0], CHANGED_DAY]]
+    with patch("holiday_planner.events.fetch_weather_data", side_effect=responses):
+        refresh_schedule_weather(holiday_schedule.id)
+    return holiday_schedule
+
+
+# # # # # # # # # # # #
+#    VERSION TESTS    #
+# # # # # # # # # # # #
+
+
+def test_weather_day_versions():
+    new = [WEATHER_DATA[0], CHANGED_DAY, {"date": "2024-10-22"}]
+    old_versions = {"2024-10-20": 1, "2024-10-21": 1}
+
+    assert weather_day_versions(WEATHER_DATA, new, old_versions, 3) == {
+        "2024-10-20": 1,
+        "2024-10-21": 3,
+        "2024-10-22": 3,
+    }
+    assert weather_day_versions(None, WEATHER_DATA, None, 1) == {
+        "2024-10-20": 1,
+        "2024-10-21": 1,
+    }
+
+
+def test_weather_patch():
+    items = [
+        (WEATHER_DATA, {"2024-10-20": 1, "2024-10-21": 1}),
+        ([WEATHER_DATA[0], CHANGED_DAY], {"2024-10-20": 1, "2024-10-21": 4}),
+        (None, {}),
+    ]
+
+    assert weather_patch(items, 1) == [{"index": 1, "days": [CHANGED_DAY]}]
+    assert weather_patch(items, 4) == []
+
+
+def test_refresh_bumps_versions(refreshed):
+    refreshed.refresh_from_db()
+
+    assert refreshed.weather_version == 2
+    assert refreshed.destinations_version == 1
+    assert [item.weather_versions for item in ScheduleItem.objects.order_by("id")] == [
+        {"2024-10-20": 1, "2024-10-21": 1},
+        {"2024-10-20": 1, "2024-10-21": 2},
+    ]
+
+
+# # # # # # # # # # # # #
+#   DELTA RESPONSES     #
+# # # # # # # # # # # # #
+
+
+def test_retrieve_returns_weather_version(api_client, refreshed):
+    response = api_client.get(f"/api/schedules/{refreshed.id}/")
+
+    assert response.status_code == 200
+    assert response["Weather-Version"] == "2"
+    assert len(response.data["destinations"]) == 2
+
+
+def test_retrieve_since_returns_changed_days(api_client, refreshed):
+    response = api_client.get(f"/api/schedules/{refreshed.id}/?since=1")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": refreshed.id,
+        "version": 2,
+        "since": 1,
+        "destinations": [{"index": 1, "days": [CHANGED_DAY]}],
+    }
+
+    response = api_client.get(f"/api/schedules/{refreshed.id}/?since=2")
+    assert response.json()["destinations"] == []
+
+
+def test_retrieve_since_before_items_replaced_is_full(api_client, refreshed):
+    full = api_client.get(f"/api/schedules/{refreshed.id}/").json()
+
+    for since in [0, 3]:
+        response = api_client.get(f"/api/schedules/{refreshed.id}/?since={since}")
+        assert response.json() == {
+            "id": refreshed.id,
+            "version": 2,
+            "since": since,
+            "full": True,
+            "schedule": full,
+        }
+
+
+def test_update_with_destinations_requires_full_sync(
+    api_client, refreshed, mock_geocode
+):
+    with patch(
+        "holiday_planner.serializers.fetch_weather_data", return_value=WEATHER_DATA
+    ):
+        response = api_client.put(
+            f"/api/schedules/{refreshed.id}/",
+            {
+                "start_date": "2024-10-20",
+                "end_date": "2024-10-23",
+                "destinations_input": [{"place_name": "Paris", "length_of_stay": "2"}],
+            },
+            format="json",
+        )
+    assert response.status_code == 200
+
+    response = api_client.get(f"/api/schedules/{refreshed.id}/?since=2")
+    assert response["Weather-Version"] == "3"
+    assert response.json()["full"] is True
+    assert ScheduleItem.objects.get().weather_versions == {
+        "2024-10-20": 3,
+        "2024-10-21": 3,
+    }
+
+
+def test_date_change_requires_full_sync(api_client, refreshed):
+    url = f"/api/schedules/{refreshed.id}/"
+    response = api_client.patch(url, {"end_date": "2024-10-24"}, format="json")
+    assert response.status_code == 200
+
+    response = api_client.get(f"{url}?since=2")
+    assert response["Weather-Version"] == "3"
+    assert response.json()["full"] is True
+    assert response.json()["schedule"]["end_date"] == "2024-10-24"
+
+    # Unchanged dates keep the version
+    api_client.patch(url, {"end_date": "2024-10-24"}, format="json")
+    assert api_client.get(url)["Weather-Version"] == "3"
+
+
+def test_retrieve_since_validation(api_client, holiday_schedule):
+    response = api_client.get(f"/api/schedules/{holiday_schedule.id}/?since=-1")
+
+    assert response.status_code == 400
+    assert "since" in response.data
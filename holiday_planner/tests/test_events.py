@@ -0,0 +1,230 @@
+import asyncio
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import Client
+from holiday_planner.cache import get_cached_schedule, set_cached_schedule
+from holiday_planner.events import (
+    broker,
+    material_changes,
+    publish,
+    read_events,
+    refresh_schedule_weather,
+)
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.views import _schedule_event_stream
+
+WEATHER_DATA = [
+    {
+        "date": "2024-10-20",
+        "weather_code": 2.0,
+        "temperature_max": 18,
+        "precipitation_probability_max": 10,
+    },
+    {
+        "date": "2024-10-21",
+        "weather_code": 3.0,
+        "temperature_max": 15,
+        "precipitation_probability_max": 20,
+    },
+]
+
+
+def changed_weather(**changes):
+    # Copy of WEATHER_DATA with the values of the second day replaced
+    return [WEATHER_DATA[0], {**WEATHER_DATA[1], **changes}]
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    schedule = HolidaySchedule.objects.create(
+        user=user, start_date=date(2024, 10, 20), end_date=date(2024, 10, 21)
+    )
+    destination = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=schedule,
+        destination=destination,
+        start_date=date(2024, 10, 20),
+        end_date=date(2024, 10, 21),
+        weather_data=WEATHER_DATA,
+    )
+    return schedule
+
+
+@pytest.fixture(autouse=True)
+def event_log_cache(shared_cache):
+    # The event log refuses the local-memory cache the other tests use
+    pass
+
+
+@pytest.fixture
+def fast_polling(settings):
+    settings.SSE_POLL_INTERVAL = 0.01
+    settings.SSE_HEARTBEAT_INTERVAL = 0.2
+
+
+# # # # # # # # # # # # # # #
+#  CHANGE DETECTION TESTS   #
+# # # # # # # # # # # # # # #
+
+
+def test_material_changes_thresholds():
+    new = changed_weather(
+        weather_code=61.0, temperature_max=17, precipitation_probability_max=40
+    )
+
+    assert material_changes(WEATHER_DATA, new) == [
+        {
+            "date": "2024-10-21",
+            "changed": {
+                "weather_code": [3.0, 61.0],
+                "precipitation_probability_max": [20, 40],
+            },
+        }
+    ]
+    assert material_changes(WEATHER_DATA, changed_weather(temperature_max=17)) == []
+
+
+def test_material_changes_ignores_new_days_and_missing_values():
+    new = changed_weather(temperature_max=None) + [
+        {"date": "2024-10-22", "temperature_max": 30}
+    ]
+
+    assert material_changes(WEATHER_DATA, new) == []
+    assert material_changes(None, WEATHER_DATA) == []
+
+
+def test_refresh_publishes_material_changes(holiday_schedule):
+    version, _ = get_cached_schedule(holiday_schedule.id, "json")
+    set_cached_schedule(holiday_schedule.id, version, "json", {"cached": True})
+    new = changed_weather(weather_code=61.0)
+
+    with patch("holiday_planner.events.fetch_weather_data", return_value=new) as mock:
+        event = refresh_schedule_weather(holiday_schedule.id)
+
+    # The item's own dates, as the serializer fetches them
+    assert mock.call_args.kwargs["start_date"] == date(2024, 10, 20)
+    assert event == {
+        "schedule": holiday_schedule.id,
+        "destinations": [
+            {
+                "destination": "Paris",
+                "days": [
+                    {"date": "2024-10-21", "changed": {"weather_code": [3.0, 61.0]}}
+                ],
+            }
+        ],
+    }
+    assert read_events(holiday_schedule.id, 0) == [(1, event)]
+    assert ScheduleItem.objects.get().weather_data == new
+    assert get_cached_schedule(holiday_schedule.id, "json")[1] is None
+
+
+def test_refresh_saves_minor_changes_without_event(holiday_schedule):
+    new = changed_weather(temperature_max=16)
+
+    with patch("holiday_planner.events.fetch_weather_data", return_value=new):
+        assert refresh_schedule_weather(holiday_schedule.id) is None
+
+    assert ScheduleItem.objects.get().weather_data == new
+    assert read_events(holiday_schedule.id, 0) == []
+
+
+def test_refresh_command(holiday_schedule):
+    new = changed_weather(weather_code=61.0)
+
+    with patch("holiday_planner.events.fetch_weather_data", return_value=new):
+        call_command("refresh_schedule_weather", schedule=[holiday_schedule.id])
+
+    assert len(read_events(holiday_schedule.id, 0)) == 1
+
+
+def test_refresh_command_needs_shared_cache(holiday_schedule, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+    with patch("holiday_planner.events.fetch_weather_data") as mock:
+        with pytest.raises(CommandError, match="shared between processes"):
+            call_command("refresh_schedule_weather")
+        with pytest.raises(ImproperlyConfigured):
+            publish(holiday_schedule.id, {"schedule": holiday_schedule.id})
+        with pytest.raises(ImproperlyConfigured):
+            read_events(holiday_schedule.id, 0)
+    mock.assert_not_called()
+
+
+def test_events_are_read_through_another_cache_client(tmp_path):
+    # The publisher and the server workers run in separate processes
+    publish(7, {"schedule": 7})
+
+    worker_cache = FileBasedCache(str(tmp_path / "cache"), {})
+    with patch("holiday_planner.events.cache", worker_cache):
+        assert read_events(7, 0) == [(1, {"schedule": 7})]
+
+
+# # # # # # # # # # # #
+#     STREAM TESTS    #
+# # # # # # # # # # # #
+
+
+def test_stream_pushes_published_events(holiday_schedule, fast_polling):
+    schedule_id = holiday_schedule.id
+
+    async def listen():
+        stream = _schedule_event_stream(schedule_id, 0)
+        messages = [await stream.__anext__()]
+        await sync_to_async(publish)(schedule_id, {"schedule": schedule_id})
+        messages.append(await asyncio.wait_for(stream.__anext__(), timeout=1))
+        messages.append(await asyncio.wait_for(stream.__anext__(), timeout=1))
+        await stream.aclose()
+        return messages
+
+    messages = async_to_sync(listen)()
+
+    assert messages[0] == "retry: 3000\n\n"
+    assert messages[1] == (
+        f'id: 1\nevent: weather\ndata: {{"schedule":{schedule_id}}}\n\n'
+    )
+    assert messages[2] == ": keep-alive\n\n"
+    assert schedule_id not in broker._subscribers
+
+
+def test_stream_replays_missed_events(holiday_schedule, fast_polling):
+    schedule_id = holiday_schedule.id
+    for i in range(3):
+        publish(schedule_id, {"n": i})
+
+    async def listen():
+        stream = _schedule_event_stream(schedule_id, 1)
+        messages = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return messages
+
+    messages = async_to_sync(listen)()
+
+    assert [message.split("\n")[0] for message in messages[1:]] == ["id: 2", "id: 3"]
+
+
+def test_events_view(holiday_schedule):
+    response = Client().get(f"/api/schedules/{holiday_schedule.id}/events/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+    assert response["Cache-Control"] == "no-cache"
+    assert "Content-Encoding" not in response
+    response.close()
+
+    assert Client().get("/api/schedules/999/events/").status_code == 404
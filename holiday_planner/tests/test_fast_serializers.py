@@ -0,0 +1,67 @@
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.serializers import HolidayScheduleSerializer, serialize_schedules
+
+# # # # # # # # # # # #
+#      FIXTURES       #
+# # # # # # # # # # # #
+
+
+@pytest.fixture
+def schedules(user):
+    other = User.objects.create_user(username="other", password="testpassword")
+    paris = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    london = Destination.objects.create(
+        name="London", country="UK", latitude=51.5074, longitude=-0.1278
+    )
+
+    first = HolidaySchedule.objects.create(
+        user=user, start_date="2024-10-20", end_date="2024-10-23"
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=first,
+        destination=paris,
+        start_date="2024-10-20",
+        end_date="2024-10-21",
+        length_of_stay=2,
+        weather_data=[
+            {"date": "2024-10-20", "weather_code": 45.0, "temperature_max": 14}
+        ],
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=first,
+        destination=london,
+        start_date=None,
+        end_date=None,
+    )
+    # A schedule without destinations
+    HolidaySchedule.objects.create(
+        user=other, start_date="2024-11-01", end_date="2024-11-02"
+    )
+    return HolidaySchedule.objects.prefetch_related("destinations__destination")
+
+
+# # # # # # # # # # # # # # #
+# FAST READ PATH TESTS      #
+# # # # # # # # # # # # # # #
+
+
+@pytest.mark.django_db
+def test_serialize_schedules_matches_serializer(schedules):
+    expected = HolidayScheduleSerializer(schedules, many=True).data
+    assert serialize_schedules(schedules) == expected
+
+
+@pytest.mark.django_db
+def test_api_uses_identical_output(user, schedules):
+    client = APIClient()
+    expected = HolidayScheduleSerializer(schedules, many=True).data
+
+    assert client.get("/api/schedules/").json() == expected
+    schedule = schedules.first()
+    response = client.get(f"/api/schedules/{schedule.id}/")
+    assert response.json() == HolidayScheduleSerializer(schedule).data
@@ -0,0 +1,149 @@
+from datetime import date
+
+import pytest
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+
+
+def assert_uses_index(queryset):
+    """
+    Assert that no table of the query is read with a full scan. Postgres prefers
+    sequential scans of tiny test tables, so they are disabled for the check.
+    """
+    if connection.vendor == "postgresql":
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        assert "Seq Scan" not in plan, plan
+    else:
+        plan = queryset.explain()
+        assert not [line for line in plan.splitlines() if " SCAN " in line], plan
+        assert "USING" in plan, plan
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def schedules(user, other_user):
+    paris = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    rome = Destination.objects.create(
+        name="Rome", country="Italy", latitude=41.9028, longitude=12.4964
+    )
+
+    def create(owner, start_date, end_date, destination):
+        schedule = HolidaySchedule.objects.create(
+            user=owner, start_date=start_date, end_date=end_date
+        )
+        ScheduleItem.objects.create(
+            holiday_schedule=schedule,
+            destination=destination,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        return schedule
+
+    return {
+        "october": create(user, "2024-10-01", "2024-10-10", paris),
+        "november": create(user, "2024-11-01", "2024-11-10", rome),
+        "other": create(other_user, "2024-10-05", "2024-10-20", rome),
+    }
+
+
+def listed_ids(client, query):
+    response = client.get(f"/api/schedules/?{query}")
+    assert response.status_code == 200, response.json()
+    return sorted(schedule["id"] for schedule in response.json())
+
+
+# # # # # # # # # # # #
+#    FILTER TESTS     #
+# # # # # # # # # # # #
+
+
+def test_filter_mine(api_client, schedules):
+    assert listed_ids(api_client, "mine=true") == sorted(
+        [schedules["october"].id, schedules["november"].id]
+    )
+    assert APIClient().get("/api/schedules/?mine=true").status_code in (401, 403)
+
+
+def test_filter_user(api_client, schedules, other_user):
+    assert listed_ids(api_client, f"user={other_user.id}") == [schedules["other"].id]
+    assert listed_ids(api_client, f"mine=true&user={other_user.id}") == []
+
+
+def test_filter_dates(api_client, schedules):
+    assert listed_ids(api_client, "starts_after=2024-10-02") == sorted(
+        [schedules["november"].id, schedules["other"].id]
+    )
+    assert listed_ids(api_client, "ends_before=2024-10-10") == [schedules["october"].id]
+    assert listed_ids(api_client, "overlaps=2024-10-15,2024-11-01") == sorted(
+        [schedules["november"].id, schedules["other"].id]
+    )
+
+
+def test_filter_destination(api_client, schedules):
+    assert listed_ids(api_client, "destination=Rome") == sorted(
+        [schedules["november"].id, schedules["other"].id]
+    )
+    assert listed_ids(api_client, "destination=Rome&mine=true") == [
+        schedules["november"].id
+    ]
+
+
+def test_filter_applies_to_export(api_client, schedules):
+    response = api_client.get("/api/schedules/export/?destination=Paris")
+    lines = b"".join(response.streaming_content).splitlines()
+    assert len(lines) == 1
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "user=abc",
+        "starts_after=tomorrow",
+        "overlaps=2024-10-01",
+        "overlaps=2024-10-10,2024-10-01",
+    ],
+)
+def test_filter_validation(api_client, query):
+    assert api_client.get(f"/api/schedules/?{query}").status_code == 400
+
+
+def test_filters_do_not_apply_to_detail(api_client, schedules, other_user):
+    schedule = schedules["october"]
+    response = api_client.get(f"/api/schedules/{schedule.id}/?user={other_user.id}")
+    assert response.status_code == 200
+
+
+# # # # # # # # # # # # # #
+#    QUERY PLAN TESTS     #
+# # # # # # # # # # # # # #
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"user": 1},
+        {"user": 1, "starts_after": date(2024, 10, 1)},
+        {"starts_after": date(2024, 10, 1)},
+        {"ends_before": date(2024, 10, 1)},
+        {"overlaps": (date(2024, 10, 1), date(2024, 10, 31))},
+        {"destination": "Paris"},
+    ],
+)
+def test_filters_use_indexes(db, filters):
+    assert_uses_index(HolidaySchedule.objects.matching(**filters))
+
+
+def test_unfiltered_query_scans(db):
+    # Guards the helper above against never failing
+    with pytest.raises(AssertionError):
+        assert_uses_index(HolidaySchedule.objects.all())
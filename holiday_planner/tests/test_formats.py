@@ -0,0 +1,217 @@
+import gzip
+from unittest.mock import patch
+
+import brotli
+import msgpack
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from holiday_planner.middleware import CompressionMiddleware
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.renderers import ColumnarMsgPackRenderer
+
+WEATHER_DATA = [
+    {"date": "2024-10-20", "weather_code": 2.0, "temperature_max": 18},
+    {"date": "2024-10-21", "weather_code": 61.0, "temperature_max": 15},
+]
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def holiday_schedule(user):
+    schedule = HolidaySchedule.objects.create(
+        user=user, start_date="2024-10-20", end_date="2024-10-21"
+    )
+    destination = Destination.objects.create(
+        name="Paris", country="France", latitude=48.8566, longitude=2.3522
+    )
+    ScheduleItem.objects.create(
+        holiday_schedule=schedule,
+        destination=destination,
+        start_date="2024-10-20",
+        end_date="2024-10-21",
+        weather_data=WEATHER_DATA,
+    )
+    return schedule
+
+
+@pytest.fixture
+def compression(settings):
+    settings.RESPONSE_COMPRESSION_MIN_SIZE = 100
+
+    def respond(response, accept_encoding=None):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding or "")
+        return CompressionMiddleware(lambda request: response)(request)
+
+    return respond
+
+
+# # # # # # # # # # # # #
+#    MSGPACK FORMAT     #
+# # # # # # # # # # # # #
+
+
+def test_msgpack_renders_weather_columns():
+    data = [{"place_name": "Paris", "weather_data": WEATHER_DATA}]
+    rendered = msgpack.unpackb(ColumnarMsgPackRenderer().render(data))
+
+    assert rendered == [
+        {
+            "place_name": "Paris",
+            "weather_data": {
+                "date": ["2024-10-20", "2024-10-21"],
+                "weather_code": [2.0, 61.0],
+                "temperature_max": [18, 15],
+            },
+        }
+    ]
+    assert len(ColumnarMsgPackRenderer().render(data)) < len(str(data))
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_weather_msgpack(mock_fetch_weather_data, api_client, mock_geocode):
+    columns = {"date": ["2024-10-20"], "temperature_max": [18]}
+    mock_fetch_weather_data.return_value = columns
+
+    data = [
+        {"place_name": "Paris", "start_date": "2024-10-20", "end_date": "2024-10-20"}
+    ]
+    response = api_client.post(
+        "/api/weather/", data, format="json", HTTP_ACCEPT="application/x-msgpack"
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-msgpack"
+    assert mock_fetch_weather_data.call_args.kwargs["columnar"] is True
+    assert msgpack.unpackb(response.content) == [
+        {"place_name": "Paris", "weather_data": columns}
+    ]
+
+    # JSON stays the default and gets daily dicts
+    mock_fetch_weather_data.return_value = WEATHER_DATA
+    response = api_client.post("/api/weather/", data, format="json")
+    assert response["Content-Type"] == "application/json"
+    assert mock_fetch_weather_data.call_args.kwargs["columnar"] is False
+
+
+@pytest.mark.django_db
+def test_schedule_msgpack(api_client, holiday_schedule):
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    response = api_client.get(url, {"format": "msgpack"})
+    assert response.status_code == 200
+
+    data = msgpack.unpackb(response.content)
+    assert data["id"] == holiday_schedule.id
+    assert data["destinations"][0]["weather_data"]["temperature_max"] == [18, 15]
+
+    # Formats are cached and validated separately
+    json_response = api_client.get(url)
+    assert json_response.json()["destinations"][0]["weather_data"] == WEATHER_DATA
+    assert json_response["ETag"] != response["ETag"]
+
+
+# # # # # # # # # # # # #
+#     COMPRESSION       #
+# # # # # # # # # # # # #
+
+
+def test_gzip(compression):
+    body = b"x" * 1000
+    response = compression(
+        HttpResponse(body, content_type="application/json"), "gzip, deflate"
+    )
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content)
+    assert gzip.decompress(response.content) == body
+
+
+def test_brotli_preferred(compression):
+    body = b"x" * 1000
+    response = compression(
+        HttpResponse(body, content_type="application/json"), "gzip, br"
+    )
+    assert response["Content-Encoding"] == "br"
+    assert brotli.decompress(response.content) == body
+
+    response = compression(
+        HttpResponse(body, content_type="application/json"), "gzip;q=1.0, br;q=0.5"
+    )
+    assert response["Content-Encoding"] == "gzip"
+
+    response = compression(
+        HttpResponse(body, content_type="application/json"), "br;q=0, *"
+    )
+    assert response["Content-Encoding"] == "gzip"
+
+
+def test_not_compressed(compression):
+    # Below the threshold
+    response = compression(
+        HttpResponse(b"x" * 50, content_type="application/json"), "gzip"
+    )
+    assert not response.has_header("Content-Encoding")
+    assert not response.has_header("Vary")
+
+    # Client does not accept any supported coding
+    response = compression(
+        HttpResponse(b"x" * 1000, content_type="application/json"), "identity"
+    )
+    assert not response.has_header("Content-Encoding")
+    assert response["Vary"] == "Accept-Encoding"
+
+    # Streaming exports are passed through
+    response = compression(StreamingHttpResponse(iter([b"x" * 1000])), "gzip")
+    assert not response.has_header("Content-Encoding")
+
+
+def test_html_not_compressed(compression):
+    # Pages with CSRF tokens are left alone (BREACH)
+    response = compression(HttpResponse(b"x" * 1000), "gzip")
+    assert not response.has_header("Content-Encoding")
+    assert not response.has_header("Vary")
+
+
+def test_etag_per_coding(compression):
+    def tagged(accept_encoding):
+        response = HttpResponse(b"x" * 1000, content_type="application/json")
+        response["ETag"] = '"abc"'
+        return compression(response, accept_encoding)["ETag"]
+
+    assert tagged("gzip") == '"abc-gzip"'
+    assert tagged("br") == '"abc-br"'
+    assert tagged("identity") == '"abc"'
+
+
+def test_preconditions_match_uncompressed_etag():
+    seen = {}
+
+    def view(request):
+        seen["If-Match"] = request.headers["If-Match"]
+        seen["If-None-Match"] = request.headers["If-None-Match"]
+        return HttpResponse(status=412)
+
+    request = RequestFactory().put(
+        "/", HTTP_IF_MATCH='"abc-gzip"', HTTP_IF_NONE_MATCH='"abc-br", W/"def"'
+    )
+    CompressionMiddleware(view)(request)
+
+    assert seen == {"If-Match": '"abc"', "If-None-Match": '"abc", W/"def"'}
+
+
+@pytest.mark.django_db
+def test_compressed_etag_satisfies_if_match(api_client, holiday_schedule, settings):
+    settings.RESPONSE_COMPRESSION_MIN_SIZE = 100
+    url = f"/api/schedules/{holiday_schedule.id}/"
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"].endswith('-gzip"')
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
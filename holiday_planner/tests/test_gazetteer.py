@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from holiday_planner.gazetteer import (
+    Gazetteer,
+    build_index,
+    get_gazetteer,
+    normalize_name,
+)
+from holiday_planner.geocoding import geocode
+
+# geonameid, name, asciiname, alternatenames, latitude, longitude, feature class,
+# feature code, country code, cc2, admin1-4, population, ...
+CITIES = [
+    "2988507\tParis\tParis\tLutetia,Parigi\t48.85341\t2.3488\tP\tPPLC\tFR\t\t11\t75\t\t\t2138551",
+    "4717560\tParis\tParis\t\t33.66094\t-95.55551\tP\tPPLS\tUS\t\tTX\t277\t\t\t24171",
+    "2657896\tZürich\tZurich\tZuerich\t47.36667\t8.55\tP\tPPLA\tCH\t\tZH\t\t\t\t341730",
+    "2980291\tSaint-Étienne\tSaint-Etienne\t\t45.43389\t4.39\tP\tPPLA2\tFR\t\t84\t42\t\t\t171483",
+]
+COUNTRIES = [
+    "#ISO\tISO3\tISO-Numeric\tfips\tCountry",
+    "FR\tFRA\t250\tFR\tFrance",
+    "US\tUSA\t840\tUS\tUnited States",
+    "CH\tCHE\t756\tSZ\tSwitzerland",
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    cities = tmp_path / "cities.txt"
+    cities.write_text("\n".join(CITIES) + "\n")
+    countries = tmp_path / "countryInfo.txt"
+    countries.write_text("\n".join(COUNTRIES) + "\n")
+
+    path = tmp_path / "gazetteer.idx"
+    call_command(
+        "build_gazetteer",
+        str(cities),
+        "--countries",
+        str(countries),
+        "--output",
+        str(path),
+        "--alternate-names",
+    )
+    return path
+
+
+# # # # # # # # # # # #
+#   GAZETTEER TESTS   #
+# # # # # # # # # # # #
+
+
+def test_normalize_name():
+    assert normalize_name("  Saint-Étienne ") == "saint etienne"
+    assert normalize_name("ZÜRICH") == "zurich"
+
+
+def test_lookup_prefers_most_populous(index_path):
+    gazetteer = Gazetteer(index_path)
+    location = gazetteer.lookup("paris")
+    assert location.name == "Paris"
+    assert location.country == "France"
+    assert location.address == "Paris, France"
+    assert location.latitude == pytest.approx(48.85341, abs=1e-4)
+
+
+def test_lookup_with_country(index_path):
+    gazetteer = Gazetteer(index_path)
+    assert gazetteer.lookup("Paris, United States").country_code == "US"
+    assert gazetteer.lookup("Paris, US").country == "United States"
+    assert gazetteer.lookup("Paris, Germany") is None
+
+
+def test_lookup_accents_and_alternate_names(index_path):
+    gazetteer = Gazetteer(index_path)
+    assert gazetteer.lookup("Zurich").name == "Zürich"
+    assert gazetteer.lookup("zuerich").name == "Zürich"
+    assert gazetteer.lookup("Saint Etienne").name == "Saint-Étienne"
+    assert gazetteer.lookup("Parigi").country == "France"
+    assert gazetteer.lookup("Atlantis") is None
+
+
+@patch("geopy.Nominatim.geocode")
+def test_geocode_tries_gazetteer_first(mock_geocode, index_path, settings):
+    settings.GAZETTEER_INDEX_PATH = index_path
+    mock_geocode.return_value = None
+
+    assert geocode("Zurich").address == "Zürich, Switzerland"
+    mock_geocode.assert_not_called()
+
+    assert geocode("Atlantis") is None
+    mock_geocode.assert_called_once_with("Atlantis")
+
+
+def test_rebuild_keeps_mapped_index_readable(index_path):
+    gazetteer = Gazetteer(index_path)
+    build_index([(["Lyon"], "Lyon", "FR", "France", 45.75, 4.85, 522228)], index_path)
+
+    # The old mapping still reads the old file, the path points at the new one
+    assert gazetteer.lookup("Zurich").name == "Zürich"
+    assert Gazetteer(index_path).lookup("Zurich") is None
+    assert [p.name for p in index_path.parent.iterdir() if p.name.startswith(".")] == []
+
+
+def test_build_creates_parent_directory(tmp_path):
+    path = tmp_path / "data" / "gazetteer.idx"
+    build_index([(["Lyon"], "Lyon", "FR", "France", 45.75, 4.85, 522228)], path)
+    assert Gazetteer(path).lookup("Lyon").country == "France"
+
+
+def test_get_gazetteer_picks_up_new_index(tmp_path):
+    path = tmp_path / "gazetteer.idx"
+    assert get_gazetteer(path) is None
+
+    build_index([(["Lyon"], "Lyon", "FR", "France", 45.75, 4.85, 522228)], path)
+    assert get_gazetteer(path).lookup("Lyon").name == "Lyon"
+
+    build_index([(["Nice"], "Nice", "FR", "France", 43.7, 7.27, 342522)], path)
+    assert get_gazetteer(path).lookup("Nice").name == "Nice"
+    assert get_gazetteer(path).lookup("Lyon") is None
@@ -0,0 +1,197 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from holiday_planner.columnar import pack_series, series_to_json, unpack_series
+from holiday_planner.models import ScheduleItem
+from holiday_planner.weather_service import DAILY_VARIABLES, HOURLY_VARIABLES
+
+# 2024-10-20T00:00 in Europe/Berlin (UTC+2), as Open-Meteo returns it
+START = 1729375200
+UTC_OFFSET = 7200
+DAY = 86400
+
+
+def packed_hours(hours=48):
+    return pack_series(
+        start=START,
+        interval=3600,
+        utc_offset=UTC_OFFSET,
+        columns=[
+            ("temperature_2m", "f", np.linspace(10, 20, hours)),
+            ("precipitation_probability", "b", [np.nan] + [40] * (hours - 1)),
+        ],
+    )
+
+
+# # # # # # # # # # # # #
+#   COLUMNAR STORAGE    #
+# # # # # # # # # # # # #
+
+
+def test_pack_round_trip():
+    blob = packed_hours()
+    series = unpack_series(blob)
+
+    assert series.start == START
+    assert series.interval == 3600
+    assert series.utc_offset == UTC_OFFSET
+    assert series.length == 48
+    assert series.columns["temperature_2m"].dtype == np.float32
+    assert series.columns["precipitation_probability"].dtype == np.int8
+    # 48 float32 + 48 int8 values plus a small header
+    assert len(blob) < 48 * 5 + 100
+
+
+def test_unpack_selected_columns():
+    series = unpack_series(packed_hours(), names={"precipitation_probability"})
+    assert list(series.columns) == ["precipitation_probability"]
+    assert series.columns["precipitation_probability"].tolist()[:2] == [-128, 40]
+
+
+def test_series_to_json():
+    data = series_to_json(packed_hours())
+
+    assert data["time"][:2] == ["2024-10-20T00:00", "2024-10-20T01:00"]
+    assert data["time"][-1] == "2024-10-21T23:00"
+    assert data["temperature_2m"][0] == 10.0
+    assert data["temperature_2m"][-1] == 20.0
+    assert data["precipitation_probability"][:2] == [None, 40]
+
+
+# # # # # # # # # # #
+#    HOURLY API     #
+# # # # # # # # # # #
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.serializers.fetch_hourly_weather_data")
+@patch("holiday_planner.serializers.fetch_weather_data")
+def test_hourly_resolution(mock_daily, mock_hourly, api_client, mock_geocode):
+    mock_daily.return_value = [{"date": "2024-10-20", "temperature_max": 18}]
+    mock_hourly.return_value = packed_hours()
+
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-21",
+        "hourly": True,
+        "destinations_input": [{"place_name": "Paris"}],
+    }
+    response = api_client.post("/api/schedules/", data, format="json")
+    assert response.status_code == 201
+    assert "hourly" not in response.data
+    mock_hourly.assert_called_once()
+
+    item = ScheduleItem.objects.get()
+    assert bytes(item.hourly_weather) == mock_hourly.return_value
+
+    url = f"/api/schedules/{response.data['id']}/"
+    daily = api_client.get(url).json()
+    assert "hourly_weather" not in daily["destinations"][0]
+
+    hourly = api_client.get(url, {"resolution": "hourly"}).json()
+    series = hourly["destinations"][0]["hourly_weather"]
+    assert series["time"][0] == "2024-10-20T00:00"
+    assert series["temperature_2m"][0] == 10.0
+
+    listed = api_client.get("/api/schedules/", {"resolution": "hourly"}).json()
+    assert listed[0]["destinations"][0]["hourly_weather"] == series
+
+    response = api_client.get(url, {"resolution": "minutely"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.serializers.fetch_hourly_weather_data")
+@patch("holiday_planner.serializers.fetch_weather_data")
+def test_hourly_is_opt_in(mock_daily, mock_hourly, api_client, mock_geocode):
+    mock_daily.return_value = []
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-21",
+        "destinations_input": [{"place_name": "Paris"}],
+    }
+    response = api_client.post("/api/schedules/", data, format="json")
+    assert response.status_code == 201
+    mock_hourly.assert_not_called()
+
+    response = api_client.get(
+        f"/api/schedules/{response.data['id']}/", {"resolution": "hourly"}
+    )
+    assert response.json()["destinations"][0]["hourly_weather"] is None
+
+
+@pytest.mark.django_db
+def test_daily_and_hourly_cover_the_item_dates(
+    api_client, mock_geocode, build_forecast
+):
+    # Open-Meteo answers with the local midnights of the requested days in UTC
+    def get(url, params, timeout):
+        first = np.datetime64(params["start_date"], "D")
+        days = (np.datetime64(params["end_date"], "D") - first).astype(int) + 1
+        start = int(first.astype("datetime64[s]").astype("i8")) - UTC_OFFSET
+        if "daily" in params:
+            columns = [np.zeros(days) for _ in DAILY_VARIABLES]
+            content = build_forecast(daily=(start, start + days * DAY, DAY, columns))
+        else:
+            hours = days * 24
+            columns = [np.zeros(hours) for _ in HOURLY_VARIABLES]
+            content = build_forecast(
+                hourly=(start, start + hours * 3600, 3600, columns)
+            )
+        return MagicMock(status_code=200, content=content)
+
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-21",
+        "hourly": True,
+        "destinations_input": [{"place_name": "Paris", "length_of_stay": 2}],
+    }
+
+    def assert_item_dates(url):
+        response = api_client.get(url, {"resolution": "hourly"})
+        destination = response.json()["destinations"][0]
+        assert [day["date"] for day in destination["weather_data"]] == [
+            "2024-10-20",
+            "2024-10-21",
+        ]
+        hours = destination["hourly_weather"]["time"]
+        assert len(hours) == 48
+        assert hours[0] == "2024-10-20T00:00"
+        assert hours[-1] == "2024-10-21T23:00"
+
+    with patch("holiday_planner.providers.retry_session.get", side_effect=get):
+        response = api_client.post("/api/schedules/", data, format="json")
+        assert response.status_code == 201
+        url = f"/api/schedules/{response.data['id']}/"
+        assert_item_dates(url)
+
+        assert api_client.put(url, data, format="json").status_code == 200
+        assert_item_dates(url)
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.serializers.fetch_hourly_weather_data")
+@patch("holiday_planner.serializers.fetch_weather_data")
+def test_patch_keeps_hourly_forecasts(
+    mock_daily, mock_hourly, api_client, mock_geocode
+):
+    mock_daily.return_value = []
+    mock_hourly.return_value = packed_hours()
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-21",
+        "hourly": True,
+        "destinations_input": [{"place_name": "Paris", "length_of_stay": 2}],
+    }
+    url = f"/api/schedules/{api_client.post('/api/schedules/', data, format='json').data['id']}/"
+
+    # Replacing the destinations without `hourly` keeps storing hourly forecasts
+    patch_data = {"destinations_input": [{"place_name": "Paris", "length_of_stay": 2}]}
+    assert api_client.patch(url, patch_data, format="json").status_code == 200
+    assert ScheduleItem.objects.get().hourly_weather is not None
+
+    # Unless the client turns them off
+    patch_data["hourly"] = False
+    assert api_client.patch(url, patch_data, format="json").status_code == 200
+    assert ScheduleItem.objects.get().hourly_weather is None
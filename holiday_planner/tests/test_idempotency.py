@@ -0,0 +1,215 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from rest_framework.test import APIClient
+from holiday_planner.idempotency import DONE, IN_FLIGHT, _cache_key, _fingerprint
+from holiday_planner.models import HolidaySchedule
+
+SCHEDULE = {
+    "start_date": "2024-10-20",
+    "end_date": "2024-10-22",
+    "destinations_input": [{"place_name": "Paris"}],
+}
+WEATHER = [
+    {"place_name": "Paris", "start_date": "2024-10-20", "end_date": "2024-10-21"}
+]
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def mock_weather():
+    with patch("holiday_planner.serializers.fetch_weather_data") as mock:
+        mock.return_value = [{"date": "2024-10-20", "temperature_max": 18}]
+        yield mock
+
+
+# # # # # # # # # # # # #
+#   IDEMPOTENCY TESTS   #
+# # # # # # # # # # # # #
+
+
+@pytest.mark.django_db
+def test_retry_replays_schedule(api_client, mock_geocode, mock_weather):
+    first = api_client.post(
+        "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+    )
+    retry = api_client.post(
+        "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+    )
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry["Idempotent-Replayed"] == "true"
+    assert not first.has_header("Idempotent-Replayed")
+    assert HolidaySchedule.objects.count() == 1
+    assert mock_weather.call_count == 1
+
+    # Without a key every request is processed
+    api_client.post("/api/schedules/", SCHEDULE, format="json")
+    assert HolidaySchedule.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_key_reused_for_different_request(api_client, mock_geocode, mock_weather):
+    api_client.post(
+        "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+    )
+    response = api_client.post(
+        "/api/schedules/",
+        {**SCHEDULE, "end_date": "2024-10-23"},
+        format="json",
+        HTTP_IDEMPOTENCY_KEY="k1",
+    )
+    assert response.status_code == 422
+    assert HolidaySchedule.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_keys_are_scoped_per_user(api_client, mock_geocode, mock_weather):
+    other = APIClient()
+    other.force_authenticate(
+        user=User.objects.create_user(username="other", password="testpassword")
+    )
+    for client in (api_client, other):
+        response = client.post(
+            "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+        )
+        assert response.status_code == 201
+    assert HolidaySchedule.objects.count() == 2
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_anonymous_keys_are_scoped_per_address(mock_fetch_weather_data, mock_geocode):
+    mock_fetch_weather_data.return_value = [{"date": "2024-10-20"}]
+    client = APIClient()
+    for address in ("192.0.2.1", "192.0.2.2", "192.0.2.1"):
+        response = client.post(
+            "/api/weather/",
+            WEATHER,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="w1",
+            REMOTE_ADDR=address,
+        )
+        assert response.status_code == 200
+    # Only the second request from the first address was replayed
+    assert response["Idempotent-Replayed"] == "true"
+    assert mock_fetch_weather_data.call_count == 2
+
+
+@pytest.mark.django_db
+def test_failed_request_releases_key(api_client, mock_geocode, mock_weather):
+    mock_weather.side_effect = RuntimeError("upstream down")
+    with pytest.raises(RuntimeError):
+        api_client.post(
+            "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+        )
+
+    mock_weather.side_effect = None
+    response = api_client.post(
+        "/api/schedules/", SCHEDULE, format="json", HTTP_IDEMPOTENCY_KEY="k1"
+    )
+    assert response.status_code == 201
+    assert not response.has_header("Idempotent-Replayed")
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_weather_retry(mock_fetch_weather_data, api_client, mock_geocode):
+    mock_fetch_weather_data.return_value = [{"date": "2024-10-20"}]
+    for _ in range(3):
+        response = api_client.post(
+            "/api/weather/", WEATHER, format="json", HTTP_IDEMPOTENCY_KEY="w1"
+        )
+        assert response.status_code == 200
+    assert mock_fetch_weather_data.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_key_reused_for_another_media_type(
+    mock_fetch_weather_data, api_client, mock_geocode
+):
+    mock_fetch_weather_data.return_value = [{"date": "2024-10-20"}]
+    response = api_client.post(
+        "/api/weather/", WEATHER, format="json", HTTP_IDEMPOTENCY_KEY="w1"
+    )
+    assert response.status_code == 200
+
+    response = api_client.post(
+        "/api/weather/",
+        WEATHER,
+        format="json",
+        HTTP_ACCEPT="application/x-msgpack",
+        HTTP_IDEMPOTENCY_KEY="w1",
+    )
+    assert response.status_code == 422
+    assert mock_fetch_weather_data.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_retry_on_another_worker(
+    mock_fetch_weather_data, api_client, mock_geocode, tmp_path
+):
+    # Each worker has its own cache client on the shared backend
+    mock_fetch_weather_data.return_value = [{"date": "2024-10-20"}]
+    for _ in range(2):
+        worker_cache = FileBasedCache(str(tmp_path), {})
+        with patch("holiday_planner.idempotency.cache", worker_cache):
+            response = api_client.post(
+                "/api/weather/", WEATHER, format="json", HTTP_IDEMPOTENCY_KEY="w1"
+            )
+        assert response.status_code == 200
+    assert response["Idempotent-Replayed"] == "true"
+    assert mock_fetch_weather_data.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("holiday_planner.views.fetch_weather_data")
+def test_retry_waits_for_in_flight_request(
+    mock_fetch_weather_data, api_client, user, settings
+):
+    request = SimpleNamespace(user=user, method="POST", path="/api/weather/")
+    key = _cache_key(request, "w1")
+    fingerprint = _fingerprint(
+        SimpleNamespace(data=WEATHER, accepted_media_type="application/json")
+    )
+    cache.set(key, {"state": IN_FLIGHT, "fingerprint": fingerprint})
+
+    result = [{"place_name": "Paris", "weather_data": []}]
+    finish = threading.Timer(
+        0.2,
+        cache.set,
+        args=(
+            key,
+            {"state": DONE, "fingerprint": fingerprint, "status": 200, "data": result},
+        ),
+    )
+    finish.start()
+    response = api_client.post(
+        "/api/weather/", WEATHER, format="json", HTTP_IDEMPOTENCY_KEY="w1"
+    )
+    finish.join()
+
+    assert response.status_code == 200
+    assert response.json() == result
+    mock_fetch_weather_data.assert_not_called()
+
+    # Gives up when the first request takes too long
+    settings.IDEMPOTENCY_WAIT_TIMEOUT = 0.1
+    cache.set(key, {"state": IN_FLIGHT, "fingerprint": fingerprint})
+    response = api_client.post(
+        "/api/weather/", WEATHER, format="json", HTTP_IDEMPOTENCY_KEY="w1"
+    )
+    assert response.status_code == 409
+    assert response["Retry-After"] == "1"
@@ -0,0 +1,104 @@
+import pytest
+from holiday_planner.geo import (
+    encode_geohash,
+    geohash_neighbourhood,
+    geohash_precision_for_radius,
+    haversine_km,
+)
+from holiday_planner.models import Destination
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def destinations():
+    return [
+        Destination.objects.create(
+            name="Paris", country="France", latitude=48.8566, longitude=2.3522
+        ),
+        Destination.objects.create(
+            name="Versailles", country="France", latitude=48.8049, longitude=2.1204
+        ),
+        Destination.objects.create(
+            name="London", country="United Kingdom", latitude=51.5072, longitude=-0.1276
+        ),
+    ]
+
+
+# # # # # # # # # # #
+#    NEARBY TESTS    #
+# # # # # # # # # # #
+
+
+def test_encode_geohash():
+    assert encode_geohash(57.64911, 10.40744).startswith("u4pruydqq")
+    assert encode_geohash(57.64911, 10.40744, precision=5) == "u4pru"
+
+
+def test_neighbourhood_covers_radius():
+    latitude, longitude, radius_km = 48.8566, 2.3522, 50
+    precision = geohash_precision_for_radius(latitude, radius_km)
+    cells = geohash_neighbourhood(latitude, longitude, precision)
+
+    # Points on the edge of the search circle in every direction
+    for dlat, dlon in [(0.44, 0), (-0.44, 0), (0, 0.67), (0, -0.67)]:
+        point = (latitude + dlat, longitude + dlon)
+        assert haversine_km(latitude, longitude, *point) < radius_km
+        assert encode_geohash(*point, precision=precision) in cells
+
+
+@pytest.mark.django_db
+def test_geohash_is_stored(destinations):
+    paris = Destination.objects.get(name="Paris")
+    assert paris.geohash == encode_geohash(48.8566, 2.3522)
+
+    paris.latitude, paris.longitude = 51.5072, -0.1276
+    paris.save()
+    paris.refresh_from_db()
+    assert paris.geohash == encode_geohash(51.5072, -0.1276)
+
+
+@pytest.mark.django_db
+def test_nearby_queryset(destinations):
+    results = Destination.objects.nearby(48.8566, 2.3522, 50)
+    assert [destination.name for destination, _ in results] == ["Paris", "Versailles"]
+    assert results[0][1] == pytest.approx(0)
+    assert results[1][1] == pytest.approx(18, abs=1)
+
+    results = Destination.objects.nearby(48.8566, 2.3522, 500)
+    assert [destination.name for destination, _ in results] == [
+        "Paris",
+        "Versailles",
+        "London",
+    ]
+
+
+@pytest.mark.django_db
+def test_nearby_endpoint(api_client, destinations):
+    response = api_client.get(
+        "/api/destinations/nearby/",
+        {"lat": 48.8566, "lon": 2.3522, "radius_km": 50},
+    )
+    assert response.status_code == 200
+    assert [result["name"] for result in response.data] == ["Paris", "Versailles"]
+    assert set(response.data[1]) == {
+        "name",
+        "country",
+        "latitude",
+        "longitude",
+        "distance_km",
+    }
+
+    response = api_client.get(
+        "/api/destinations/nearby/", {"lat": 48.8566, "lon": 2.3522, "limit": 1}
+    )
+    assert [result["name"] for result in response.data] == ["Paris"]
+
+
+@pytest.mark.django_db
+def test_nearby_endpoint_validates_query(api_client):
+    response = api_client.get("/api/destinations/nearby/", {"lat": 91, "lon": 0})
+    assert response.status_code == 400
+    assert "lat" in response.data
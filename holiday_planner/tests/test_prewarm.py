@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from holiday_planner import metrics
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.prewarm import prewarm_forecasts, rank_destinations
+from holiday_planner.weather_service import DAILY_VARIABLES, fetch_weather_data
+
+DAY = 86400
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def upstream(build_forecast):
+    # One message per requested location, the maximum temperature of a day is its
+    # day of the month
+    def get(url, params, timeout):
+        latitudes = params["latitude"]
+        latitudes = latitudes if isinstance(latitudes, list) else [latitudes]
+        first = np.datetime64(params["start_date"], "D")
+        days = (np.datetime64(params["end_date"], "D") - first).astype(int) + 1
+        start = int(first.astype("datetime64[s]").astype("i8")) - 7200
+        day_of_month = (first + np.arange(days)).astype(object)
+        columns = [np.full(days, 10.0) for _ in DAILY_VARIABLES]
+        columns[1] = np.array([day.day for day in day_of_month], dtype="f4")
+        content = b"".join(
+            build_forecast(daily=(start, start + days * DAY, DAY, columns))
+            for _ in latitudes
+        )
+        return MagicMock(status_code=200, content=content)
+
+    with patch("holiday_planner.providers.retry_session.get", side_effect=get) as mock:
+        yield mock
+
+
+@pytest.fixture
+def popular(db):
+    # Paris: two trips planned long ago, one of them upcoming. Lyon: four recently
+    # planned trips in the past. Nice: nothing
+    today = timezone.localdate()
+    schedule = HolidaySchedule.objects.create(
+        user=User.objects.create_user(username="testuser", password="testpassword"),
+        start_date=today,
+        end_date=today + timedelta(days=3),
+    )
+    destinations = {}
+    for i, name in enumerate(["Paris", "Lyon", "Nice"]):
+        destinations[name] = Destination.objects.create(
+            name=name, country="France", latitude=40.0 + i, longitude=2.0
+        )
+
+    def add(name, start_date, created_days_ago):
+        item = ScheduleItem.objects.create(
+            holiday_schedule=schedule,
+            destination=destinations[name],
+            start_date=start_date,
+            end_date=start_date + timedelta(days=2),
+        )
+        ScheduleItem.objects.filter(pk=item.pk).update(
+            created_at=timezone.now() - timedelta(days=created_days_ago)
+        )
+
+    add("Paris", today + timedelta(days=2), created_days_ago=90)
+    add("Paris", today - timedelta(days=60), created_days_ago=90)
+    for _ in range(4):
+        add("Lyon", today - timedelta(days=5), created_days_ago=10)
+    return destinations
+
+
+# # # # # # # # # # # #
+#   PREWARM TESTS     #
+# # # # # # # # # # # #
+
+
+def test_rank_destinations(popular):
+    ranked = rank_destinations(limit=10, recent_days=30)
+
+    assert [(d.name, d.score) for d in ranked] == [("Lyon", 4), ("Paris", 3)]
+    assert [d.name for d in rank_destinations(limit=10, recent_days=5)] == ["Paris"]
+
+
+def test_prewarm_fetches_horizon_in_one_batch(popular, upstream):
+    assert prewarm_forecasts(limit=10, recent_days=30, budget=5) == {
+        "ranked": 2,
+        "prewarmed": 2,
+        "requests": 1,
+    }
+
+    params = upstream.call_args.kwargs["params"]
+    assert params["latitude"] == [41.0, 40.0]
+    assert params["start_date"] == timezone.localdate()
+    assert params["end_date"] == timezone.localdate() + timedelta(days=15)
+
+
+def test_prewarm_budget(popular, upstream):
+    with patch("holiday_planner.prewarm.FORECAST_BATCH_SIZE", 1), patch(
+        "holiday_planner.weather_service.FORECAST_BATCH_SIZE", 1
+    ):
+        stats = prewarm_forecasts(limit=10, recent_days=30, budget=1)
+
+    assert stats["prewarmed"] == 1
+    assert upstream.call_count == 1
+
+
+def test_lookups_within_horizon_hit_the_cache(popular, upstream, shared_cache):
+    call_command("prewarm_forecasts", budget=1)
+    upstream.reset_mock()
+    metrics.reset()
+
+    start = timezone.localdate() + timedelta(days=3)
+    end = start + timedelta(days=2)
+    weather = fetch_weather_data(41.0, 2.0, start, end)
+
+    upstream.assert_not_called()
+    assert [day["temperature_max"] for day in weather] == [
+        (start + timedelta(days=i)).day for i in range(3)
+    ]
+    assert metrics.snapshot()["forecast.horizon_hits"] == 1
+
+    # Outside the horizon, or for another place, the upstream is asked
+    fetch_weather_data(41.0, 2.0, start, start + timedelta(days=20))
+    fetch_weather_data(45.0, 2.0, start, end)
+    assert upstream.call_count == 2
+    assert metrics.snapshot()["forecast.misses"] == 2
+
+
+def test_prewarm_command_needs_shared_cache(popular, upstream):
+    with pytest.raises(CommandError, match="shared between processes"):
+        call_command("prewarm_forecasts")
+    upstream.assert_not_called()
@@ -0,0 +1,185 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from requests.exceptions import Timeout
+from holiday_planner import metrics
+from holiday_planner.providers import (
+    HedgedWeatherClient,
+    LatencyTracker,
+    OpenMeteoProvider,
+    WeatherProvider,
+    weather_client,
+)
+from holiday_planner.weather_service import fetch_weather_data
+
+# 2024-10-20T00:00 in Europe/Berlin (UTC+2), as Open-Meteo returns it
+START = 1729375200
+DAY = 86400
+
+
+class FakeProvider(WeatherProvider):
+    """
+    Stand-in provider answering `raw` (or raising it) after `delay` seconds.
+    """
+
+    def __init__(self, name, raw=b"", delay=0, **options):
+        super().__init__(name, **options)
+        self.raw = raw
+        self.delay = delay
+        self.calls = 0
+
+    def fetch(self, params):
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.raw, Exception):
+            raise self.raw
+        return self.raw
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def hedging(settings):
+    settings.WEATHER_HEDGE_DEFAULT_DELAY = 0.05
+    settings.WEATHER_HEDGE_MIN_SAMPLES = 5
+    settings.WEATHER_HEDGE_MIN_DELAY = 0.01
+    metrics.reset()
+
+
+# # # # # # # # # # # #
+#   HEDGING TESTS     #
+# # # # # # # # # # # #
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(size=100)
+    assert tracker.percentile(95) is None
+
+    for i in range(1, 201):
+        tracker.record(i / 1000)
+
+    # Only the latest 100 samples (0.101s to 0.2s) are kept
+    assert tracker.percentile(95, min_samples=100) == pytest.approx(0.195, abs=1e-3)
+    assert tracker.percentile(95, min_samples=101) is None
+
+
+def test_hedge_delay_follows_primary_p95(hedging):
+    client = HedgedWeatherClient(FakeProvider("primary"), FakeProvider("secondary"))
+    assert client.hedge_delay() == 0.05
+
+    for _ in range(5):
+        client.primary.latency.record(0.2)
+    assert client.hedge_delay() == pytest.approx(0.2)
+
+
+def test_fast_primary_is_not_hedged(hedging):
+    client = HedgedWeatherClient(
+        FakeProvider("primary", b"primary"), FakeProvider("secondary", b"secondary")
+    )
+
+    assert client.fetch({}) == b"primary"
+    assert client.secondary.calls == 0
+    assert client.primary.latency.percentile(95) is not None
+
+
+def test_slow_primary_is_hedged(hedging):
+    client = HedgedWeatherClient(
+        FakeProvider("primary", b"primary", delay=0.5),
+        FakeProvider("secondary", b"secondary"),
+    )
+
+    started = time.monotonic()
+    assert client.fetch({}) == b"secondary"
+    assert time.monotonic() - started < 0.4
+    assert metrics.snapshot()["weather.hedged"] == 1
+    assert metrics.snapshot()["weather.secondary_wins"] == 1
+
+
+def test_failing_primary_fails_over(hedging):
+    client = HedgedWeatherClient(
+        FakeProvider("primary", ConnectionError("down")),
+        FakeProvider("secondary", b"secondary", delay=0.1),
+    )
+
+    assert client.fetch({}) == b"secondary"
+    assert metrics.snapshot()["weather.failovers"] == 1
+
+
+def test_both_failing_raise_primary_error(hedging):
+    client = HedgedWeatherClient(
+        FakeProvider("primary", ConnectionError("primary down")),
+        FakeProvider("secondary", ConnectionError("secondary down")),
+    )
+
+    with pytest.raises(ConnectionError, match="primary down"):
+        client.fetch({})
+
+
+def test_hedged_request_gives_up(hedging, settings):
+    settings.WEATHER_HEDGE_TIMEOUT = 0.1
+    client = HedgedWeatherClient(
+        FakeProvider("primary", b"primary", delay=0.5),
+        FakeProvider("secondary", b"secondary", delay=0.5),
+    )
+
+    started = time.monotonic()
+    with pytest.raises(Timeout):
+        client.fetch({})
+    assert time.monotonic() - started < 0.4
+
+
+def test_open_meteo_request_timeout(settings):
+    settings.WEATHER_REQUEST_TIMEOUT = (1, 5)
+    session = MagicMock()
+    session.get.return_value = MagicMock(status_code=200, content=b"raw")
+
+    provider = OpenMeteoProvider("primary", "https://example.com", session=session)
+    assert provider.fetch({}) == b"raw"
+    assert session.get.call_args.kwargs["timeout"] == (1, 5)
+
+    provider = OpenMeteoProvider(
+        "primary", "https://example.com", session=session, timeout=(2, 3)
+    )
+    provider.fetch({})
+    assert session.get.call_args.kwargs["timeout"] == (2, 3)
+
+
+def test_weather_client_from_settings(settings, hedging, build_forecast):
+    columns = [[2, 45, 61]] + [[10.0, 20.0, 30.0]] * 7
+    settings.WEATHER_PROVIDERS = {
+        "primary": {
+            "BACKEND": "holiday_planner.tests.test_providers.FakeProvider",
+            "RAW": ConnectionError("down"),
+        },
+        "secondary": {
+            "BACKEND": "holiday_planner.tests.test_providers.FakeProvider",
+            "RAW": build_forecast(daily=(START, START + 3 * DAY, DAY, columns)),
+        },
+    }
+
+    client = weather_client()
+    assert client is weather_client()
+    assert client.secondary.name == "secondary"
+
+    # Normalized to the same daily schema whichever provider answered
+    weather = fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22")
+    assert [day["weather_description"] for day in weather] == [
+        "Partly cloudy",
+        "Fog",
+        "Slight rain",
+    ]
+
+
+def test_default_provider_is_open_meteo():
+    client = weather_client()
+
+    assert isinstance(client.primary, OpenMeteoProvider)
+    assert client.primary.url == "https://api.open-meteo.com/v1/forecast"
+    # No HTTP cache under the forecast cache, latencies are real requests
+    assert type(client.primary.session) is requests.Session
+    assert client.secondary is None
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+from holiday_planner import metrics
+from holiday_planner.geocoding import geocode
+from holiday_planner.ratelimit import RateLimitTimeout, SharedRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_limiter(clock, rate=1, burst=2):
+    return SharedRateLimiter(
+        "test", rate=rate, burst=burst, clock=clock, sleep=clock.sleep
+    )
+
+
+# # # # # # # # # # # # #
+#  RATE LIMITER TESTS   #
+# # # # # # # # # # # # #
+
+
+def test_tokens_per_window():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    # The window of 2 seconds is used up, the next caller queues for the next one
+    waited = limiter.acquire()
+    assert 0 < waited <= 2.2
+
+
+def test_timeout():
+    clock = FakeClock()
+    limiter = make_limiter(clock, burst=1)
+    limiter.acquire()
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.1)
+
+
+@patch("geopy.Nominatim.geocode")
+def test_geocode_records_queue_wait(mock_geocode):
+    mock_geocode.return_value = None
+    geocode("Paris")
+    geocode("London")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["geocoder.requests"] == 2
+    assert snapshot["geocoder.queue_wait.count"] == 2
+
+
+@patch("geopy.Nominatim.geocode")
+def test_geocode_throttled_when_queue_too_long(mock_geocode, settings):
+    settings.NOMINATIM_RATE_LIMIT = 0.01
+    settings.NOMINATIM_BURST = 1
+    settings.NOMINATIM_MAX_QUEUE_WAIT = 0
+
+    geocode("Paris")
+    with pytest.raises(Throttled):
+        geocode("London")
+    assert mock_geocode.call_count == 1
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_requires_admin():
+    client = APIClient()
+    assert client.get("/api/metrics/").status_code == 403
+
+    admin = User.objects.create_superuser(username="admin", password="password")
+    client.force_authenticate(user=admin)
+    response = client.get("/api/metrics/")
+    assert response.status_code == 200
+    assert "geocoder.requests" in response.json()
@@ -0,0 +1,63 @@
+import io
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from holiday_planner.parsers import FastJSONParser
+from holiday_planner.renderers import FastJSONRenderer
+
+WEATHER_DATA = [
+    {
+        "date": "2024-10-15",
+        "weather_code": 2.0,
+        "weather_description": "Partly cloudy",
+        "temperature_max": 27,
+        "temperature_min": 14,
+        "uv_index_max": 8,
+        "precipitation_probability_max": 0,
+        "wind_speed_max": 12,
+        "wind_gusts_max": 35,
+        "wind_direction": 297,
+    }
+]
+
+
+def test_render_matches_stdlib_renderer():
+    payload = [{"place_name": "Zürich", "weather_data": WEATHER_DATA}]
+    fast = FastJSONRenderer().render(payload)
+    stdlib = JSONRenderer().render(payload)
+    assert json.loads(fast) == json.loads(stdlib)
+
+
+def test_render_numpy_scalars_and_dates():
+    payload = {
+        "date": date(2024, 10, 15),
+        "weather_code": np.float32(61.0),
+        "temperature_max": np.int64(27),
+        "series": np.array([1.5, 2.5]),
+    }
+    assert json.loads(FastJSONRenderer().render(payload)) == {
+        "date": "2024-10-15",
+        "weather_code": 61.0,
+        "temperature_max": 27,
+        "series": [1.5, 2.5],
+    }
+
+
+def test_render_indented_falls_back_to_stdlib():
+    rendered = FastJSONRenderer().render(
+        {"a": 1}, accepted_media_type="application/json; indent=4"
+    )
+    assert rendered == b'{\n    "a": 1\n}'
+
+
+def test_parse():
+    parser = FastJSONParser()
+    assert parser.parse(io.BytesIO(b'[{"place_name": "Paris"}]')) == [
+        {"place_name": "Paris"}
+    ]
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"place_name": '))
@@ -0,0 +1,184 @@
+import itertools
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from holiday_planner.geo import haversine_km
+from holiday_planner.models import ScheduleItem
+from holiday_planner.route import (
+    distance_matrix,
+    nearest_neighbour_route,
+    order_stops,
+    route_length,
+    two_opt,
+)
+
+# Listed zig-zagging across Europe
+PLACES = {
+    "Lisbon": (38.7223, -9.1393),
+    "Berlin": (52.52, 13.405),
+    "Madrid": (40.4168, -3.7038),
+    "Vienna": (48.2082, 16.3738),
+    "Paris": (48.8566, 2.3522),
+}
+
+
+def random_stops(count, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(35, 60, count), rng.uniform(-10, 30, count)
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+@pytest.fixture
+def mock_places():
+    def geocode(place_name):
+        latitude, longitude = PLACES[place_name]
+        return type(
+            "Location",
+            (object,),
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "address": f"{place_name}, Europe",
+            },
+        )()
+
+    with patch("holiday_planner.serializers.geocode", side_effect=geocode) as mock:
+        yield mock
+
+
+# # # # # # # # # # # # #
+#    ROUTE ORDERING     #
+# # # # # # # # # # # # #
+
+
+def test_distance_matrix():
+    latitudes, longitudes = zip(*PLACES.values())
+    distances = distance_matrix(latitudes, longitudes)
+
+    assert distances.shape == (5, 5)
+    assert np.allclose(distances, distances.T)
+    assert np.allclose(
+        distances[0, 1], haversine_km(*PLACES["Lisbon"], *PLACES["Berlin"])
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_order_stops_is_close_to_optimal(seed):
+    latitudes, longitudes = random_stops(7, seed)
+    distances = distance_matrix(latitudes, longitudes)
+
+    route = order_stops(latitudes, longitudes)
+    best = min(
+        ([0, *rest] for rest in itertools.permutations(range(1, 7))),
+        key=lambda candidate: route_length(candidate, distances),
+    )
+
+    assert route[0] == 0
+    assert sorted(route) == list(range(7))
+    # A heuristic, within a few percent of the best route
+    assert route_length(route, distances) <= 1.1 * route_length(best, distances)
+
+
+def test_two_opt_improves_nearest_neighbour():
+    latitudes, longitudes = random_stops(150)
+    distances = distance_matrix(latitudes, longitudes)
+
+    started = time.perf_counter()
+    greedy = nearest_neighbour_route(distances)
+    route = two_opt(greedy, distances)
+    elapsed = time.perf_counter() - started
+
+    assert sorted(route) == list(range(150))
+    assert route[0] == 0
+    assert route_length(route, distances) < route_length(greedy, distances)
+    assert route_length(greedy, distances) < route_length(range(150), distances)
+    assert elapsed < 1
+
+
+def test_order_few_stops():
+    assert order_stops([], []) == []
+    assert order_stops([1, 2], [3, 4]) == [0, 1]
+
+
+# # # # # # # # # # # # # # # # #
+#    SCHEDULE ROUTE OPTIMIZING  #
+# # # # # # # # # # # # # # # # #
+
+
+@patch("holiday_planner.serializers.fetch_weather_data", return_value=[])
+def test_create_with_optimized_route(mock_weather, api_client, mock_places):
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-30",
+        "optimize_route": True,
+        "destinations_input": [{"place_name": name} for name in PLACES],
+    }
+    response = api_client.post("/api/schedules/", data, format="json")
+
+    assert response.status_code == 201, response.data
+    assert [item["destination"] for item in response.data["destinations"]] == [
+        "Lisbon",
+        "Madrid",
+        "Paris",
+        "Berlin",
+        "Vienna",
+    ]
+    # Dates are allocated in the new order
+    items = ScheduleItem.objects.order_by("start_date")
+    assert [item.destination.name for item in items][:2] == ["Lisbon", "Madrid"]
+    # Every place is geocoded once
+    assert mock_places.call_count == len(PLACES)
+
+
+@patch("holiday_planner.serializers.fetch_weather_data", return_value=[])
+def test_create_keeps_order_by_default(mock_weather, api_client, mock_places):
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-30",
+        "destinations_input": [{"place_name": name} for name in PLACES],
+    }
+    response = api_client.post("/api/schedules/", data, format="json")
+
+    assert response.status_code == 201
+    assert [item["destination"] for item in response.data["destinations"]] == list(
+        PLACES
+    )
+
+
+def test_optimize_route_needs_flexible_dates(api_client, mock_places):
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-30",
+        "optimize_route": True,
+        "destinations_input": [
+            {"place_name": "Paris", "length_of_stay": "3"},
+            {"place_name": "Berlin"},
+        ],
+    }
+    response = api_client.post("/api/schedules/", data, format="json")
+
+    assert response.status_code == 400
+    assert "optimize_route" in response.data
+    mock_places.assert_not_called()
+
+
+def test_optimize_route_is_rejected_on_update(api_client, mock_places):
+    data = {
+        "start_date": "2024-10-20",
+        "end_date": "2024-10-30",
+        "destinations_input": [{"place_name": "Paris", "length_of_stay": "3"}],
+    }
+    with patch("holiday_planner.serializers.fetch_weather_data", return_value=[]):
+        response = api_client.post("/api/schedules/", data, format="json")
+    url = f"/api/schedules/{response.data['id']}/"
+
+    for method in (api_client.put, api_client.patch):
+        response = method(url, {**data, "optimize_route": True}, format="json")
+        assert response.status_code == 400
+        assert "optimize_route" in response.data
@@ -0,0 +1,77 @@
+import pytest
+from rest_framework.test import APIClient
+from holiday_planner.gazetteer import build_index
+from holiday_planner.models import Destination
+from holiday_planner.suggest import PrefixIndex, destination_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_destination_index():
+    destination_index.reset()
+    yield
+    destination_index.reset()
+
+
+@pytest.fixture
+def gazetteer_path(tmp_path, settings):
+    path = tmp_path / "gazetteer.idx"
+    build_index(
+        [
+            (["Paris"], "Paris", "FR", "France", 48.85, 2.35, 2138551),
+            (["Parma"], "Parma", "IT", "Italy", 44.8, 10.33, 175895),
+            (["Paris"], "Paris", "US", "United States", 33.66, -95.56, 24171),
+        ],
+        path,
+    )
+    settings.GAZETTEER_INDEX_PATH = path
+    return path
+
+
+# # # # # # # # # # # #
+#    SUGGEST TESTS    #
+# # # # # # # # # # # #
+
+
+def test_prefix_index():
+    index = PrefixIndex([("Cape Town", "South Africa"), ("Cairo", "Egypt")])
+    index.add("Canberra", "Australia")
+    index.add("Cairo", "Egypt")
+
+    assert index.search("ca") == [
+        ("Cairo", "Egypt"),
+        ("Canberra", "Australia"),
+        ("Cape Town", "South Africa"),
+    ]
+    assert index.search("CAPE-T") == [("Cape Town", "South Africa")]
+    assert index.search("ca", limit=1) == [("Cairo", "Egypt")]
+    assert index.search("") == []
+
+
+@pytest.mark.django_db
+def test_suggest_known_destinations_then_gazetteer(gazetteer_path):
+    Destination.objects.create(
+        name="Paris", country="France", latitude=48.85, longitude=2.35
+    )
+
+    response = APIClient().get("/api/destinations/suggest/", {"q": "par"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"name": "Paris", "country": "France", "source": "destination"},
+        {"name": "Parma", "country": "Italy", "source": "gazetteer"},
+        {"name": "Paris", "country": "United States", "source": "gazetteer"},
+    ]
+
+
+@pytest.mark.django_db
+def test_suggest_picks_up_new_destinations():
+    client = APIClient()
+    assert client.get("/api/destinations/suggest/", {"q": "kny"}).json() == []
+
+    # Added to the loaded index by the post_save signal
+    Destination.objects.create(
+        name="Knysna", country="South Africa", latitude=-34.03, longitude=23.04
+    )
+    response = client.get("/api/destinations/suggest/", {"q": "kny"})
+    assert response.json() == [
+        {"name": "Knysna", "country": "South Africa", "source": "destination"}
+    ]
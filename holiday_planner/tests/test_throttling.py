@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from holiday_planner.throttling import CostThrottle, destination_days
+
+
+def lookup(place_name, days):
+    return {
+        "place_name": place_name,
+        "start_date": "2024-10-20",
+        "end_date": f"2024-10-{19 + days}",
+    }
+
+
+# # # # # # # # # #
+#    FIXTURES    #
+# # # # # # # # # #
+
+
+def make_client(username):
+    client = APIClient()
+    client.force_authenticate(
+        user=User.objects.create_user(username=username, password="testpassword")
+    )
+    return client
+
+
+@pytest.fixture(autouse=True)
+def quota(settings):
+    settings.COST_THROTTLE_RATES = {"weather": "10/hour"}
+    settings.WEATHER_MAX_LOCATIONS = 3
+
+
+@pytest.fixture(autouse=True)
+def upstream(mock_geocode):
+    with patch("holiday_planner.views.fetch_weather_data", return_value=[]):
+        yield
+
+
+# # # # # # # # # # # # #
+#   THROTTLING TESTS    #
+# # # # # # # # # # # # #
+
+
+def test_destination_days():
+    assert destination_days([lookup("Paris", 3), lookup("Lyon", 2)]) == 5
+    # Malformed or reversed ranges cost one unit
+    assert destination_days([{"place_name": "Paris"}, lookup("Lyon", -3)]) == 2
+
+
+def test_weather_requests_are_charged_by_destination_days(api_client):
+    response = api_client.post(
+        "/api/weather/", [lookup("Paris", 3), lookup("Lyon", 3)], format="json"
+    )
+    assert response.status_code == 200
+
+    response = api_client.post(
+        "/api/weather/", [lookup("Paris", 3), lookup("Lyon", 2)], format="json"
+    )
+    assert response.status_code == 429
+    assert 0 < int(response["Retry-After"]) <= 3600
+    assert "costs 5 units but only 4 of 10 are left" in response.data["detail"]
+
+    # The rejected request was not charged
+    response = api_client.post("/api/weather/", [lookup("Paris", 4)], format="json")
+    assert response.status_code == 200
+
+
+def test_rejection_after_window_expired(api_client):
+    api_client.post("/api/weather/", [lookup("Paris", 10)], format="json")
+
+    # The counter expires before the rejected request's cost is refunded
+    with patch.object(CostThrottle.cache, "decr", side_effect=ValueError):
+        response = api_client.post("/api/weather/", [lookup("Paris", 1)], format="json")
+    assert response.status_code == 429
+
+
+def test_quotas_are_per_client(api_client):
+    api_client.post("/api/weather/", [lookup("Paris", 10)], format="json")
+
+    assert (
+        api_client.post("/api/weather/", [lookup("Paris", 1)], format="json")
+    ).status_code == 429
+    assert (
+        make_client("other").post("/api/weather/", [lookup("Paris", 1)], format="json")
+    ).status_code == 200
+
+
+def test_request_larger_than_quota(api_client):
+    response = api_client.post("/api/weather/", [lookup("Paris", 11)], format="json")
+
+    assert response.status_code == 429
+    assert "Retry-After" not in response
+    assert "Split it into smaller requests" in response.data["detail"]
+
+
+def test_max_batch_size(api_client):
+    response = api_client.post("/api/weather/", [lookup("Paris", 1)] * 4, format="json")
+
+    assert response.status_code == 400
+    assert "no more than 3" in str(response.data)
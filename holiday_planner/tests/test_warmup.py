@@ -0,0 +1,53 @@
+import gc
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from holiday_planner.geocoding import geocode, preloaded_locations
+from holiday_planner.models import Destination, HolidaySchedule, ScheduleItem
+from holiday_planner.suggest import destination_index
+from holiday_planner.warmup import warmup
+
+
+@pytest.fixture
+def destinations(transactional_db):
+    # Warmup closes the database connections, which a test transaction won't allow
+    schedule = HolidaySchedule.objects.create(
+        user=User.objects.create_user(username="testuser", password="testpassword"),
+        start_date="2024-10-20",
+        end_date="2024-10-22",
+    )
+    for name, uses in [("Paris", 2), ("Lyon", 1), ("Nice", 0)]:
+        destination = Destination.objects.create(
+            name=name, country="France", latitude=48.8566, longitude=2.3522
+        )
+        for _ in range(uses):
+            ScheduleItem.objects.create(
+                holiday_schedule=schedule, destination=destination
+            )
+
+
+@pytest.fixture
+def warmed_up(destinations, settings):
+    settings.WARMUP_DESTINATIONS = 2
+    yield warmup()
+    gc.unfreeze()
+    preloaded_locations.clear()
+    destination_index.reset()
+
+
+def test_warmup_preloads_most_used_destinations(warmed_up):
+    assert warmed_up["destinations"] == 2
+    assert warmed_up["suggestions"] == 3
+    assert sorted(preloaded_locations) == ["Lyon", "Paris"]
+    assert gc.get_freeze_count() > 0
+
+
+def test_preloaded_destinations_skip_geocoding(warmed_up):
+    with patch("geopy.Nominatim.geocode") as nominatim:
+        location = geocode("Paris")
+        geocode("Nice")
+
+    assert (location.latitude, location.longitude) == (48.8566, 2.3522)
+    assert location.address.split(", ")[-1] == "France"
+    assert [call.args[0] for call in nominatim.call_args_list] == ["Nice"]
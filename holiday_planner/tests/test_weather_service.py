@@ -0,0 +1,133 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from holiday_planner.cache import clear_cached_forecasts
+from holiday_planner.weather_service import (
+    DAILY_VARIABLES,
+    HOURLY_VARIABLES,
+    decode_hourly_weather_data,
+    fetch_hourly_weather_data,
+    fetch_weather_data,
+    parse_forecast,
+    read_columns,
+)
+
+# 2024-10-20T00:00 in Europe/Berlin (UTC+2), as Open-Meteo returns it
+START = 1729375200
+DAY = 86400
+
+
+# # # # # # # # # # # #
+#      FIXTURES       #
+# # # # # # # # # # # #
+
+
+@pytest.fixture
+def daily_forecast(build_forecast):
+    columns = [[2, 45, 61]] + [
+        np.full(3, 10 * (i + 1) + 0.4) for i in range(len(DAILY_VARIABLES) - 1)
+    ]
+    return build_forecast(daily=(START, START + 3 * DAY, DAY, columns))
+
+
+@pytest.fixture
+def upstream(daily_forecast):
+    with patch("holiday_planner.providers.retry_session.get") as mock:
+        mock.return_value = MagicMock(status_code=200, content=daily_forecast)
+        yield mock
+
+
+# # # # # # # # # # # # # # #
+#  WEATHER SERVICE TESTS    #
+# # # # # # # # # # # # # # #
+
+
+def test_fetch_weather_data(upstream):
+    weather = fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22")
+
+    params = upstream.call_args.kwargs["params"]
+    assert params["format"] == "flatbuffers"
+    assert params["daily"] == DAILY_VARIABLES
+
+    # Days are labelled with the local dates of the midnights Open-Meteo returns
+    assert [day["date"] for day in weather] == [
+        "2024-10-20",
+        "2024-10-21",
+        "2024-10-22",
+    ]
+    assert weather[1] == {
+        "date": "2024-10-21",
+        "weather_code": 45.0,
+        "weather_description": "Fog",
+        "temperature_max": 10,
+        "temperature_min": 20,
+        "uv_index_max": 30,
+        "precipitation_probability_max": 40,
+        "wind_speed_max": 50,
+        "wind_gusts_max": 60,
+        "wind_direction": 70,
+    }
+    assert type(weather[0]["weather_code"]) is float
+    assert type(weather[0]["temperature_max"]) is int
+
+
+def test_raw_responses_are_cached(upstream):
+    first = fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22")
+    assert fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22") == first
+    assert upstream.call_count == 1
+
+    # Served from the shared cache once this process' LRU is gone
+    clear_cached_forecasts()
+    assert fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22") == first
+    assert upstream.call_count == 1
+
+    fetch_weather_data(48.85, 2.35, "2024-10-21", "2024-10-22")
+    assert upstream.call_count == 2
+
+
+def test_upstream_errors_are_not_cached(upstream, daily_forecast):
+    upstream.return_value = MagicMock(status_code=500)
+    upstream.return_value.raise_for_status.side_effect = RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22")
+
+    upstream.return_value = MagicMock(status_code=200, content=daily_forecast)
+    assert len(fetch_weather_data(48.85, 2.35, "2024-10-20", "2024-10-22")) == 3
+
+
+def test_read_columns_views_the_buffer(daily_forecast):
+    response = parse_forecast(daily_forecast)[0]
+
+    times, columns = read_columns(
+        response,
+        "daily",
+        DAILY_VARIABLES,
+        names={"temperature_2m_max"},
+        start=START + DAY,
+        end=START + 2 * DAY,
+    )
+    assert times.tolist() == [START + DAY]
+    assert list(columns) == ["temperature_2m_max"]
+    assert columns["temperature_2m_max"].tolist() == pytest.approx([10.4])
+    # A view into the response bytes, not a copy
+    assert not columns["temperature_2m_max"].flags.owndata
+
+
+def test_fetch_hourly_weather_data(upstream, build_forecast):
+    columns = [np.full(24, i, dtype=np.float32) for i in range(len(HOURLY_VARIABLES))]
+    upstream.return_value.content = build_forecast(
+        hourly=(START, START + DAY, 3600, columns)
+    )
+
+    blob = fetch_hourly_weather_data(48.85, 2.35, "2024-10-20", "2024-10-20")
+
+    params = upstream.call_args.kwargs["params"]
+    assert params["hourly"] == [name for name, _ in HOURLY_VARIABLES]
+
+    data = decode_hourly_weather_data(blob)
+    assert data["time"][0] == "2024-10-20T00:00"
+    assert len(data["time"]) == 24
+    assert [data[name][0] for name, _ in HOURLY_VARIABLES] == list(
+        range(len(HOURLY_VARIABLES))
+    )
@@ -0,0 +1,103 @@
+from datetime import date
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.throttling import SimpleRateThrottle
+from holiday_planner import metrics
+
+metrics.register("throttle.rejected")
+
+
+def destination_days(locations):
+    """
+    Cost of a list of `{"start_date", "end_date"}` lookups: the number of days of
+    each, at least one. Malformed entries cost one, validation rejects them later.
+    """
+    cost = 0
+    for location in locations:
+        try:
+            days = (
+                date.fromisoformat(location["end_date"])
+                - date.fromisoformat(location["start_date"])
+            ).days + 1
+        except (KeyError, TypeError, ValueError):
+            days = 1
+        cost += max(days, 1)
+    return cost
+
+
+class CostThrottle(SimpleRateThrottle):
+    """
+    Per client quota of cost units per period, e.g. "2000/hour" destination-days.
+
+    Views set `throttle_scope` (a key of `COST_THROTTLE_RATES`) and may define
+    `get_throttle_cost(request)`, otherwise a request costs one unit. Clients are
+    identified by user, or by IP address when anonymous.
+
+    Usage is counted per fixed window in the shared cache (see cache.py) with
+    atomic increments. Rejected requests are not charged.
+    """
+
+    cache_format = "holiday_planner:throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # The scope and rate depend on the view, see allow_request()
+        pass
+
+    def get_rate(self):
+        return settings.COST_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scope", None)
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        get_cost = getattr(view, "get_throttle_cost", None)
+        cost = get_cost(request) if get_cost else 1
+        if cost > self.num_requests:
+            metrics.incr("throttle.rejected")
+            raise exceptions.Throttled(
+                detail=(
+                    f"This request costs {cost} units, more than the quota of "
+                    f"{self.num_requests} per {self.duration} seconds. "
+                    "Split it into smaller requests."
+                )
+            )
+
+        now = self.timer()
+        window = int(now // self.duration)
+        key = f"{self.get_cache_key(request, view)}:{window}"
+        self.cache.add(key, 0, timeout=self.duration)
+        try:
+            used = self.cache.incr(key, cost)
+        except ValueError:
+            # The counter expired between add() and incr()
+            self.cache.set(key, cost, timeout=self.duration)
+            used = cost
+
+        if used <= self.num_requests:
+            return True
+
+        try:
+            self.cache.decr(key, cost)
+        except ValueError:
+            # The window ended in the meantime, there is nothing left to refund
+            pass
+        metrics.incr("throttle.rejected")
+        remaining = max(self.num_requests - (used - cost), 0)
+        raise exceptions.Throttled(
+            wait=(window + 1) * self.duration - now,
+            detail=(
+                f"This request costs {cost} units but only {remaining} of "
+                f"{self.num_requests} are left in the current window."
+            ),
+        )
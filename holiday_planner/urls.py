@@ -1,13 +1,28 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import WeatherAPIView, UserList, UserDetail, HolidayScheduleViewSet
+from .views import (
+    WeatherAPIView,
+    WeatherCompareView,
+    UserList,
+    UserDetail,
+    HolidayScheduleViewSet,
+    MetricsView,
+    DestinationSuggestView,
+    DestinationNearbyView,
+    schedule_events,
+)
 
 router = DefaultRouter()
 router.register(r"schedules", HolidayScheduleViewSet, basename="schedules")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("schedules/<int:pk>/events/", schedule_events),
     path("users/", UserList.as_view()),
     path("users/<int:pk>/", UserDetail.as_view()),
     path("weather/", WeatherAPIView.as_view()),
+    path("weather/compare/", WeatherCompareView.as_view()),
+    path("destinations/suggest/", DestinationSuggestView.as_view()),
+    path("destinations/nearby/", DestinationNearbyView.as_view()),
+    path("metrics/", MetricsView.as_view()),
 ]
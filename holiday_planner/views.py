@@ -1,23 +1,104 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, generics, viewsets, permissions
-from geopy import Nominatim
-from holiday_planner.models import Destination, HolidaySchedule
+from rest_framework import status, generics, viewsets, permissions, exceptions
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from django.utils.cache import get_conditional_response
+from holiday_planner.archive import archived_representation
+from holiday_planner.bulk import (
+    iter_csv,
+    iter_ndjson,
+    iter_schedule_records,
+    ScheduleImportError,
+    import_schedule_records,
+    parse_csv,
+    parse_ndjson,
+)
+from holiday_planner.cache import get_cached_schedule, set_cached_schedule
+from holiday_planner.events import broker, read_events
+from holiday_planner.idempotency import idempotent
+from holiday_planner.conditional import (
+    get_archived_validators,
+    get_schedule_validators,
+    set_validator_headers,
+)
+from holiday_planner.models import (
+    ArchivedSchedule,
+    Destination,
+    HolidaySchedule,
+    ScheduleItem,
+)
+from holiday_planner.renderers import ColumnarMsgPackRenderer
 from holiday_planner.serializers import (
     WeatherDataSerializer,
+    WeatherCompareSerializer,
+    NearbyQuerySerializer,
+    ScheduleQuerySerializer,
     UserSerializer,
     HolidayScheduleSerializer,
+    serialize_schedule_delta,
+    serialize_schedules,
 )
-from holiday_planner.weather_service import fetch_weather_data
+from holiday_planner.weather_service import fetch_daily_forecasts, fetch_weather_data
+from holiday_planner.compare import COMPARE_MAX_DESTINATIONS, compare_forecasts
+from holiday_planner.geocoding import geocode
+from holiday_planner.suggest import suggest_destinations
+from holiday_planner.throttling import CostThrottle, destination_days
+from holiday_planner import metrics
+from asgiref.sync import sync_to_async
+import asyncio
+import orjson
 from django.contrib.auth.models import User
 
+# JSON stays the default, compact columnar MessagePack is negotiated with
+# `Accept: application/x-msgpack` or `?format=msgpack`
+WEATHER_RENDERER_CLASSES = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    ColumnarMsgPackRenderer,
+]
+
+# Request headers that make a PUT or PATCH conditional
+PRECONDITION_HEADERS = (
+    "If-Match",
+    "If-None-Match",
+    "If-Unmodified-Since",
+    "If-Modified-Since",
+)
+
 
 class WeatherAPIView(APIView):
+    renderer_classes = WEATHER_RENDERER_CLASSES
+    throttle_classes = [CostThrottle]
+    throttle_scope = "weather"
+
+    def get_throttle_cost(self, request):
+        # One unit per destination-day. Oversized batches are rejected by the
+        # serializer, so they are not charged
+        locations = request.data
+        if not isinstance(locations, list) or not (
+            0 < len(locations) <= settings.WEATHER_MAX_LOCATIONS
+        ):
+            return 1
+        return destination_days(
+            location for location in locations if isinstance(location, dict)
+        )
+
+    @idempotent
     def post(self, request):
-        serializer = WeatherDataSerializer(data=request.data, many=True)
+        # Columnar renderers take the forecast columns as decoded, no daily dicts
+        columnar = request.accepted_renderer.format == ColumnarMsgPackRenderer.format
+
+        serializer = WeatherDataSerializer(
+            data=request.data, many=True, max_length=settings.WEATHER_MAX_LOCATIONS
+        )
         serializer.is_valid(raise_exception=True)
 
-        geolocator = Nominatim(user_agent="holiday_planner")
         weather_results = []
 
         for location in serializer.validated_data:
@@ -26,7 +107,7 @@ class WeatherAPIView(APIView):
             end_date = location.get("end_date")
 
             # GeoCode the Place name
-            location = geolocator.geocode(place_name)
+            location = geocode(place_name)
             if location:
                 # Check if destination exists otherwise create it
                 destination, created = Destination.objects.get_or_create(
@@ -44,6 +125,7 @@ class WeatherAPIView(APIView):
                     longitude=destination.longitude,
                     start_date=start_date,
                     end_date=end_date,
+                    columnar=columnar,
                 )
                 weather_results.append(
                     {"place_name": place_name, "weather_data": weather_data}
@@ -57,6 +139,110 @@ class WeatherAPIView(APIView):
         return Response(weather_results)
 
 
+class WeatherCompareView(APIView):
+    renderer_classes = WEATHER_RENDERER_CLASSES
+    throttle_classes = [CostThrottle]
+    throttle_scope = "weather"
+
+    def get_throttle_cost(self, request):
+        # One unit per destination-day, like the weather endpoint
+        data = request.data
+        place_names = data.get("place_names") if isinstance(data, dict) else None
+        if not isinstance(place_names, list) or not (
+            0 < len(place_names) <= COMPARE_MAX_DESTINATIONS
+        ):
+            return 1
+        return len(place_names) * destination_days([data])
+
+    def post(self, request):
+        serializer = WeatherCompareSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        place_names = serializer.validated_data["place_names"]
+
+        # Known destinations in one query, geocode only the new ones
+        destinations = {}
+        for destination in Destination.objects.filter(name__in=place_names).order_by(
+            "id"
+        ):
+            destinations.setdefault(destination.name, destination)
+
+        for place_name in place_names:
+            if place_name in destinations:
+                continue
+            location = geocode(place_name)
+            if not location:
+                return Response(
+                    {"error": f"Geocoding failed for {place_name}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            destinations[place_name], _ = Destination.objects.get_or_create(
+                name=place_name,
+                defaults={
+                    "country": location.address.split(", ")[-1].strip(),
+                    "latitude": location.latitude,
+                    "longitude": location.longitude,
+                },
+            )
+
+        raws = fetch_daily_forecasts(
+            [
+                (destinations[name].latitude, destinations[name].longitude)
+                for name in place_names
+            ],
+            start_date=serializer.validated_data["start_date"],
+            end_date=serializer.validated_data["end_date"],
+        )
+        return Response(
+            compare_forecasts(place_names, raws, serializer.validated_data["variables"])
+        )
+
+
+class DestinationSuggestView(APIView):
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, self.max_limit))
+        return Response(suggest_destinations(query, limit))
+
+
+class DestinationNearbyView(APIView):
+    def get(self, request):
+        serializer = NearbyQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        results = Destination.objects.nearby(
+            query["lat"], query["lon"], query["radius_km"]
+        )
+        return Response(
+            [
+                {
+                    "name": destination.name,
+                    "country": destination.country,
+                    "latitude": destination.latitude,
+                    "longitude": destination.longitude,
+                    "distance_km": round(distance, 3),
+                }
+                for destination, distance in results[: query["limit"]]
+            ]
+        )
+
+
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
 class UserList(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -68,9 +254,286 @@ class UserDetail(generics.RetrieveAPIView):
 
 
 class HolidayScheduleViewSet(viewsets.ModelViewSet):
-    queryset = HolidaySchedule.objects.prefetch_related("destinations__destination")
+    queryset = HolidaySchedule.objects.prefetch_related(
+        # Packed hourly series are only decoded for ?resolution=hourly
+        Prefetch(
+            "destinations",
+            queryset=ScheduleItem.objects.select_related("destination").defer(
+                "hourly_weather"
+            ),
+        )
+    )
     serializer_class = HolidayScheduleSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    renderer_classes = WEATHER_RENDERER_CLASSES
+    resolutions = ("daily", "hourly")
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def wants_hourly(self):
+        resolution = self.request.query_params.get("resolution", "daily")
+        if resolution not in self.resolutions:
+            raise exceptions.ValidationError(
+                {"resolution": f"Must be one of {', '.join(self.resolutions)}"}
+            )
+        return resolution == "hourly"
+
+    def get_since(self):
+        # Client-known weather version for delta responses, see delta.py
+        since = self.request.query_params.get("since")
+        if since is None:
+            return None
+        if not since.isdigit():
+            raise exceptions.ValidationError(
+                {"since": "Must be a non-negative integer weather version"}
+            )
+        return int(since)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ("list", "export"):
+            return queryset
+
+        serializer = ScheduleQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+        user = filters.pop("user", None)
+        if filters.pop("mine"):
+            if not self.request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            if user is not None and user != self.request.user.pk:
+                return queryset.none()
+            user = self.request.user.pk
+        return queryset.matching(user=user, **filters)
+
+    def get_object_validators(self, lock=False):
+        # Validators for the single schedule addressed by the URL
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                pk=self.kwargs[self.lookup_field]
+            )
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+        if lock:
+            list(queryset.select_for_update(of=("self",)).values_list("pk"))
+
+        validators = get_schedule_validators(self.request, queryset)
+        if not validators.count:
+            raise Http404
+        return validators
+
+    def list(self, request, *args, **kwargs):
+        hourly = self.wants_hourly()
+        # No Last-Modified: the newest updated_at does not change when a schedule
+        # is deleted, the ETag (which counts the rows) does
+        validators = get_schedule_validators(
+            request, self.filter_queryset(self.get_queryset())
+        )._replace(last_modified=None)
+        response = get_conditional_response(
+            request, etag=validators.etag, last_modified=validators.last_modified
+        )
+        if response is None:
+            response = Response(
+                serialize_schedules(
+                    self.filter_queryset(self.get_queryset()), hourly=hourly
+                )
+            )
+        return set_validator_headers(response, validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        schedule_id = self.kwargs[self.lookup_field]
+        hourly = self.wants_hourly()
+        since = self.get_since()
+        variant = f"{request.get_full_path()}|{request.accepted_media_type}"
+        version, cached = get_cached_schedule(schedule_id, variant)
+
+        try:
+            validators = (
+                cached["validators"] if cached else self.get_object_validators()
+            )
+        except Http404:
+            return self.retrieve_archived(request, schedule_id, hourly, since)
+        response = get_conditional_response(
+            request, etag=validators.etag, last_modified=validators.last_modified
+        )
+        if response is None and cached:
+            response = Response(cached["data"])
+        elif response is None:
+            queryset = self.filter_queryset(self.get_queryset()).filter(pk=schedule_id)
+            if since is None:
+                data = serialize_schedules(queryset, hourly=hourly)
+                data = data[0] if data else None
+            else:
+                data = serialize_schedule_delta(queryset, since, hourly=hourly)
+            if data is None:
+                raise Http404
+            response = Response(data)
+            set_cached_schedule(
+                schedule_id,
+                version,
+                variant,
+                {"validators": validators, "data": response.data},
+            )
+        if validators.weather_version is not None:
+            response["Weather-Version"] = str(validators.weather_version)
+        return set_validator_headers(response, validators)
+
+    def retrieve_archived(self, request, schedule_id, hourly, since):
+        # Finished schedules moved out of the hot tables, see archive.py
+        try:
+            archived = ArchivedSchedule.objects.get(pk=schedule_id)
+        except (ArchivedSchedule.DoesNotExist, ValueError, ValidationError):
+            raise Http404
+
+        validators = get_archived_validators(request, archived)
+        response = get_conditional_response(
+            request, etag=validators.etag, last_modified=validators.last_modified
+        )
+        if response is None:
+            response = Response(
+                archived_representation(archived, since=since, hourly=hourly)
+            )
+        response["Archived"] = "true"
+        response["Weather-Version"] = str(validators.weather_version)
+        return set_validator_headers(response, validators)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def archived(self, request):
+        # The user's archived schedules, details are read one by one on demand
+        return Response(
+            [
+                {
+                    "id": schedule_id,
+                    "start_date": start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "archived_at": archived_at.isoformat(),
+                }
+                for schedule_id, start_date, end_date, archived_at in (
+                    ArchivedSchedule.objects.filter(user=request.user)
+                    .order_by("-end_date", "-id")
+                    .values_list("id", "start_date", "end_date", "archived_at")
+                )
+            ]
+        )
+
+    def update(self, request, *args, **kwargs):
+        if not any(header in request.headers for header in PRECONDITION_HEADERS):
+            response = super().update(request, *args, **kwargs)
+            return set_validator_headers(response, self.get_object_validators())
+
+        # Lock the schedule so If-Match is checked against the version being
+        # replaced. The lock is held while the update geocodes and fetches the
+        # weather, so it is only taken for conditional requests
+        with transaction.atomic():
+            validators = self.get_object_validators(lock=True)
+            response = get_conditional_response(
+                request, etag=validators.etag, last_modified=validators.last_modified
+            )
+            if response is not None:
+                return response
+            response = super().update(request, *args, **kwargs)
+
+        return set_validator_headers(response, self.get_object_validators())
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def export(self, request):
+        # `format` is reserved by DRF for renderer selection, so use `output`
+        records = iter_schedule_records(self.filter_queryset(self.get_queryset()))
+        if request.query_params.get("output") == "csv":
+            return StreamingHttpResponse(iter_csv(records), content_type="text/csv")
+        return StreamingHttpResponse(
+            iter_ndjson(records), content_type="application/x-ndjson"
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def import_schedules(self, request):
+        # Read the raw body line by line instead of parsing it all into request.data
+        lines = iter(request.stream) if request.stream else []
+        if request.content_type.startswith("text/csv"):
+            records = parse_csv(lines)
+        else:
+            records = parse_ndjson(lines)
+
+        try:
+            created = import_schedule_records(records, user=request.user)
+        except ScheduleImportError as exc:
+            # Earlier batches stay committed, say how many
+            return Response(
+                {"error": str(exc), "imported": exc.imported},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({"imported": created}, status=status.HTTP_201_CREATED)
+
+
+def _sse_message(sequence, event):
+    return f"id: {sequence}\nevent: weather\ndata: {orjson.dumps(event).decode()}\n\n"
+
+
+async def _schedule_event_stream(schedule_id, last_event_id):
+    queue = await broker.subscribe(schedule_id)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+
+        # Replay what a reconnecting client missed
+        for sequence, event in await sync_to_async(read_events)(
+            schedule_id, last_event_id
+        ):
+            last_event_id = sequence
+            yield _sse_message(sequence, event)
+
+        while True:
+            try:
+                sequence, event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if sequence > last_event_id:
+                last_event_id = sequence
+                yield _sse_message(sequence, event)
+    finally:
+        broker.unsubscribe(schedule_id, queue)
+
+
+@require_GET
+async def schedule_events(request, pk):
+    """
+    Server-Sent Events stream of material weather changes of a schedule. Needs
+    an ASGI server; each connection is an idle coroutine between events.
+    """
+    if not await HolidaySchedule.objects.filter(pk=pk).aexists():
+        raise Http404
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        last_event_id = 0
+
+    response = StreamingHttpResponse(
+        _schedule_event_stream(pk, last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Ask nginx style proxies not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,82 @@
+import gc
+import importlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from holiday_planner.gazetteer import get_gazetteer
+from holiday_planner.geocoding import preload_destinations
+from holiday_planner.providers import retry_session
+from holiday_planner.suggest import destination_index
+from holiday_planner.weather_service import WMO_WEATHER_CODE_MAP
+
+logger = logging.getLogger(__name__)
+
+# Pre-fork warmup, run once in the server's master process (see gunicorn.conf.py).
+#
+# Everything loaded here is inherited by every worker through fork(), so it is
+# imported and built once instead of on each worker's first request, and its
+# memory pages stay shared between workers as long as nobody writes to them.
+# gc.freeze() moves the loaded objects out of the collector's generations, so
+# garbage collections in the workers do not touch (and copy) those pages.
+
+# Modules that are slow to import, loaded here so no request pays for them
+HEAVY_MODULES = [
+    "numpy",
+    "flatbuffers",
+    "openmeteo_sdk.WeatherApiResponse",
+    "openmeteo_requests.Client",
+    "requests",
+    "retry_requests",
+    "geopy.geocoders",
+    "msgpack",
+    "orjson",
+    "rest_framework.views",
+    "rest_framework.viewsets",
+    "holiday_planner.views",
+    "holiday_planner.urls",
+]
+
+
+def warmup():
+    """
+    Import the heavy modules, build the process wide lookup structures, close
+    everything that must not be shared across fork() and freeze the heap.
+    Returns what was loaded and how long it took.
+    """
+    started = time.monotonic()
+    for module in HEAVY_MODULES:
+        importlib.import_module(module)
+
+    # URL resolvers are built lazily on the first request otherwise
+    get_resolver().url_patterns
+
+    stats = {
+        "modules": len(HEAVY_MODULES),
+        "weather_codes": len(WMO_WEATHER_CODE_MAP),
+        "gazetteer": len(get_gazetteer(settings.GAZETTEER_INDEX_PATH) or ()),
+    }
+    try:
+        stats["destinations"] = preload_destinations(settings.WARMUP_DESTINATIONS)
+        stats["suggestions"] = len(destination_index.get().entries)
+    except DatabaseError:
+        # Workers still start cold rather than not at all
+        logger.exception("Could not preload destinations")
+
+    # Sockets and pool threads do not survive fork(), workers open their own
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+    caches.close_all()
+    # Pooled upstream connections are reopened on use
+    retry_session.close()
+
+    gc.collect()
+    gc.freeze()
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    logger.info("Warmed up before fork: %s", stats)
+    return stats
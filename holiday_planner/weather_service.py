@@ -1,7 +1,12 @@
-import openmeteo_requests
-import requests_cache
-from retry_requests import retry
-import pandas as pd
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+from holiday_planner import metrics
+from holiday_planner.cache import get_cached_forecast, set_cached_forecast
+from holiday_planner.columnar import pack_series, series_to_json
+from holiday_planner.providers import weather_client
 
 # Weather code description mapping based on WMO codes
 WMO_WEATHER_CODE_MAP = {
@@ -35,49 +40,244 @@ WMO_WEATHER_CODE_MAP = {
     99: "Thunderstorm with heavy hail",
 }
 
-# Setup the Open-Meteo API client with caching and retries
-cache_session = requests_cache.CachedSession(
-    ".cache", expire_after=3600
-)  # Cache for 1 hour
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+# Locations per multi-location request, keeps the query string reasonably short
+FORECAST_BATCH_SIZE = 100
+
+# Days covered by a horizon forecast, Open-Meteo's default forecast length. Any
+# daily lookup within the horizon of a location can be served from its horizon
+# forecast, see `prewarm.py`
+FORECAST_HORIZON_DAYS = 16
+
+metrics.register(
+    "forecast.lookups",
+    "forecast.hits",
+    "forecast.horizon_hits",
+    "forecast.misses",
+)
+
+DAILY_VARIABLES = [
+    "weather_code",
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "uv_index_max",
+    "precipitation_probability_max",
+    "wind_speed_10m_max",
+    "wind_gusts_10m_max",
+    "wind_direction_10m_dominant",
+]
+
+# Hourly variables and how they are packed: "f" float32, "b" int8
+HOURLY_VARIABLES = [
+    ("temperature_2m", "f"),
+    ("apparent_temperature", "f"),
+    ("precipitation_probability", "b"),
+    ("precipitation", "f"),
+    ("weather_code", "b"),
+    ("wind_speed_10m", "f"),
+    ("uv_index", "f"),
+]
+
+
+def _request_forecast(params):
+    # Served by the configured providers, see providers.py
+    return weather_client().fetch(params)
+
+
+def fetch_forecast(params):
+    """
+    Return the raw FlatBuffers response of an Open-Meteo forecast query. Responses
+    are cached undecoded, see `cache.get_cached_forecast`.
+    """
+    metrics.incr("forecast.lookups")
+    raw = get_cached_forecast(params)
+    if raw is not None:
+        metrics.incr("forecast.hits")
+        return raw
+
+    metrics.incr("forecast.misses")
+    raw = _request_forecast(params)
+    set_cached_forecast(params, raw)
+    return raw
+
+
+def _message_offsets(raw):
+    # Each location's message is prefixed with its length as a little endian uint32
+    position = 0
+    while position < len(raw):
+        length = int.from_bytes(raw[position : position + 4], byteorder="little")
+        yield position, position + length + 4
+        position += length + 4
+
+
+def split_forecast(raw):
+    """
+    Split a multi-location response into one raw response per location.
+    """
+    return [raw[start:end] for start, end in _message_offsets(raw)]
+
+
+def parse_forecast(raw):
+    """
+    Return the `WeatherApiResponse` messages (one per location) in a raw response.
+    Messages are read in place, nothing is decoded up front.
+    """
+    return [
+        WeatherApiResponse.GetRootAs(raw, start + 4)
+        for start, _ in _message_offsets(raw)
+    ]
+
+
+def daily_forecast_params(latitude, longitude, start_date, end_date):
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "daily": DAILY_VARIABLES,
+        "timezone": "Europe/Berlin",  # Adjust according to the destination
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+
+def horizon_dates(today=None):
+    """
+    First and last day of today's horizon forecasts.
+    """
+    today = today or timezone.localdate()
+    return today, today + timedelta(days=FORECAST_HORIZON_DAYS - 1)
+
+
+def _horizon_window(latitude, longitude, start_date, end_date):
+    # The cached horizon forecast of a location and the unix time bounds of the
+    # requested days in it. No forecast and no bounds unless all days are covered
+    first_day, last_day = horizon_dates()
+    start = np.datetime64(str(start_date), "D")
+    end = np.datetime64(str(end_date), "D")
+    if start < np.datetime64(first_day) or end > np.datetime64(last_day):
+        return None, (None, None)
+
+    raw = get_cached_forecast(
+        daily_forecast_params(latitude, longitude, first_day, last_day)
+    )
+    if raw is None:
+        return None, (None, None)
+
+    # Daily times are local midnights
+    offset = parse_forecast(raw)[0].UtcOffsetSeconds()
+    bounds = (start, end + 1)
+    return raw, tuple(
+        int(day.astype("datetime64[s]").astype("i8")) - offset for day in bounds
+    )
+
+
+def fetch_daily_forecasts(locations, start_date, end_date, refresh=False):
+    """
+    Return one raw daily response per `(latitude, longitude)` in `locations`.
+
+    Cached responses are reused (unless `refresh`) and all the misses are fetched
+    with a single multi-location request, whose responses are cached one by one so
+    later single location lookups (e.g. `fetch_weather_data`) hit them too.
+    """
+    params = [
+        daily_forecast_params(latitude, longitude, start_date, end_date)
+        for latitude, longitude in locations
+    ]
+    raws = [
+        None if refresh else get_cached_forecast(location_params)
+        for location_params in params
+    ]
+
+    missing = {}
+    for i, raw in enumerate(raws):
+        if raw is None:
+            missing.setdefault(tuple(locations[i]), []).append(i)
+
+    for batch in _batched(list(missing), FORECAST_BATCH_SIZE):
+        messages = split_forecast(
+            _request_forecast(
+                {
+                    **params[0],
+                    "latitude": [latitude for latitude, _ in batch],
+                    "longitude": [longitude for _, longitude in batch],
+                }
+            )
+        )
+        if len(messages) != len(batch):
+            raise ValueError("No weather data available")
+
+        for location, raw in zip(batch, messages):
+            indexes = missing[location]
+            set_cached_forecast(params[indexes[0]], raw)
+            for i in indexes:
+                raws[i] = raw
+
+    return raws
+
+
+def _batched(items, size):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
 
+def read_columns(response, section, variables, names=None, start=None, end=None):
+    """
+    Return `(times, columns)` for a "daily" or "hourly" `section` of a parsed
+    response, where `variables` are the names in the order they were requested.
 
-def clean_weather_data(daily_dataframe):
+    Only the variables in `names` (default: all) are read, as float32 numpy views
+    into the response buffer, and only the steps whose unix time falls within
+    [`start`, `end`) are kept.
+    """
+    data = getattr(response, section.capitalize())()
+    if data is None:
+        raise ValueError("No weather data available")
+
+    times = np.arange(data.Time(), data.TimeEnd(), data.Interval(), dtype="i8")
+    first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+    last = len(times) if end is None else int(np.searchsorted(times, end, "left"))
+
+    columns = {}
+    for i, name in enumerate(variables):
+        if names is None or name in names:
+            columns[name] = data.Variables(i).ValuesAsNumpy()[first:last]
+    return times[first:last], columns
+
+
+def clean_weather_data(daily_data):
     """
     Clean the weather data to return meaningful descriptions and rounded values.
+    `daily_data` maps "date" and each daily variable to equally long columns.
     """
-    daily_datadict = daily_dataframe.to_dict(orient="records")
     cleaned_data = []
 
-    for daily_data in daily_datadict:
+    columns = [daily_data["date"]] + [
+        daily_data[name].tolist() for name in DAILY_VARIABLES
+    ]
+    for (
+        date,
+        weather_code,
+        temperature_max,
+        temperature_min,
+        uv_index_max,
+        precipitation_probability_max,
+        wind_speed_max,
+        wind_gusts_max,
+        wind_direction_dominant,
+    ) in zip(*columns):
         # Get weather code description
-        weather_code = daily_data["weather_code"]
         weather_description = WMO_WEATHER_CODE_MAP.get(weather_code, "Unknown")
 
-        # Round floats to nearest integers
-        temperature_max = round(daily_data["temperature_2m_max"])
-        temperature_min = round(daily_data["temperature_2m_min"])
-        uv_index_max = round(daily_data["uv_index_max"])
-        precipitation_probability_max = round(
-            daily_data["precipitation_probability_max"]
-        )
-        wind_speed_max = round(daily_data["wind_speed_10m_max"])
-        wind_gusts_max = round(daily_data["wind_gusts_10m_max"])
-        wind_direction_dominant = round(daily_data["wind_direction_10m_dominant"])
-
-        # Create the cleaned daily weather entry
+        # Create the cleaned daily weather entry, rounding floats to integers
         cleaned_entry = {
-            "date": daily_data["date"],
+            "date": date,
             "weather_code": weather_code,
             "weather_description": weather_description,
-            "temperature_max": temperature_max,
-            "temperature_min": temperature_min,
-            "uv_index_max": uv_index_max,
-            "precipitation_probability_max": precipitation_probability_max,
-            "wind_speed_max": wind_speed_max,
-            "wind_gusts_max": wind_gusts_max,
-            "wind_direction": wind_direction_dominant,
+            "temperature_max": round(temperature_max),
+            "temperature_min": round(temperature_min),
+            "uv_index_max": round(uv_index_max),
+            "precipitation_probability_max": round(precipitation_probability_max),
+            "wind_speed_max": round(wind_speed_max),
+            "wind_gusts_max": round(wind_gusts_max),
+            "wind_direction": round(wind_direction_dominant),
         }
 
         cleaned_data.append(cleaned_entry)
@@ -85,59 +285,115 @@ def clean_weather_data(daily_dataframe):
     return cleaned_data
 
 
-def fetch_weather_data(latitude, longitude, start_date, end_date):
+# Output name of each rounded daily variable
+WEATHER_COLUMNS = {
+    "temperature_max": "temperature_2m_max",
+    "temperature_min": "temperature_2m_min",
+    "uv_index_max": "uv_index_max",
+    "precipitation_probability_max": "precipitation_probability_max",
+    "wind_speed_max": "wind_speed_10m_max",
+    "wind_gusts_max": "wind_gusts_10m_max",
+    "wind_direction": "wind_direction_10m_dominant",
+}
+
+
+def weather_columns(daily_data):
+    """
+    Columnar counterpart of `clean_weather_data`: one list per output key instead
+    of one dict per day, computed with vectorized numpy operations.
+    """
+    weather_code = daily_data["weather_code"].astype("f8")
+    columns = {
+        "date": daily_data["date"],
+        "weather_code": weather_code.tolist(),
+        "weather_description": [
+            WMO_WEATHER_CODE_MAP.get(code, "Unknown") for code in weather_code.tolist()
+        ],
+    }
+    for name, variable in WEATHER_COLUMNS.items():
+        rounded = np.rint(daily_data[variable].astype("f8"))
+        missing = np.isnan(rounded)
+        values = np.where(missing, 0, rounded).astype("i8").tolist()
+        if missing.any():
+            values = [None if m else v for v, m in zip(values, missing.tolist())]
+        columns[name] = values
+    return columns
+
+
+def fetch_weather_data(latitude, longitude, start_date, end_date, columnar=False):
     """
     Fetch weather data from Open-Meteo API for the given coordinates and date range.
+    With `columnar`, return a dict of lists (see `weather_columns`) instead of a
+    list of daily dicts.
+    """
+    params = daily_forecast_params(latitude, longitude, start_date, end_date)
+
+    # Served from the location's prewarmed horizon forecast when it covers the days
+    raw, window = None, (None, None)
+    if get_cached_forecast(params) is None:
+        raw, window = _horizon_window(latitude, longitude, start_date, end_date)
+    if raw is not None:
+        metrics.incr("forecast.lookups")
+        metrics.incr("forecast.horizon_hits")
+    else:
+        raw = fetch_forecast(params)
+
+    responses = parse_forecast(raw)
+
+    if not responses:
+        raise ValueError("No weather data available")
+
+    # Process first location (add for-loop for multiple locations if needed)
+    times, daily_data = read_columns(
+        responses[0], "daily", DAILY_VARIABLES, start=window[0], end=window[1]
+    )
+
+    # Daily times are local midnights in UTC, label the days with their local dates
+    local_times = times + responses[0].UtcOffsetSeconds()
+    daily_data["date"] = np.datetime_as_string(
+        local_times.astype("datetime64[s]"), unit="D"
+    ).tolist()
+    if columnar:
+        return weather_columns(daily_data)
+    return clean_weather_data(daily_data)
+
+
+def fetch_hourly_weather_data(latitude, longitude, start_date, end_date):
+    """
+    Fetch hourly weather data from Open-Meteo API for the given coordinates and
+    date range, packed into a compact columnar blob (see `columnar.py`).
     """
-    url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": latitude,
         "longitude": longitude,
-        "daily": [
-            "weather_code",
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "uv_index_max",
-            "precipitation_probability_max",
-            "wind_speed_10m_max",
-            "wind_gusts_10m_max",
-            "wind_direction_10m_dominant",
-        ],
+        "hourly": [name for name, _ in HOURLY_VARIABLES],
         "timezone": "Europe/Berlin",  # Adjust according to the destination
         "start_date": start_date,
         "end_date": end_date,
     }
 
-    # Fetch response
-    responses = openmeteo.weather_api(url, params=params)
+    responses = parse_forecast(fetch_forecast(params))
 
     if not responses:
         raise ValueError("No weather data available")
 
-    # Process first location (add for-loop for multiple locations if needed)
     response = responses[0]
-    daily = response.Daily()
-
-    # Collect daily data
-    daily_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-            end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=daily.Interval()),
-            inclusive="left",
-        ).strftime(
-            "%Y-%m-%d"
-        )  # Convert Timestamps to string format (ISO 8601)
-    }
-    daily_data["weather_code"] = daily.Variables(0).ValuesAsNumpy()
-    daily_data["temperature_2m_max"] = daily.Variables(1).ValuesAsNumpy()
-    daily_data["temperature_2m_min"] = daily.Variables(2).ValuesAsNumpy()
-    daily_data["uv_index_max"] = daily.Variables(3).ValuesAsNumpy()
-    daily_data["precipitation_probability_max"] = daily.Variables(4).ValuesAsNumpy()
-    daily_data["wind_speed_10m_max"] = daily.Variables(5).ValuesAsNumpy()
-    daily_data["wind_gusts_10m_max"] = daily.Variables(6).ValuesAsNumpy()
-    daily_data["wind_direction_10m_dominant"] = daily.Variables(7).ValuesAsNumpy()
-
-    # Create pandas dataframe
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return clean_weather_data(daily_dataframe)
+    _, columns = read_columns(response, "hourly", params["hourly"])
+    hourly = response.Hourly()
+
+    return pack_series(
+        start=hourly.Time(),
+        interval=hourly.Interval(),
+        utc_offset=response.UtcOffsetSeconds(),
+        columns=[
+            (name, type_code, columns[name]) for name, type_code in HOURLY_VARIABLES
+        ],
+    )
+
+
+def decode_hourly_weather_data(blob):
+    """
+    Decode a blob from `fetch_hourly_weather_data` into "time" and per variable
+    lists, the same columnar shape Open-Meteo uses for hourly data.
+    """
+    return series_to_json(blob) if blob else None